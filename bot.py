@@ -10,20 +10,49 @@ sys.modules["audioop"] = audioop
 # NORMAL IMPORTS
 # ================================
 import os
+import io
 import json
-from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, List
-
+import hmac
+import time
+import random
+import re
+import struct
+import glob
+import signal
+import argparse
+import subprocess
+import asyncio
+import functools
+import threading
+import zipfile
+import zlib
+from datetime import date, datetime, timezone, timedelta
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, Set, Iterator, Deque
+
+import aiohttp
 import discord
 from discord.ext import tasks
 from discord import app_commands
 from dotenv import load_dotenv
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
 
 try:
     from zoneinfo import ZoneInfo
 except Exception:
     ZoneInfo = None  # type: ignore
 
+try:
+    import fcntl
+except Exception:
+    fcntl = None  # type: ignore
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore
+
 
 # ======================================================
 # LOAD TOKEN (ENV or .env)
@@ -42,7 +71,12 @@ def load_token() -> str:
 # ======================================================
 # CONFIG
 # ======================================================
-DATA_FILE = "serverdata.json"
+DATA_FILE = os.getenv("BOT_DATA_FILE", "serverdata.json")
+# On-disk format for saves: auto (orjson if installed, else json-pretty), json
+# (compact), json-pretty (the old indented layout), orjson (needs the orjson
+# package) or binary (snapshot). load_data detects the format, so switching
+# needs no migration.
+DATA_CODEC = os.getenv("DATA_CODEC", "auto").lower()
 VALID_DAYS = [
     "Monday", "Tuesday", "Wednesday", "Thursday",
     "Friday", "Saturday", "Sunday"
@@ -52,6 +86,331 @@ DEFAULT_TIMEZONE = "UTC"
 DEFAULT_POST_HOUR = 8
 DEFAULT_POST_MINUTE = 25
 
+# Opt-in thundering-herd smoothing: slots still on the default post time
+# fire a deterministic 0 s .. N min later (per guild and slot, in whole
+# seconds) instead of all at once; slots given an explicit time keep it
+# exactly. 0 = off.
+DISPERSE_WINDOW_MINUTES = max(0, min(180, int(os.getenv("DISPERSE_WINDOW_MINUTES", "0"))))
+
+# Posting slots: each guild has one or more named slots (channel + time +
+# weekly schedule). Guilds from before slots existed become slot "main".
+DEFAULT_SLOT = "main"
+# The fire index handles thousands of slots per guild (a tick or one slot edit
+# stays well under a millisecond); the cap bounds what grows with it: a guild
+# re-index (timezone change: ~0.2 s at 5000 slots, blocking the loop) and the
+# guild's share of every save.
+MAX_SLOTS_PER_GUILD = max(1, int(os.getenv("MAX_SLOTS_PER_GUILD", "5000")))
+
+# Fires that elapsed while the scheduler was busy are still posted if they
+# are at most this old; older ones (startup, lease handover, a long stall)
+# are dropped and counted in scheduler_missed_fires_total.
+SCHEDULER_CATCHUP_SECONDS = max(0, int(os.getenv("SCHEDULER_CATCHUP_MINUTES", "10"))) * 60
+
+# DST handling for post times (see local_to_utc)
+DST_NONEXISTENT_POLICY = os.getenv("DST_NONEXISTENT_POLICY", "shift")   # shift | skip
+DST_AMBIGUOUS_POLICY = os.getenv("DST_AMBIGUOUS_POLICY", "first")       # first | second
+# How far ahead each timezone's fire table reaches
+FIRE_TABLE_WEEKS = max(2, int(os.getenv("FIRE_TABLE_WEEKS", "2")))
+
+# ---- Sharding ----
+# SHARD_COUNT unset: one plain Client / gateway connection (default)
+# SHARD_COUNT=auto:  AutoShardedClient with Discord's recommended count
+# SHARD_COUNT=N:     AutoShardedClient over N shards; SHARD_IDS (e.g. "0-3" or
+#                    "0,2,4") limits this process to a subset and gives it its
+#                    own partition of the data file
+def parse_shard_ids(spec: str) -> List[int]:
+    ids: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ids.extend(range(int(lo), int(hi) + 1))
+        else:
+            ids.append(int(part))
+    return sorted(set(ids))
+
+
+SHARD_COUNT_SETTING = os.getenv("SHARD_COUNT", "").strip().lower()
+SHARD_COUNT: Optional[int] = int(SHARD_COUNT_SETTING) if SHARD_COUNT_SETTING.isdigit() else None
+SHARD_IDS: Optional[List[int]] = parse_shard_ids(os.getenv("SHARD_IDS", "")) or None
+if SHARD_IDS is not None and SHARD_COUNT is None:
+    print("❌ ERROR: SHARD_IDS needs an explicit numeric SHARD_COUNT.")
+    raise SystemExit
+BASE_DATA_FILE = DATA_FILE
+if SHARD_IDS is not None:
+    root, ext = os.path.splitext(BASE_DATA_FILE)
+    DATA_FILE = f"{root}.s{SHARD_COUNT}-{SHARD_IDS[0]}-{SHARD_IDS[-1]}{ext}"
+
+# ---- Scheduler lease (one poster per data file) ----
+# Only the instance holding an exclusive lock on LEASE_FILE runs autopost and
+# answers commands; a hot standby polls the lock and takes over when it frees.
+SCHEDULER_LEASE = os.getenv("SCHEDULER_LEASE", "1") != "0"
+LEASE_FILE = os.getenv("LEASE_FILE", DATA_FILE + ".lease")
+LEASE_POLL_SECONDS = float(os.getenv("LEASE_POLL_SECONDS", "2"))
+
+# Optional REST base URL override (e.g. a local fake Discord for load tests)
+DISCORD_API_BASE = os.getenv("DISCORD_API_BASE")
+
+# Metrics / health HTTP server (disabled unless METRICS_PORT is set)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Bearer token for the admin API on the same server (unset = admin API off)
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+# /healthz fails when the scheduler has not ticked for this many seconds
+HEALTH_STALL_SECONDS = float(os.getenv("HEALTH_STALL_SECONDS", "180"))
+
+# Discord drops interactions that are not acknowledged within 3 seconds.
+# Handlers still running COMMAND_ACK_BUDGET seconds after the interaction
+# was created get deferred automatically.
+INTERACTION_ACK_DEADLINE = 3.0
+COMMAND_ACK_BUDGET = float(os.getenv("COMMAND_ACK_BUDGET", "2.0"))
+
+# Concurrent senders draining the outbound pipeline (one post at a time each)
+OUTBOUND_WORKERS = int(os.getenv("OUTBOUND_WORKERS", "4"))
+# On shutdown, wait up to this many seconds for queued posts to finish sending
+# (scheduled posts still unsent stay in the outbox for the next run)
+OUTBOUND_DRAIN_SECONDS = float(os.getenv("OUTBOUND_DRAIN_SECONDS", "10"))
+
+# Outbound lanes, drained highest priority first: interaction replies, then
+# /postnow, then scheduled posts. OUTBOUND_RESERVED_WORKERS extra senders only
+# take the two interactive lanes, so a scheduled burst never occupies them all.
+OUTBOUND_RESERVED_WORKERS = max(0, int(os.getenv("OUTBOUND_RESERVED_WORKERS", "1")))
+# Sends per second across all lanes, kept under Discord's global 50/s (0 = no limit).
+# Scheduled posts stop OUTBOUND_RESERVED_PER_SECOND short of it, which leaves
+# that headroom free for interaction replies and /postnow.
+OUTBOUND_RATE_PER_SECOND = max(0.0, float(os.getenv("OUTBOUND_RATE_PER_SECOND", "45")))
+OUTBOUND_RESERVED_PER_SECOND = max(0.0, float(os.getenv("OUTBOUND_RESERVED_PER_SECOND", "10")))
+
+# Minutes before each fire slot that channels/permissions are checked and posts prepared (0 = off)
+PREFLIGHT_MINUTES = max(0, int(os.getenv("PREFLIGHT_MINUTES", "5")))
+
+# Gateway/cache profile: "lean" (guilds intent only, no member or message
+# caches) or "full" (discord.py defaults, the old behaviour)
+CLIENT_PROFILE = os.getenv("CLIENT_PROFILE", "lean").lower()
+
+# ---- Outbox (retries for failed scheduled posts) ----
+OUTBOX_FILE = os.getenv("OUTBOX_FILE", DATA_FILE + ".outbox")
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "15"))
+# backoff doubles from BASE up to MAX seconds (randomised down to half)
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("OUTBOX_RETRY_MAX_SECONDS", "900"))
+# posts still undelivered this long after their slot become dead letters
+OUTBOX_MAX_AGE_MINUTES = float(os.getenv("OUTBOX_MAX_AGE_MINUTES", "180"))
+# dead letters kept per guild
+OUTBOX_DEAD_LETTERS = int(os.getenv("OUTBOX_DEAD_LETTERS", "50"))
+
+# ---- Dead guild / channel pruning ----
+# guilds and channels that resolved to nothing are not looked up again for this long
+NEGATIVE_CACHE_SECONDS = float(os.getenv("NEGATIVE_CACHE_SECONDS", "600"))
+COMPACT_INTERVAL_HOURS = float(os.getenv("COMPACT_INTERVAL_HOURS", "24"))
+# days after leaving a guild before its data is archived
+PRUNE_LEFT_GUILD_DAYS = int(os.getenv("PRUNE_LEFT_GUILD_DAYS", "30"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", DATA_FILE + ".archive")
+
+# ---- Message templates ----
+# how {date} is written in posted messages (strftime)
+TEMPLATE_DATE_FORMAT = os.getenv("TEMPLATE_DATE_FORMAT", "%d %B %Y")
+# compiled templates / rendered texts kept in memory
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "4096"))
+
+# Largest export file; Discord's smallest attachment limit is 10 MB
+EXPORT_PART_BYTES = int(os.getenv("EXPORT_PART_BYTES", str(8 * 1024 * 1024)))
+
+# ---- Webhook posting mode ----
+WEBHOOK_NAME = os.getenv("WEBHOOK_NAME", "Weekly Posting")
+# connections kept open to Discord for webhook posts (shared by all guilds)
+WEBHOOK_POOL_SIZE = int(os.getenv("WEBHOOK_POOL_SIZE", "64"))
+WEBHOOK_KEEPALIVE_SECONDS = float(os.getenv("WEBHOOK_KEEPALIVE_SECONDS", "75"))
+
+
+# ======================================================
+# METRICS (Prometheus text format, no extra dependency)
+# ======================================================
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class Metric:
+    """Base for counters/gauges/histograms; updated on the loop, read by the HTTP thread."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, val in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {val:g}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: List[float]):
+        super().__init__(name, help_text)
+        self.buckets = sorted(buckets)
+        # label key -> (bucket counts, sum, count)
+        self._values: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            counts, total, n = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._values.items()):
+                for bound, c in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {c}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {n}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {n}")
+        return lines
+
+
+METRICS: List[Metric] = []
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+AUTOPOST_TICK_SECONDS = Histogram(
+    "autopost_tick_seconds", "Duration of one autopost scheduler tick.", LATENCY_BUCKETS
+)
+AUTOPOST_GUILDS_DUE = Histogram(
+    "autopost_guilds_due", "Guild slots with a post due per autopost tick.", [0, 1, 5, 10, 50, 100, 500, 1000, 5000]
+)
+SCHEDULER_WAKE_LATENESS_SECONDS = Histogram(
+    "scheduler_wake_lateness_seconds", "How long after its deadline the scheduler clock woke up.", LATENCY_BUCKETS
+)
+SCHEDULER_FIRE_LATENESS_SECONDS = Histogram(
+    "scheduler_fire_lateness_seconds",
+    "Delay from a fire time to the tick that queued its posts (one sample per fire second).",
+    LATENCY_BUCKETS,
+)
+SCHEDULER_MISSED_FIRES = Counter(
+    "scheduler_missed_fires_total", "Slot fires dropped because they were older than the catch-up window."
+)
+SENDS_ATTEMPTED = Counter("sends_attempted_total", "Message chunks the bot tried to send.")
+SENDS_FAILED = Counter("sends_failed_total", "Message chunks that failed to send.")
+HTTP_RATELIMITED = Counter("discord_http_429_total", "HTTP 429 responses received from Discord.")
+HTTP_RESPONSES = Counter("discord_http_responses_total", "HTTP responses received from Discord by status class.")
+SAVE_DATA_SECONDS = Histogram("save_data_seconds", "Time spent in save_data.", LATENCY_BUCKETS)
+SAVE_DATA_BYTES = Histogram(
+    "save_data_bytes", "Size of each save_data write.", [1e3, 1e4, 1e5, 1e6, 1e7, 1e8]
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late a 1 s event-loop sleep wakes up.", LATENCY_BUCKETS
+)
+COMMAND_SECONDS = Histogram(
+    "command_seconds", "Slash command handler duration.", LATENCY_BUCKETS
+)
+COMMAND_ACK_SECONDS = Histogram(
+    "command_ack_seconds", "Time from interaction creation to acknowledgement.", LATENCY_BUCKETS
+)
+COMMAND_ACK_OUTCOMES = Counter(
+    "command_ack_total",
+    "Interaction acknowledgements by outcome (ok, near_miss, timeout, auto_deferred, standby).",
+)
+LEASE_HELD = Gauge("scheduler_lease_held", "1 while this instance holds the scheduler lease.")
+LEASE_TOKEN = Gauge("scheduler_lease_token", "Fencing token of the current scheduler lease.")
+OUTBOUND_QUEUE_DEPTH = Gauge("outbound_queue_depth", "Posts waiting in the outbound pipeline, by lane.")
+OUTBOUND_WAIT_SECONDS = Histogram(
+    "outbound_wait_seconds", "Time from enqueue until a sender picks the post up, by lane.", LATENCY_BUCKETS
+)
+OUTBOUND_JOB_SECONDS = Histogram(
+    "outbound_job_seconds", "Time from enqueue to a post being fully sent.", LATENCY_BUCKETS
+)
+OUTBOUND_BUDGET_WAIT_SECONDS = Histogram(
+    "outbound_budget_wait_seconds", "Time a send waited for the shared rate budget, by lane.", LATENCY_BUCKETS
+)
+PREFLIGHT_PROBLEMS = Counter(
+    "preflight_problems_total", "Slot problems found before fire time (reported to the guild once a day)."
+)
+AUTOPOST_PREPARED = Counter(
+    "autopost_prepared_total", "Due slots by pre-flight result: hit (sent as prepared), stale, or miss."
+)
+WEBHOOK_EVENTS = Counter(
+    "webhook_events_total", "Webhook mode: webhooks created, reused, recreated, or posts sent as the bot instead."
+)
+SENDS_PER_SECOND = Histogram(
+    "sends_per_second", "Message sends in each wall-clock second that had any.", [1, 2, 5, 10, 20, 35, 50, 75, 100, 200]
+)
+SENDS_PEAK_PER_SECOND = Gauge("sends_peak_per_second", "Most message sends in one second since start.")
+OUTBOX_ITEMS = Gauge("outbox_items", "Scheduled posts in the outbox by state (pending, sending, dead).")
+OUTBOX_EVENTS = Counter(
+    "outbox_events_total", "Outbox item transitions: queued, delivered, retry, dead."
+)
+NEGATIVE_CACHE_HITS = Counter(
+    "negative_cache_hits_total", "Lookups skipped because the guild or channel recently resolved to nothing."
+)
+COMPACTED_GUILDS = Counter("compacted_guilds_total", "Stale guild entries archived and dropped from the data file.")
+
+# monotonic time of the last finished autopost tick (None until the first one)
+last_autopost_tick: Optional[float] = None
+# seconds between the most recent fire time and the tick that queued it
+last_fire_lateness: Optional[float] = None
+PROCESS_STARTED = time.monotonic()
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
 
 # ======================================================
 # SAFE HELPERS
@@ -90,27 +449,396 @@ def split_message(text: str, limit: int = 2000) -> List[str]:
     return chunks
 
 
+_send_second = 0
+_send_second_count = 0
+_send_peak = 0
+
+
+def note_send_second() -> None:
+    """Count sends per wall-clock second (feeds sends_per_second and its peak)."""
+    global _send_second, _send_second_count, _send_peak
+    now = int(time.time())
+    if now != _send_second:
+        if _send_second_count:
+            SENDS_PER_SECOND.observe(_send_second_count)
+        _send_second, _send_second_count = now, 0
+    _send_second_count += 1
+    if _send_second_count > _send_peak:
+        _send_peak = _send_second_count
+        SENDS_PEAK_PER_SECOND.set(_send_peak)
+
+
+class SendBudget:
+    """
+    Token bucket for every outbound send. Interactive lanes may spend it to
+    zero; scheduled sends stop while `reserve` tokens or fewer are left, so
+    a burst of scheduled posts cannot use up the interactive headroom.
+    """
+
+    def __init__(self, rate: float, reserve: float):
+        self.rate = rate
+        self.reserve = min(reserve, max(0.0, rate - 1))
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def acquire(self, lane: str) -> None:
+        if self.rate <= 0:
+            return
+        floor = 0.0 if lane in INTERACTIVE_LANES else self.reserve
+        started = time.monotonic()
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= floor + 1:
+                self.tokens -= 1
+                OUTBOUND_BUDGET_WAIT_SECONDS.observe(now - started, lane=lane)
+                return
+            await asyncio.sleep((floor + 1 - self.tokens) / self.rate)
+
+
+# Priority order of the outbound lanes; paths not listed are scheduled posts
+LANES = ("interaction", "postnow", "scheduled")
+INTERACTIVE_LANES = ("interaction", "postnow")
+send_budget = SendBudget(OUTBOUND_RATE_PER_SECOND, OUTBOUND_RESERVED_PER_SECOND)
+
+
+def path_lane(path: str) -> str:
+    return path if path in INTERACTIVE_LANES else "scheduled"
+
+
+async def send_chunks(channel: discord.abc.Messageable, text: str, path: str = "autopost") -> None:
+    """Send a stored message, split into Discord-sized chunks, in order."""
+    lane = path_lane(path)
+    for part in split_message(text):
+        await send_budget.acquire(lane)
+        SENDS_ATTEMPTED.inc(path=path)
+        note_send_second()
+        try:
+            await channel.send(part)
+        except Exception:
+            SENDS_FAILED.inc(path=path)
+            raise
+
+
+# ======================================================
+# DATA CODECS (on-disk format of DATA_FILE)
+# ======================================================
+class Codec:
+    """Turns the whole data dict into bytes and back."""
+
+    name = ""
+
+    def dumps(self, obj: Dict[str, Any]) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class PrettyJsonCodec(Codec):
+    """The original format: indented, ASCII-escaped JSON. Easy to hand-edit, slowest."""
+
+    name = "json-pretty"
+
+    def dumps(self, obj: Dict[str, Any]) -> bytes:
+        return json.dumps(obj, indent=4).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return json.loads(raw)
+
+
+class CompactJsonCodec(Codec):
+    """No indentation and raw UTF-8; still plain JSON."""
+
+    name = "json"
+
+    def dumps(self, obj: Dict[str, Any]) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return json.loads(raw)
+
+
+class OrjsonCodec(Codec):
+    """Compact JSON through orjson (optional dependency)."""
+
+    name = "orjson"
+
+    def dumps(self, obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        return orjson.loads(raw)
+
+
+class BinarySnapshotCodec(Codec):
+    """
+    Length-prefixed snapshot: MAGIC, then one frame per guild of
+    u32 key length, key, u32 body length, body (that guild as compact JSON).
+
+    Frames can be skipped without parsing their body, which keeps shard
+    seeding and partial reads cheap.
+    """
+
+    name = "binary"
+    MAGIC = b"WPSNAP1\n"
+
+    def __init__(self, inner: Codec):
+        self.inner = inner
+
+    def dumps(self, obj: Dict[str, Any]) -> bytes:
+        parts = [self.MAGIC]
+        for key, value in obj.items():
+            k = key.encode("utf-8")
+            body = self.inner.dumps(value)
+            parts.append(struct.pack(">I", len(k)))
+            parts.append(k)
+            parts.append(struct.pack(">I", len(body)))
+            parts.append(body)
+        return b"".join(parts)
+
+    def loads(self, raw: bytes) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        view = memoryview(raw)
+        pos = len(self.MAGIC)
+        while pos < len(raw):
+            (klen,) = struct.unpack_from(">I", raw, pos)
+            key = bytes(view[pos + 4:pos + 4 + klen]).decode("utf-8")
+            pos += 4 + klen
+            (blen,) = struct.unpack_from(">I", raw, pos)
+            out[key] = self.inner.loads(bytes(view[pos + 4:pos + 4 + blen]))
+            pos += 4 + blen
+        return out
+
+
+_fast_json: Codec = OrjsonCodec() if orjson is not None else CompactJsonCodec()
+CODECS: Dict[str, Codec] = {
+    # without orjson, compact stdlib JSON is no faster to save than the old layout
+    "auto": _fast_json if orjson is not None else PrettyJsonCodec(),
+    "json-pretty": PrettyJsonCodec(),
+    "json": CompactJsonCodec(),
+    "orjson": _fast_json,
+    "binary": BinarySnapshotCodec(_fast_json),
+}
+if DATA_CODEC not in CODECS:
+    print(f"⚠️ Unknown DATA_CODEC {DATA_CODEC!r}; using json.")
+elif DATA_CODEC == "orjson" and orjson is None:
+    print("⚠️ DATA_CODEC=orjson but orjson is not installed; using json.")
+data_codec: Codec = CODECS.get(DATA_CODEC, CODECS["json"])
+
+
+def decode_data(raw: bytes) -> Dict[str, Any]:
+    """Decode any supported format; binary snapshots are recognised by their magic."""
+    if raw.startswith(BinarySnapshotCodec.MAGIC):
+        return CODECS["binary"].loads(raw)
+    # every JSON flavour parses with the fastest JSON backend
+    return _fast_json.loads(raw)
+
+
 # ======================================================
 # LOAD / SAVE DATA
 # ======================================================
-def load_data() -> Dict[str, Any]:
-    if not os.path.exists(DATA_FILE):
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Discord's shard formula: (guild_id >> 22) % shard_count."""
+    return (guild_id >> 22) % shard_count
+
+
+def owns_guild(guild_id: int) -> bool:
+    """True when this process's shard range is responsible for guild_id."""
+    if SHARD_IDS is None or SHARD_COUNT is None:
+        return True
+    return shard_for_guild(guild_id, SHARD_COUNT) in SHARD_IDS
+
+
+def _read_data_file(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
         return {}
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
+        with open(path, "rb") as f:
+            return decode_data(f.read())
+    except (OSError, ValueError, struct.error):
         return {}
 
 
+def _layout_of(path: str) -> Optional[int]:
+    """Shard count of a partition file name (root.s<count>-<first>-<last>.ext), None for the shared file."""
+    match = re.search(r"\.s(\d+)-\d+-\d+[^/\\]*$", path)
+    return int(match.group(1)) if match else None
+
+
+def load_data() -> Dict[str, Any]:
+    """
+    This process's data. Files written under another shard layout (the
+    shared file or other partitions) that are newer than DATA_FILE hold
+    later edits to guilds it owns, e.g. after SHARD_COUNT changed and
+    changed back; they are applied oldest first, so the newest copy of
+    each guild wins. Partitions of the current layout own other guilds.
+    """
+    root, ext = os.path.splitext(BASE_DATA_FILE)
+    own_mtime = os.path.getmtime(DATA_FILE) if os.path.exists(DATA_FILE) else None
+    layout = _layout_of(DATA_FILE)
+    newer = sorted(
+        (os.path.getmtime(path), path)
+        for path in [BASE_DATA_FILE] + glob.glob(f"{glob.escape(root)}.s*{ext}")
+        if path != DATA_FILE and os.path.exists(path) and _layout_of(path) != layout
+        and (own_mtime is None or os.path.getmtime(path) > own_mtime)
+    )
+    loaded = _read_data_file(DATA_FILE)
+    if not newer:
+        return loaded
+
+    merged = 0
+    for _, path in newer:
+        for gid, guild_data in _read_data_file(path).items():
+            if gid.isdigit() and owns_guild(int(gid)):
+                loaded[gid] = guild_data
+                merged += 1
+    if merged:
+        verb = "Updated" if own_mtime is not None else "Seeded"
+        print(f"📦 {verb} {DATA_FILE} with {merged} guild(s) from {len(newer)} newer file(s) of another shard layout.")
+    return loaded
+
+
+# bumped on every save; HTTP threads read it for ETags
+data_version = 0
+
+
+def write_file_atomic(path: str, payload: bytes) -> None:
+    """Write via a temp file in the same directory, fsync, then rename over path."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
 def save_data(data: Dict[str, Any]) -> None:
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    global data_version
+    data_version += 1
+    started = time.perf_counter()
+    payload = data_codec.dumps(data)
+    write_file_atomic(DATA_FILE, payload)
+    SAVE_DATA_SECONDS.observe(time.perf_counter() - started)
+    SAVE_DATA_BYTES.observe(len(payload))
 
 
 data: Dict[str, Any] = load_data()
 
 
+# ======================================================
+# SCHEDULER LEASE (single poster across instances)
+# ======================================================
+class SchedulerLease:
+    """
+    Exclusive fcntl lock on LEASE_FILE with a fencing token.
+
+    The token in the file goes up by one on every acquisition, so a holder
+    can tell (is_current) whether the file still names it as the poster.
+    The holder also checkpoints the last scheduler second it consumed there,
+    so the next holder resumes after it instead of re-posting that minute.
+    """
+
+    def __init__(self, path: str, enabled: bool):
+        self.path = path
+        self.enabled = enabled and fcntl is not None
+        self.token = 0
+        # last second the previous holder consumed, read on acquisition
+        self.resume_second: Optional[int] = None
+        self._fd: Optional[int] = None
+        if enabled and fcntl is None:
+            print("⚠️ fcntl not available on this host; scheduler lease disabled.")
+
+    @property
+    def held(self) -> bool:
+        return not self.enabled or self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.held:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        previous = os.pread(fd, 128, 0).decode("utf-8", "replace").split("\n")
+        token = previous[0].strip()
+        self.token = (int(token) if token.isdigit() else 0) + 1
+        last = previous[2].strip() if len(previous) > 2 else ""
+        self.resume_second = int(last) if last.isdigit() else None
+        self._fd = fd
+        self._write(self.resume_second)
+        LEASE_HELD.set(1)
+        LEASE_TOKEN.set(self.token)
+        return True
+
+    def _write(self, last_second: Optional[int]) -> None:
+        record = f"{self.token}\n{os.getpid()}\n{'' if last_second is None else last_second}\n"
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, record.encode("utf-8"), 0)
+        os.fsync(self._fd)
+
+    def checkpoint(self, last_second: Optional[int]) -> None:
+        """Record the last scheduler second consumed (call once its posts are in the outbox)."""
+        if self._fd is None or last_second is None:
+            return
+        try:
+            self._write(last_second)
+        except OSError as e:
+            print(f"⚠️ Could not checkpoint the scheduler lease: {e!r}")
+
+    def is_current(self) -> bool:
+        """Fencing check: LEASE_FILE is still our locked file and carries our token."""
+        if not self.enabled:
+            return True
+        if self._fd is None:
+            return False
+        try:
+            if os.stat(self.path).st_ino != os.fstat(self._fd).st_ino:
+                return False
+            with open(self.path, "r", encoding="utf-8") as f:
+                current = f.readline().strip()
+        except OSError:
+            return False
+        return current == str(self.token)
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            LEASE_HELD.set(0)
+
+
+scheduler_lease = SchedulerLease(LEASE_FILE, SCHEDULER_LEASE)
+# monotonic time this instance became the poster (health checks count from here)
+lease_since: float = time.monotonic()
+
+
+def take_over_lease() -> bool:
+    """Try to become the poster; on success reload data the old holder wrote."""
+    global lease_since
+    was_held = scheduler_lease.held
+    if not scheduler_lease.try_acquire():
+        return False
+    if not was_held:
+        lease_since = time.monotonic()
+        data.clear()
+        data.update(load_data())
+        migrate_data()
+        fire_index.rebuild(resume_second=scheduler_lease.resume_second)
+        outbox.load()
+        reconcile_guilds()
+        print(f"🔑 Acquired scheduler lease (token {scheduler_lease.token}).")
+    return True
+
+
 # ======================================================
 # TIMEZONE HELPERS
 # ======================================================
@@ -149,231 +877,1894 @@ def get_tzinfo(tz_name: str):
         return timezone.utc
 
 
-def get_guild_post_time(guild_id: int) -> tuple[int, int]:
-    ensure_guild(guild_id)
-    g = data[str(guild_id)]
-    hour = g.get("post_hour", DEFAULT_POST_HOUR)
-    minute = g.get("post_minute", DEFAULT_POST_MINUTE)
-    try:
-        hour = int(hour)
-        minute = int(minute)
-    except Exception:
-        return DEFAULT_POST_HOUR, DEFAULT_POST_MINUTE
-    hour = max(0, min(23, hour))
-    minute = max(0, min(59, minute))
-    return hour, minute
+# ======================================================
+# POST SLOTS
+# slots[name] = {channel, hour, minute, second, timezone (None = guild's), cron, schedule}
+# ======================================================
+SLOT_NAME_CHARS = set("abcdefghijklmnopqrstuvwxyz0123456789_-")
 
 
-def next_run_local(now_local: datetime, hour: int, minute: int) -> datetime:
-    """Return next datetime (local tz) when the post should run."""
-    candidate = now_local.replace(hour=hour, minute=minute, second=0, microsecond=0)
-    if candidate <= now_local:
-        candidate += timedelta(days=1)
-    return candidate
+def normalize_slot_name(name: str) -> Optional[str]:
+    """Lowercased slot name, or None if it is not 1-32 of [a-z0-9_-]."""
+    name = name.strip().lower()
+    if not 1 <= len(name) <= 32 or not set(name) <= SLOT_NAME_CHARS:
+        return None
+    return name
 
 
-# ======================================================
-# GUILD INITIALIZER (migration + safety)
-# schedule[day] is ALWAYS a list[int]
-# ======================================================
-def ensure_guild(guild_id: int) -> None:
-    gid = str(guild_id)
+def new_slot(channel_id: Optional[int] = None,
+             hour: int = DEFAULT_POST_HOUR,
+             minute: int = DEFAULT_POST_MINUTE) -> Dict[str, Any]:
+    return {
+        "channel": channel_id,
+        "hour": hour,
+        "minute": minute,
+        "second": 0,
+        "time_set": False,   # False while on the default time (eligible for dispersion)
+        "timezone": None,
+        "cron": None,        # cron expression; replaces hour/minute when set
+        "schedule": {},      # day -> list of message IDs / "pool:<name>"
+    }
 
-    # Create new guild entry
-    if gid not in data:
-        data[gid] = {
-            "messages": {},
-            "schedule": {},      # day -> list[int]
-            "post_channel": None,
-            "timezone": DEFAULT_TIMEZONE,
-            "post_hour": DEFAULT_POST_HOUR,
-            "post_minute": DEFAULT_POST_MINUTE,
-        }
-        save_data(data)
-        return
 
-    g = data[gid]
+def normalize_slot(raw: Dict[str, Any]) -> Dict[str, Any]:
+    slot = new_slot()
 
-    # Messages always dict
-    if "messages" not in g or not isinstance(g["messages"], dict):
-        g["messages"] = {}
+    # channel: int or None
+    channel_id = raw.get("channel")
+    slot["channel"] = channel_id if isinstance(channel_id, int) else None
 
-    # Schedule always dict[day] -> list[int]
-    sched = g.get("schedule")
+    # post time
+    try:
+        hour = int(raw.get("hour", DEFAULT_POST_HOUR))
+        minute = int(raw.get("minute", DEFAULT_POST_MINUTE))
+    except Exception:
+        hour, minute = DEFAULT_POST_HOUR, DEFAULT_POST_MINUTE
+    slot["hour"] = max(0, min(23, hour))
+    slot["minute"] = max(0, min(59, minute))
+    try:
+        slot["second"] = max(0, min(59, int(raw.get("second", 0))))
+    except Exception:
+        slot["second"] = 0
+    # slots from before the flag: an explicit time is any time but the default
+    time_set = raw.get("time_set")
+    if not isinstance(time_set, bool):
+        time_set = (slot["hour"], slot["minute"]) != (DEFAULT_POST_HOUR, DEFAULT_POST_MINUTE)
+    slot["time_set"] = time_set
+
+    # timezone override (None follows the guild timezone)
+    tz_name = raw.get("timezone")
+    if isinstance(tz_name, str) and tz_name and validate_timezone(tz_name):
+        slot["timezone"] = tz_name
+
+    # cron expression, kept only if it compiles
+    expression = raw.get("cron")
+    if isinstance(expression, str) and expression.strip():
+        try:
+            slot["cron"] = compile_cron(expression).expression
+        except ValueError:
+            pass
+
+    # schedule always dict[day] -> list of message IDs / pool references
+    sched = raw.get("schedule")
     if not isinstance(sched, dict):
         sched = {}
-    fixed_sched: Dict[str, List[int]] = {}
     for day, val in sched.items():
         if isinstance(val, int):
-            fixed_sched[day] = [val]
+            slot["schedule"][day] = [val]
         elif isinstance(val, list):
-            cleaned = [int(x) for x in val if isinstance(x, int)]
+            cleaned = [x for x in val if isinstance(x, int) or parse_pool_ref(x)]
             if cleaned:
-                fixed_sched[day] = cleaned
-    g["schedule"] = fixed_sched
+                slot["schedule"][day] = cleaned
+    return slot
 
-    # post_channel always present
-    if "post_channel" not in g:
-        g["post_channel"] = None
 
-    # timezone
-    tz_name = g.get("timezone", DEFAULT_TIMEZONE)
+def find_slot(guild_id: int, name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """(normalized name, slot) for a user-typed slot name; slot is None if missing."""
+    ensure_guild(guild_id)
+    slot_name = normalize_slot_name(name)
+    if slot_name is None:
+        return name, None
+    return slot_name, data[str(guild_id)]["slots"].get(slot_name)
+
+
+def slot_timezone(g: Dict[str, Any], slot: Dict[str, Any]) -> str:
+    tz_name = slot.get("timezone") or g.get("timezone", DEFAULT_TIMEZONE)
     if not isinstance(tz_name, str) or not tz_name:
         tz_name = DEFAULT_TIMEZONE
-    if not validate_timezone(tz_name):
-        tz_name = DEFAULT_TIMEZONE
-    g["timezone"] = tz_name
+    return tz_name
 
-    # post time
-    hour = g.get("post_hour", DEFAULT_POST_HOUR)
-    minute = g.get("post_minute", DEFAULT_POST_MINUTE)
-    try:
-        hour = int(hour)
-        minute = int(minute)
-    except Exception:
-        hour, minute = DEFAULT_POST_HOUR, DEFAULT_POST_MINUTE
-    g["post_hour"] = max(0, min(23, hour))
-    g["post_minute"] = max(0, min(59, minute))
 
-    save_data(data)
+def dispersion_offset(guild_id: int, slot_name: str, window: int) -> int:
+    """Deterministic offset in seconds, under window minutes, for one guild slot (0 when window is 0)."""
+    if window <= 0:
+        return 0
+    return zlib.crc32(f"{guild_id}:{slot_name}".encode("utf-8")) % (window * 60)
+
+
+def slot_offset_seconds(guild_id: int, slot_name: str, slot: Dict[str, Any]) -> int:
+    """How much later than its post time a slot fires (dispersion of default-time slots)."""
+    if slot.get("time_set") or slot.get("cron"):
+        return 0
+    return dispersion_offset(guild_id, slot_name, DISPERSE_WINDOW_MINUTES)
+
+
+def slot_fire_day(guild_id: int, slot_name: str, g: Dict[str, Any], slot: Dict[str, Any], fire_second: int) -> str:
+    """Weekday whose queue a fire at fire_second posts (local day of the undispersed time)."""
+    at = datetime.fromtimestamp(fire_second - slot_offset_seconds(guild_id, slot_name, slot), tz=timezone.utc)
+    return at.astimezone(get_tzinfo(slot_timezone(g, slot))).strftime("%A")
+
+
+def clip_lines(lines: List[str], limit: int) -> str:
+    """Join lines, cutting the tail (with a count) to stay under an embed limit."""
+    out: List[str] = []
+    used = 0
+    for i, line in enumerate(lines):
+        if used + len(line) + 1 > limit - 20:
+            out.append(f"… and {len(lines) - i} more")
+            break
+        out.append(line)
+        used += len(line) + 1
+    return "\n".join(out)
 
 
 # ======================================================
-# BOT SETUP
+# ROTATION POOLS (one message per fire, cursor persisted)
 # ======================================================
-intents = discord.Intents.default()
-intents.message_content = False  # using slash commands only
+# A schedule queue entry "pool:<name>" posts the pool's next message each
+# time the slot fires. Every pool keeps its current cycle ("order") and a
+# cursor into it, so picking is one index lookup: "sequence" cycles through
+# the messages as listed; "random" deals a shuffled bag holding each message
+# `weight` times, with no message twice in a row where avoidable, and deals
+# a new bag when it runs out. Edits fix up the cycle and cursor in place.
+POOL_MODES = ("sequence", "random")
+POOL_REF_PREFIX = "pool:"
+MAX_POOL_WEIGHT = 10
+
+
+def pool_ref(name: str) -> str:
+    return POOL_REF_PREFIX + name
+
+
+def parse_pool_ref(entry: Any) -> Optional[str]:
+    """Pool name of a queue entry, or None for a plain message ID."""
+    if isinstance(entry, str) and entry.startswith(POOL_REF_PREFIX):
+        return entry[len(POOL_REF_PREFIX):]
+    return None
+
+
+def new_pool(mode: str = "sequence") -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "messages": [],     # message IDs in the pool, as added
+        "weights": {},      # str(message ID) -> weight (random mode)
+        "order": [],        # current cycle
+        "cursor": 0,        # next entry of order to post
+    }
+
+
+def deal_pool(pool: Dict[str, Any], previous: Optional[int] = None) -> List[int]:
+    """A new cycle: the messages in order, or a weighted shuffled bag."""
+    if pool["mode"] != "random":
+        return list(pool["messages"])
+    left = {mid: pool["weights"].get(str(mid), 1) for mid in pool["messages"]}
+    total = sum(left.values())
+    bag: List[int] = []
+    while total:
+        heaviest = max(left, key=left.__getitem__)
+        if heaviest != previous and left[heaviest] * 2 > total:
+            # it needs every other place from here on, or it repeats later
+            pick = heaviest
+        else:
+            choices = [mid for mid, n in left.items() if n and mid != previous] or [previous]
+            pick = random.choices(choices, weights=[left[mid] for mid in choices])[0]
+        bag.append(pick)
+        left[pick] -= 1
+        total -= 1
+        previous = pick
+    return bag
+
+
+def normalize_pool(raw: Dict[str, Any]) -> Dict[str, Any]:
+    pool = new_pool(raw.get("mode") if raw.get("mode") in POOL_MODES else "sequence")
+    messages = raw.get("messages")
+    if isinstance(messages, list):
+        pool["messages"] = list(dict.fromkeys(mid for mid in messages if isinstance(mid, int)))
+    weights = raw.get("weights")
+    if isinstance(weights, dict):
+        pool["weights"] = {
+            str(mid): max(1, min(MAX_POOL_WEIGHT, int(weights[str(mid)])))
+            for mid in pool["messages"] if isinstance(weights.get(str(mid)), int)
+        }
+    order = raw.get("order")
+    members = set(pool["messages"])
+    if isinstance(order, list):
+        pool["order"] = [mid for mid in order if mid in members]
+    cursor = raw.get("cursor")
+    pool["cursor"] = cursor if isinstance(cursor, int) and 0 <= cursor < len(pool["order"]) else 0
+    if pool["mode"] == "sequence" and pool["order"] != pool["messages"]:
+        pool["order"] = list(pool["messages"])
+    if not pool["order"] and pool["messages"]:
+        pool["order"] = deal_pool(pool)
+    return pool
+
+
+def pool_peek(pool: Dict[str, Any], ahead: int = 0) -> Optional[int]:
+    """Message ID posted `ahead` fires from now within the current cycle (None past its end)."""
+    i = pool["cursor"] + ahead
+    if pool["mode"] == "sequence" and pool["order"]:
+        return pool["order"][i % len(pool["order"])]
+    return pool["order"][i] if i < len(pool["order"]) else None
+
+
+def pool_advance(pool: Dict[str, Any]) -> None:
+    if not pool["order"]:
+        return
+    pool["cursor"] += 1
+    if pool["cursor"] >= len(pool["order"]):
+        last = pool["order"][-1]
+        pool["cursor"] = 0
+        pool["order"] = deal_pool(pool, previous=last)
+
+
+def pool_extend(pool: Dict[str, Any], ahead: int) -> None:
+    """Deal the next bag onto the cycle if `ahead` runs past it (random pools)."""
+    if pool["order"] and pool_peek(pool, ahead) is None:
+        pool["order"] = pool["order"] + deal_pool(pool, previous=pool["order"][-1])
+
+
+def pool_upcoming(pool: Dict[str, Any], count: int) -> List[int]:
+    """The next `count` picks (random pools: only until the current bag runs out)."""
+    picks: List[int] = []
+    for ahead in range(count):
+        mid = pool_peek(pool, ahead)
+        if mid is None:
+            break
+        picks.append(mid)
+    return picks
+
+
+def pool_set_message(pool: Dict[str, Any], message_id: int, weight: int = 1) -> None:
+    """Add a message (or change its weight); the current cycle keeps its place."""
+    pool_remove_message(pool, message_id)
+    pool["messages"].append(message_id)
+    if pool["mode"] != "random":
+        pool["order"] = list(pool["messages"])
+        return
+    pool["weights"][str(message_id)] = weight
+    # spread its copies over what is left of this bag
+    for _ in range(weight):
+        pool["order"].insert(random.randint(pool["cursor"], len(pool["order"])), message_id)
+
 
-bot = discord.Client(intents=intents)
-tree = app_commands.CommandTree(bot)
+def pool_remove_message(pool: Dict[str, Any], message_id: int) -> bool:
+    if message_id not in pool["messages"]:
+        return False
+    pool["messages"].remove(message_id)
+    pool["weights"].pop(str(message_id), None)
+    before_cursor = sum(1 for mid in pool["order"][:pool["cursor"]] if mid == message_id)
+    pool["order"] = [mid for mid in pool["order"] if mid != message_id]
+    pool["cursor"] -= before_cursor
+    if pool["cursor"] >= len(pool["order"]):
+        pool["cursor"] = 0
+        pool["order"] = deal_pool(pool)
+    return True
+
+
+def queue_sources(g: Dict[str, Any], queue: List[Any]) -> List[Optional[str]]:
+    """Text each queue entry would post now (pool entries: the pool's next message)."""
+    messages_map = g.get("messages", {})
+    pools = g.get("pools", {})
+    seen: Dict[str, int] = {}   # a pool listed twice posts two consecutive picks
+    sources: List[Optional[str]] = []
+    for entry in queue:
+        name = parse_pool_ref(entry)
+        if name is None:
+            sources.append(messages_map.get(str(entry)))
+            continue
+        pool = pools.get(name)
+        mid = None
+        if pool is not None:
+            # a pool listed more often than its bag has picks left reads on into the next bag
+            pool_extend(pool, seen.get(name, 0))
+            mid = pool_peek(pool, seen.get(name, 0))
+        seen[name] = seen.get(name, 0) + 1
+        sources.append(messages_map.get(str(mid)) if mid is not None else None)
+    return sources
+
+
+def advance_queue_pools(g: Dict[str, Any], queue: List[Any]) -> bool:
+    """
+    Move the cursor of every pool in a posted queue, once per entry that
+    posted a pick (see queue_sources); True if any moved.
+    """
+    moved = False
+    for entry in queue:
+        pool = g.get("pools", {}).get(parse_pool_ref(entry) or "")
+        if pool is not None and pool_peek(pool) is not None:
+            pool_advance(pool)
+            moved = True
+    return moved
+
+
+def describe_entry(entry: Any) -> str:
+    name = parse_pool_ref(entry)
+    return f"Pool `{name}`" if name is not None else f"Message `{entry}`"
 
 
 # ======================================================
-# ADD MESSAGE COMMANDS
+# GUILD INITIALIZER (migration + safety)
+# slots[name]["schedule"][day] is ALWAYS a list[int]
 # ======================================================
-@tree.command(name="addmessage", description="Save a message to the bot")
-async def addmessage(interaction: discord.Interaction, message_id: int, text: str):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+def new_webhook_settings() -> Dict[str, Any]:
+    return {
+        "enabled": False,
+        "name": None,         # display name per post (None = webhook's own)
+        "avatar_url": None,
+        "cache": {},          # channel id -> [webhook id, token]
+    }
 
-    data[str(gid)]["messages"][str(message_id)] = text
-    save_data(data)
 
-    await interaction.response.send_message(
-        f"✔ Message {message_id} saved.",
-        ephemeral=True
-    )
+def normalize_guild(g: Dict[str, Any]) -> None:
+    # Messages always dict
+    if "messages" not in g or not isinstance(g["messages"], dict):
+        g["messages"] = {}
 
+    # timezone
+    tz_name = g.get("timezone", DEFAULT_TIMEZONE)
+    if not isinstance(tz_name, str) or not tz_name:
+        tz_name = DEFAULT_TIMEZONE
+    if not validate_timezone(tz_name):
+        tz_name = DEFAULT_TIMEZONE
+    g["timezone"] = tz_name
 
-# Popup modal for multiline message
-class AddMessageModal(discord.ui.Modal, title="Add Multi-Line Message"):
-    text = discord.ui.TextInput(
-        label="Message",
-        style=discord.TextStyle.paragraph,
-        required=True
-    )
+    # set while the bot is not in the guild (see on_guild_remove)
+    left_at = g.get("left_at")
+    if left_at is not None:
+        try:
+            date.fromisoformat(left_at)
+        except (TypeError, ValueError):
+            g.pop("left_at")
+
+    # Webhook mode settings + cached webhook tokens
+    webhook = g.get("webhook")
+    if not isinstance(webhook, dict):
+        webhook = {}
+    fixed_webhook = new_webhook_settings()
+    fixed_webhook["enabled"] = webhook.get("enabled") is True
+    for key in ("name", "avatar_url"):
+        if isinstance(webhook.get(key), str) and webhook[key]:
+            fixed_webhook[key] = webhook[key]
+    cache = webhook.get("cache")
+    if isinstance(cache, dict):
+        fixed_webhook["cache"] = {
+            cid: hit for cid, hit in cache.items()
+            if isinstance(hit, list) and len(hit) == 2 and isinstance(hit[0], int) and isinstance(hit[1], str)
+        }
+    g["webhook"] = fixed_webhook
+
+    # Slots; the single-channel layout becomes slot "main"
+    slots = g.get("slots")
+    if not isinstance(slots, dict):
+        slots = {DEFAULT_SLOT: {
+            "channel": g.get("post_channel"),
+            "hour": g.get("post_hour", DEFAULT_POST_HOUR),
+            "minute": g.get("post_minute", DEFAULT_POST_MINUTE),
+            "schedule": g.get("schedule"),
+        }}
+    for legacy in ("post_channel", "post_hour", "post_minute", "schedule"):
+        g.pop(legacy, None)
+    g["slots"] = {
+        name: normalize_slot(slot)
+        for name, slot in slots.items()
+        if isinstance(slot, dict) and normalize_slot_name(name) == name
+    }
+
+    # Rotation pools
+    pools = g.get("pools")
+    if not isinstance(pools, dict):
+        pools = {}
+    g["pools"] = {
+        name: normalize_pool(pool)
+        for name, pool in pools.items()
+        if isinstance(pool, dict) and normalize_slot_name(name) == name
+    }
 
-    async def on_submit(self, interaction: discord.Interaction) -> None:
-        gid = safe_guild_id(interaction)
-        ensure_guild(gid)
 
-        messages: Dict[str, str] = data[str(gid)]["messages"]
-        new_id = str(max([int(i) for i in messages] + [0]) + 1)
+def ensure_guild(guild_id: int) -> None:
+    gid = str(guild_id)
 
-        data[str(gid)]["messages"][new_id] = str(self.text)
+    # Create new guild entry
+    if gid not in data:
+        data[gid] = {
+            "messages": {},
+            "timezone": DEFAULT_TIMEZONE,
+            "slots": {DEFAULT_SLOT: new_slot()},
+            "pools": {},
+            "webhook": new_webhook_settings(),
+        }
         save_data(data)
 
-        await interaction.response.send_message(
-            f"✔ Saved as message {new_id}.",
-            ephemeral=True
-        )
 
+def migrate_data() -> None:
+    """Normalize every loaded guild once, so commands and ticks can trust the layout."""
+    for gid, g in data.items():
+        if gid.isdigit() and isinstance(g, dict):
+            normalize_guild(g)
 
-@tree.command(name="addmessagepopup", description="Add a multiline message using a popup")
-async def addmessagepopup(interaction: discord.Interaction):
-    await interaction.response.send_modal(AddMessageModal())
+
+# ======================================================
+# FIRE TIME TABLE (DST-aware, shared per timezone)
+# ======================================================
+def local_to_utc(naive: datetime, tzinfo, nonexistent: str, ambiguous: str) -> Optional[datetime]:
+    """
+    Convert a local wall time to UTC, honouring DST gaps and overlaps.
+
+    nonexistent (spring-forward gap): "shift" moves the post forward by
+    the gap (02:30 -> 03:30), "skip" drops it for that day.
+    ambiguous (fall-back overlap): "first" or "second" occurrence.
+    """
+    first = naive.replace(tzinfo=tzinfo, fold=0)
+    second = naive.replace(tzinfo=tzinfo, fold=1)
+    if first.utcoffset() == second.utcoffset():
+        return first.astimezone(timezone.utc)
+
+    earlier = first.astimezone(timezone.utc)
+    if earlier.astimezone(tzinfo).replace(tzinfo=None) != naive:
+        # wall time does not exist; fold=0 applies the pre-gap offset,
+        # which lands the same distance past the gap
+        return None if nonexistent == "skip" else earlier
+    return earlier if ambiguous == "first" else second.astimezone(timezone.utc)
+
+
+class ZoneFireTable:
+    """
+    UTC fire instants for one timezone over the next FIRE_TABLE_WEEKS weeks.
+
+    Rows are filled lazily per (hour, minute) and shared by every guild in
+    the zone. A table is replaced once its first week has passed.
+    """
+
+    generation = 0
+
+    def __init__(self, tz_name: str, start: date, weeks: int):
+        ZoneFireTable.generation += 1
+        self.generation = ZoneFireTable.generation
+        self.tz_name = tz_name
+        self.tzinfo = get_tzinfo(tz_name)
+        self.start = start
+        self.days = weeks * 7
+        self._rows: Dict[Tuple[int, int], List[Tuple[date, Optional[datetime]]]] = {}
+
+    def expired(self, now_utc: datetime) -> bool:
+        return now_utc.astimezone(self.tzinfo).date() >= self.start + timedelta(days=7)
+
+    def instants(self, hour: int, minute: int) -> List[Tuple[date, Optional[datetime]]]:
+        """(local date, UTC instant or None when skipped) for each day of the table."""
+        row = self._rows.get((hour, minute))
+        if row is None:
+            row = []
+            for n in range(self.days):
+                day = self.start + timedelta(days=n)
+                naive = datetime(day.year, day.month, day.day, hour, minute)
+                row.append((day, local_to_utc(naive, self.tzinfo, DST_NONEXISTENT_POLICY, DST_AMBIGUOUS_POLICY)))
+            self._rows[(hour, minute)] = row
+        return row
+
+
+_fire_tables: Dict[str, ZoneFireTable] = {}
+
+
+def fire_table(tz_name: str, now_utc: datetime) -> ZoneFireTable:
+    table = _fire_tables.get(tz_name)
+    if table is None or table.expired(now_utc):
+        # start yesterday so posts later "today" in any zone are covered
+        today = now_utc.astimezone(get_tzinfo(tz_name)).date()
+        table = ZoneFireTable(tz_name, today - timedelta(days=1), FIRE_TABLE_WEEKS)
+        _fire_tables[tz_name] = table
+    return table
 
 
 # ======================================================
-# EDIT / REMOVE MESSAGE
+# CRON EXPRESSIONS (compiled to bitsets)
+# "minute hour day-of-month month day-of-week", evaluated in local time.
+# Day-of-week extras: MON#1 = first Monday of the month,
+# TUE%2 / TUE%2+1 = every other Tuesday (even / odd weeks since 1970).
 # ======================================================
-@tree.command(name="editmessage", description="Edit a saved message")
-async def editmessage(
-    interaction: discord.Interaction,
-    message_id: int,
-    new_text: str
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * SUN",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+}
+CRON_MONTHS = {m: i for i, m in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"], start=1)}
+CRON_DAYS = {d: i for i, d in enumerate(["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"])}
+# Feb 29 can be four years away
+CRON_SEARCH_DAYS = 366 * 4 + 1
+# Monday 1970-01-05, start of week 0 for the %N extension
+CRON_WEEK_EPOCH = date(1970, 1, 5)
+
+
+def _lowest_bit_from(bits: int, start: int) -> int:
+    """Lowest set bit index >= start, or -1."""
+    bits >>= start
+    if not bits:
+        return -1
+    return (bits & -bits).bit_length() - 1 + start
+
+
+def _cron_value(token: str, lo: int, hi: int, names: Dict[str, int]) -> int:
+    token = token.upper()
+    if token in names:
+        value = names[token]
+    elif token.isdigit():
+        value = int(token)
+    else:
+        raise ValueError(f"unknown value {token}")
+    if not lo <= value <= hi:
+        raise ValueError(f"{token} is outside {lo}-{hi}")
+    return value
+
+
+def _cron_bits(field: str, lo: int, hi: int, names: Dict[str, int]) -> int:
+    bits = 0
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError("step must be at least 1")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = _cron_value(a, lo, hi, names), _cron_value(b, lo, hi, names)
+            if names is CRON_DAYS and end == 0 and start > 0:
+                end = 7                             # SAT-SUN
+        else:
+            start = _cron_value(part, lo, hi, names)
+            end = hi if step > 1 else start
+        if start > end:
+            raise ValueError(f"range {part} runs backwards")
+        for v in range(start, end + 1, step):
+            bits |= 1 << v
+    if names is CRON_DAYS and bits >> 7 & 1:
+        bits = (bits | 1) & 0x7F                    # 7 is Sunday too
+    return bits
+
+
+class CronSchedule:
+    """
+    A cron expression compiled to bitsets (minute, hour, day, month, weekday).
+
+    next_after() walks days, not minutes, and picks the time of day with
+    bit scans, so each call costs a handful of operations for any
+    realistic expression.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = " ".join(expression.split())
+        fields = CRON_ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError("expected 5 fields: minute hour day-of-month month day-of-week")
+        try:
+            self.minutes = _cron_bits(fields[0], 0, 59, {})
+            self.hours = _cron_bits(fields[1], 0, 23, {})
+            self.days = _cron_bits(fields[2], 1, 31, {})
+            self.months = _cron_bits(fields[3], 1, 12, CRON_MONTHS)
+            self._compile_weekdays(fields[4])
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"invalid cron expression: {e}") from None
+        # standard cron: if both day fields are restricted, either may match
+        self.day_or = fields[2] != "*" and fields[4] != "*"
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    def _compile_weekdays(self, field: str) -> None:
+        self.weekdays = 0                                # bits, 0 = Sunday
+        self.nth: Set[Tuple[int, int]] = set()          # (weekday, n-th in month)
+        self.alternate: List[Tuple[int, int, int]] = []  # (weekday bits, every N weeks, offset)
+        for part in field.split(","):
+            if "#" in part:
+                day, n = part.split("#", 1)
+                if not 1 <= int(n) <= 5:
+                    raise ValueError("#n must be 1-5")
+                self.nth.add((_cron_value(day, 0, 7, CRON_DAYS) % 7, int(n)))
+            elif "%" in part:
+                day, every = part.split("%", 1)
+                offset = 0
+                if "+" in every:
+                    every, offset_text = every.split("+", 1)
+                    offset = int(offset_text)
+                if int(every) < 1 or not 0 <= offset < int(every):
+                    raise ValueError("%N+K needs N >= 1 and 0 <= K < N")
+                self.alternate.append((_cron_bits(day, 0, 7, CRON_DAYS), int(every), offset))
+            else:
+                self.weekdays |= _cron_bits(part, 0, 7, CRON_DAYS)
+
+    def _weekday_matches(self, day: date) -> bool:
+        wd = (day.weekday() + 1) % 7
+        if self.weekdays >> wd & 1:
+            return True
+        if (wd, (day.day - 1) // 7 + 1) in self.nth:
+            return True
+        if self.alternate:
+            week = (day - CRON_WEEK_EPOCH).days // 7
+            for bits, every, offset in self.alternate:
+                if bits >> wd & 1 and week % every == offset:
+                    return True
+        return False
 
-    if str(message_id) not in data[str(gid)]["messages"]:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
+    def day_matches(self, day: date) -> bool:
+        if not self.months >> day.month & 1:
+            return False
+        dom = bool(self.days >> day.day & 1)
+        if self.day_or:
+            return dom or self._weekday_matches(day)
+        if self.day_restricted:
+            return dom
+        return not self.weekday_restricted or self._weekday_matches(day)
+
+    def _first_time(self, hour: int, minute: int) -> Optional[Tuple[int, int]]:
+        """Earliest matching (hour, minute) at or after hour:minute on a matching day."""
+        h = _lowest_bit_from(self.hours, hour)
+        if h == hour:
+            m = _lowest_bit_from(self.minutes, minute)
+            if m >= 0:
+                return h, m
+            h = _lowest_bit_from(self.hours, hour + 1)
+        if h < 0:
+            return None
+        return h, _lowest_bit_from(self.minutes, 0)
+
+    def next_after(self, t: datetime) -> Optional[datetime]:
+        """First matching naive local minute strictly after t."""
+        t = t.replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+        day = t.date()
+        start = (t.hour, t.minute)
+        for _ in range(CRON_SEARCH_DAYS):
+            if self.day_matches(day):
+                hm = self._first_time(*start)
+                if hm is not None:
+                    return datetime(day.year, day.month, day.day, *hm)
+            day += timedelta(days=1)
+            start = (0, 0)
+        return None
+
+
+_cron_cache: Dict[str, CronSchedule] = {}
+
+
+def compile_cron(expression: str) -> CronSchedule:
+    """Compiled schedule for an expression (cached); raises ValueError."""
+    cron = _cron_cache.get(expression)
+    if cron is None:
+        cron = CronSchedule(expression)
+        _cron_cache[expression] = cron
+    return cron
+
+
+def dst_transition_end(naive: datetime, tzinfo) -> datetime:
+    """
+    Naive wall time where the DST gap or overlap containing naive ends
+    (the gap's 03:00, the repeated hour's 02:00), found by bisecting the
+    UTC minutes between its two readings for the offset change.
+    """
+    readings = sorted(naive.replace(tzinfo=tzinfo, fold=fold).astimezone(timezone.utc) for fold in (0, 1))
+    lo, hi = epoch_minute(readings[0]), epoch_minute(readings[1])
+    after = readings[1].astimezone(tzinfo).utcoffset()
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if datetime.fromtimestamp(mid * 60, tz=timezone.utc).astimezone(tzinfo).utcoffset() == after:
+            hi = mid
+        else:
+            lo = mid
+    before = datetime.fromtimestamp(lo * 60, tz=timezone.utc).astimezone(tzinfo).utcoffset()
+    change = datetime.fromtimestamp(hi * 60)  # naive UTC
+    return change + max(before, after)
+
+
+def cron_next_minute(cron: CronSchedule, tzinfo, after_minute: int) -> Optional[int]:
+    """First UTC epoch minute after after_minute matching cron in tzinfo."""
+    local = datetime.fromtimestamp(after_minute * 60, tz=timezone.utc).astimezone(tzinfo)
+    # a skipped gap time, or an overlap time whose chosen occurrence is already
+    # past, moves the search to the end of that gap/overlap in one step
+    for _ in range(8):
+        local_next = cron.next_after(local)
+        if local_next is None:
+            return None
+        at = local_to_utc(local_next, tzinfo, DST_NONEXISTENT_POLICY, DST_AMBIGUOUS_POLICY)
+        if at is not None and epoch_minute(at) > after_minute:
+            return epoch_minute(at)
+        local = local_next
+        if local_next.replace(tzinfo=tzinfo, fold=0).utcoffset() != local_next.replace(tzinfo=tzinfo, fold=1).utcoffset():
+            local = max(local, dst_transition_end(local_next, tzinfo) - timedelta(minutes=1))
+    return None
 
-    data[str(gid)]["messages"][str(message_id)] = new_text
-    save_data(data)
 
-    await interaction.response.send_message(
-        f"✏ Updated message {message_id}.",
-        ephemeral=True
-    )
+# ======================================================
+# FIRE SLOT INDEX (UTC second -> guild slots due)
+# ======================================================
+SlotKey = Tuple[int, str]   # (guild id, slot name)
+
+
+def epoch_minute(dt: datetime) -> int:
+    return int(dt.timestamp() // 60)
+
+
+def epoch_second(dt: datetime) -> int:
+    return int(dt.timestamp() // 1)
+
+
+class FireSlotIndex:
+    """
+    Maps absolute UTC seconds to the guild slots with a post due then.
+
+    Entries come from the shared per-zone fire tables, so DST gaps and
+    overlaps follow the configured policies. Slots are grouped by
+    timezone; when a zone's table rolls forward only that zone is
+    re-indexed. A bucket is consumed when it fires, so a second never
+    posts twice.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, Set[SlotKey]] = {}
+        self.slot_fires: Dict[SlotKey, List[int]] = {}
+        self.guild_slots: Dict[int, Set[str]] = {}
+        self.zone_slots: Dict[str, Set[SlotKey]] = {}
+        self.zone_generation: Dict[str, int] = {}
+        self.slot_zone: Dict[SlotKey, str] = {}
+        # cron slots hold only their next fire and are re-armed when it pops
+        self.slot_cron: Dict[SlotKey, Tuple[CronSchedule, str]] = {}
+        self.last_second: Optional[int] = None
+
+    def rebuild(self, now_utc: Optional[datetime] = None, resume_second: Optional[int] = None) -> None:
+        """
+        Re-index every guild. resume_second is the last second a previous
+        lease holder consumed: nothing up to it is indexed or fired again.
+        """
+        now_utc = now_utc or datetime.now(timezone.utc)
+        self.__init__()
+        if resume_second is not None and resume_second <= epoch_second(now_utc) + 60:
+            self.last_second = resume_second  # further ahead is a clock we do not trust
+        for gid in list(data):
+            if gid.isdigit():
+                self.update_guild(int(gid), now_utc)
+
+    def remove_slot(self, key: SlotKey) -> None:
+        self.slot_cron.pop(key, None)
+        for sec in self.slot_fires.pop(key, []):
+            bucket = self.buckets.get(sec)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[sec]
+        names = self.guild_slots.get(key[0])
+        if names is not None:
+            names.discard(key[1])
+            if not names:
+                del self.guild_slots[key[0]]
+        tz_name = self.slot_zone.pop(key, None)
+        if tz_name is not None:
+            members = self.zone_slots.get(tz_name)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self.zone_slots[tz_name]
+                    self.zone_generation.pop(tz_name, None)
+
+    def remove_guild(self, guild_id: int) -> None:
+        for name in list(self.guild_slots.get(guild_id, ())):
+            self.remove_slot((guild_id, name))
+
+    def update_guild(self, guild_id: int, now_utc: Optional[datetime] = None) -> None:
+        """Re-index every slot of a guild (timezone change, clear, reload)."""
+        now_utc = now_utc or datetime.now(timezone.utc)
+        self.remove_guild(guild_id)
+        g = data.get(str(guild_id))
+        if not isinstance(g, dict) or not owns_guild(guild_id):
+            return
+        for name in list(g.get("slots", {})):
+            self.update_slot(guild_id, name, now_utc)
+
+    def update_slot(self, guild_id: int, name: str, now_utc: Optional[datetime] = None) -> None:
+        """Re-index one slot after its timezone, time, channel or schedule changed."""
+        now_utc = now_utc or datetime.now(timezone.utc)
+        key = (guild_id, name)
+        self.remove_slot(key)
+        g = data.get(str(guild_id))
+        if not isinstance(g, dict) or not owns_guild(guild_id):
+            return
+        if g.get("left_at"):
+            return
+        slot = g.get("slots", {}).get(name)
+        if not isinstance(slot, dict) or not isinstance(slot.get("channel"), int):
+            return
+        schedule_data = slot.get("schedule")
+        if not isinstance(schedule_data, dict):
+            return
+        days = {VALID_DAYS.index(d) for d, q in schedule_data.items() if d in VALID_DAYS and q}
+        if not days:
+            return
+
+        tz_name = slot_timezone(g, slot)
+        now_m = epoch_minute(now_utc)
+        if slot.get("cron"):
+            try:
+                cron = compile_cron(slot["cron"])
+            except ValueError:
+                return
+            self.slot_cron[key] = (cron, tz_name)
+            # cron fires on second 0: the first minute starting at or after `first`
+            self._arm_cron(key, (self._first_unconsumed(now_m) - 1) // 60)
+            return
+
+        table = fire_table(tz_name, now_utc)
+        # seconds past the local minute: the slot's own second plus any dispersion
+        offset = slot.get("second", 0) + slot_offset_seconds(guild_id, name, slot)
+        first = self._first_unconsumed(now_m)
+        fires = sorted({
+            epoch_minute(at) * 60 + offset
+            for day, at in table.instants(slot["hour"], slot["minute"])
+            if at is not None and day.weekday() in days and epoch_minute(at) * 60 + offset >= first
+        })
+        for sec in fires:
+            self.buckets.setdefault(sec, set()).add(key)
+        self.slot_fires[key] = fires
+        self.guild_slots.setdefault(guild_id, set()).add(name)
+        self.slot_zone[key] = tz_name
+        self.zone_slots.setdefault(tz_name, set()).add(key)
+        self.zone_generation[tz_name] = table.generation
+
+    def _first_unconsumed(self, now_m: int) -> int:
+        """
+        First epoch second a new fire may be indexed at: nothing the clock
+        has already passed, since due() never scans those seconds again.
+        """
+        if self.last_second is None:
+            return now_m * 60
+        return max(now_m * 60, self.last_second + 1)
+
+    def _arm_cron(self, key: SlotKey, after_minute: int) -> None:
+        """Index the next fire of a cron slot after after_minute (one entry)."""
+        cron, tz_name = self.slot_cron[key]
+        for sec in self.slot_fires.pop(key, []):
+            bucket = self.buckets.get(sec)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[sec]
+        m = cron_next_minute(cron, get_tzinfo(tz_name), after_minute)
+        if m is None:
+            return
+        self.buckets.setdefault(m * 60, set()).add(key)
+        self.slot_fires[key] = [m * 60]
+        self.guild_slots.setdefault(key[0], set()).add(key[1])
+
+    def refresh(self, now_utc: datetime) -> None:
+        """Re-index zones whose fire table rolled forward."""
+        for tz_name in list(self.zone_slots):
+            if fire_table(tz_name, now_utc).generation == self.zone_generation.get(tz_name):
+                continue
+            for guild_id, name in list(self.zone_slots.get(tz_name, ())):
+                self.update_slot(guild_id, name, now_utc)
+
+    def due(self, now_utc: datetime) -> List[Tuple[int, SlotKey]]:
+        """
+        (fire second, slot) for every fire at or before now_utc not yet
+        consumed, oldest first. Fires that elapsed since the previous call
+        are all returned, up to SCHEDULER_CATCHUP_SECONDS back; the first
+        call only takes the current minute (after a rebuild's resume second).
+        """
+        self.refresh(now_utc)
+        now_s = epoch_second(now_utc)
+        if self.last_second is None:
+            start = now_s - now_s % 60
+        else:
+            start = max(self.last_second + 1, now_s - SCHEDULER_CATCHUP_SECONDS)
+        if self.last_second is None or start > self.last_second + 1:
+            # fires were missed (startup, lease handover, a long stall): drop
+            # them, but keep cron slots armed for their next fire
+            for sec in [sec for sec in self.buckets if sec < start]:
+                keys = self.buckets.pop(sec)
+                SCHEDULER_MISSED_FIRES.inc(len(keys))
+                for key in keys:
+                    if key in self.slot_cron:
+                        self._arm_cron(key, (start - 1) // 60)
+        fired: List[Tuple[int, SlotKey]] = []
+        # a clock stepped backwards finds nothing here: those seconds were consumed
+        for sec in range(start, now_s + 1):
+            keys = self.buckets.pop(sec, None)
+            if not keys:
+                continue
+            for key in sorted(keys):
+                fired.append((sec, key))
+                if key in self.slot_cron:
+                    self._arm_cron(key, sec // 60)
+        self.last_second = max(now_s, self.last_second if self.last_second is not None else now_s)
+        return fired
+
+    def peek(self, minute: int) -> List[Tuple[int, SlotKey]]:
+        """(fire second, slot) due within an epoch minute, without consuming the buckets."""
+        return [
+            (sec, key)
+            for sec in range(minute * 60, minute * 60 + 60)
+            for key in sorted(self.buckets.get(sec, ()))
+        ]
+
+    def next_due(self, after_second: int, until_second: int) -> Optional[int]:
+        """First second in (after_second, until_second] with a fire indexed."""
+        for sec in range(after_second + 1, until_second + 1):
+            if sec in self.buckets:
+                return sec
+        return None
+
+    def next_slot_fire(self, key: SlotKey, after_minute: int) -> Optional[int]:
+        """Epoch minute of the first indexed fire of one slot strictly after after_minute."""
+        cron = self.slot_cron.get(key)
+        if cron is not None:
+            return cron_next_minute(cron[0], get_tzinfo(cron[1]), after_minute)
+        for sec in self.slot_fires.get(key, []):
+            if sec // 60 > after_minute:
+                return sec // 60
+        return None
+
+    def next_fire(self, guild_id: int, now_utc: datetime) -> Optional[Tuple[datetime, str]]:
+        """First indexed fire of any slot strictly after now_utc (UTC, slot)."""
+        self.refresh(now_utc)
+        now_s = epoch_second(now_utc)
+        best: Optional[Tuple[int, str]] = None
+        for name in self.guild_slots.get(guild_id, ()):
+            for sec in self.slot_fires.get((guild_id, name), []):
+                if sec > now_s:
+                    if best is None or (sec, name) < best:
+                        best = (sec, name)
+                    break
+        if best is None:
+            return None
+        return datetime.fromtimestamp(best[0], tz=timezone.utc), best[1]
+
+
+migrate_data()
+fire_index = FireSlotIndex()
+fire_index.rebuild()
 
 
-@tree.command(name="removemessage", description="Delete a saved message")
-async def removemessage(interaction: discord.Interaction, message_id: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+# ======================================================
+# MESSAGE TEMPLATES ({date} {weekday} {guild} {next_post})
+# ======================================================
+# A message is compiled once per revision (its text) into literal parts and
+# variables. Renders are cached by (revision, variable values), and those
+# values only change with the date, so pre-flight, the fire minute and
+# outbox retries share one render. Other {words} are left as written.
+TEMPLATE_VARIABLES = ("date", "weekday", "guild", "next_post")
+_TEMPLATE_RE = re.compile(r"\{(" + "|".join(TEMPLATE_VARIABLES) + r")\}")
 
-    if str(message_id) not in data[str(gid)]["messages"]:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
 
-    del data[str(gid)]["messages"][str(message_id)]
-    save_data(data)
+class MessageTemplate:
+    """Message text split into (literal, variable) pairs plus a literal tail."""
 
-    await interaction.response.send_message(
-        f"🗑 Message {message_id} deleted.",
-        ephemeral=True
-    )
+    __slots__ = ("parts", "tail")
 
+    def __init__(self, text: str):
+        self.parts: List[Tuple[str, str]] = []
+        pos = 0
+        for match in _TEMPLATE_RE.finditer(text):
+            self.parts.append((text[pos:match.start()], match.group(1)))
+            pos = match.end()
+        self.tail = text[pos:]
 
-# ======================================================
-# VIEW MESSAGE COMMANDS
-# ======================================================
-@tree.command(name="viewmessage", description="View a specific message by ID")
-async def viewmessage(interaction: discord.Interaction, message_id: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    def render(self, values: Dict[str, str]) -> str:
+        return "".join(literal + values[name] for literal, name in self.parts) + self.tail
 
-    msg = data[str(gid)]["messages"].get(str(message_id))
-    if not msg:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
 
-    parts = split_message(msg)
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text: str) -> MessageTemplate:
+    return MessageTemplate(text)
 
-    await interaction.response.send_message(
-        f"📄 **Message {message_id}:**",
-        ephemeral=True
-    )
-    for p in parts:
-        await interaction.followup.send(p, ephemeral=True)
 
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _render_cached(text: str, values: Tuple[str, ...]) -> str:
+    return compile_template(text).render(dict(zip(TEMPLATE_VARIABLES, values)))
 
-@tree.command(name="viewmessages", description="View all saved messages")
-async def viewmessages(interaction: discord.Interaction):
+
+def render_message(text: str, values: Tuple[str, ...]) -> str:
+    """Fill in a stored message's variables (values from template_values)."""
+    if "{" not in text:
+        return text
+    return _render_cached(text, values)
+
+
+def template_values(guild_id: int, tz_name: str, at_utc: datetime, next_minute: Optional[int]) -> Tuple[str, ...]:
+    """Variable values, in TEMPLATE_VARIABLES order, for a post at at_utc."""
+    local = at_utc.astimezone(get_tzinfo(tz_name))
+    guild = bot.get_guild(guild_id)
+    return (
+        local.strftime(TEMPLATE_DATE_FORMAT),
+        local.strftime("%A"),
+        guild.name if guild is not None else "",
+        # shown in each reader's own timezone
+        f"<t:{next_minute * 60}:F>" if next_minute is not None else "(not scheduled)",
+    )
+
+
+def slot_template_values(guild_id: int, server: Dict[str, Any], slot_name: str, fire_minute: int) -> Tuple[str, ...]:
+    """Template values for a slot's post at fire_minute ({next_post} = that slot's following fire)."""
+    slot = server["slots"][slot_name]
+    fire_at = datetime.fromtimestamp(fire_minute * 60, tz=timezone.utc)
+    next_minute = fire_index.next_slot_fire((guild_id, slot_name), fire_minute)
+    return template_values(guild_id, slot_timezone(server, slot), fire_at, next_minute)
+
+
+# ======================================================
+# OUTBOUND PIPELINE (shared by autopost, postnow and replies)
+# ======================================================
+class OutboundJob:
+    """One post: every text is sent, in order, to a single channel."""
+
+    def __init__(
+        self,
+        channel: discord.abc.Messageable,
+        texts: List[str],
+        path: str,
+        on_done: Optional[Callable[[Optional[BaseException]], Awaitable[None]]] = None,
+    ):
+        self.channel = channel
+        self.texts = texts
+        self.path = path
+        self.lane = path_lane(path)
+        self.on_done = on_done
+        self.enqueued = time.perf_counter()
+        # texts fully sent so far (a failed post resumes after these)
+        self.sent = 0
+        # resolves to None on success or to the exception that stopped the post
+        self.done: "asyncio.Future[Optional[BaseException]]" = asyncio.get_running_loop().create_future()
+
+
+class OutboundPipeline:
+    """
+    One queue per lane, drained by a fixed pool of sender tasks. Every
+    sender takes the highest-priority lane with work; `reserved` extra
+    senders only take the interactive lanes.
+    """
+
+    def __init__(self, workers: int, reserved: int = 0):
+        self.workers = max(1, workers)
+        self.reserved = max(0, reserved)
+        self._lanes: Dict[str, Deque[OutboundJob]] = {lane: deque() for lane in LANES}
+        # idle senders: (lanes they take, future that wakes them)
+        self._idle: List[Tuple[Tuple[str, ...], "asyncio.Future[None]"]] = []
+        self._unfinished = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._tasks: List[asyncio.Task] = []
+
+    def submit(
+        self,
+        channel: discord.abc.Messageable,
+        texts: List[str],
+        path: str,
+        on_done: Optional[Callable[[Optional[BaseException]], Awaitable[None]]] = None,
+    ) -> OutboundJob:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker(INTERACTIVE_LANES if n < self.reserved else LANES))
+                for n in range(self.reserved + self.workers)
+            ]
+        job = OutboundJob(channel, texts, path, on_done)
+        self._lanes[job.lane].append(job)
+        OUTBOUND_QUEUE_DEPTH.set(len(self._lanes[job.lane]), lane=job.lane)
+        self._unfinished += 1
+        self._drained.clear()
+        for i, (lanes, waiter) in enumerate(self._idle):
+            if job.lane in lanes:
+                del self._idle[i]
+                if not waiter.done():
+                    waiter.set_result(None)
+                break
+        return job
+
+    def depth(self, lane: str) -> int:
+        return len(self._lanes[lane])
+
+    async def join(self) -> None:
+        """Wait until everything submitted so far has been sent (or failed)."""
+        await self._drained.wait()
+
+    def _take(self, lanes: Tuple[str, ...]) -> Optional[OutboundJob]:
+        for lane in lanes:
+            if self._lanes[lane]:
+                job = self._lanes[lane].popleft()
+                OUTBOUND_QUEUE_DEPTH.set(len(self._lanes[lane]), lane=lane)
+                return job
+        return None
+
+    async def _worker(self, lanes: Tuple[str, ...]) -> None:
+        while True:
+            job = self._take(lanes)
+            if job is None:
+                waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+                self._idle.append((lanes, waiter))
+                await waiter
+                continue
+            OUTBOUND_WAIT_SECONDS.observe(time.perf_counter() - job.enqueued, lane=job.lane)
+            error: Optional[BaseException] = None
+            try:
+                for text in job.texts:
+                    await send_chunks(job.channel, text, path=job.path)
+                    job.sent += 1
+            except Exception as e:
+                error = e
+            OUTBOUND_JOB_SECONDS.observe(time.perf_counter() - job.enqueued, path=job.path, lane=job.lane)
+            if not job.done.done():
+                job.done.set_result(error)
+            if job.on_done is not None:
+                try:
+                    await job.on_done(error)
+                except Exception as e:
+                    print(f"⚠️ Outbound completion callback failed: {e!r}")
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._drained.set()
+
+
+outbound = OutboundPipeline(OUTBOUND_WORKERS, OUTBOUND_RESERVED_WORKERS)
+
+
+# ======================================================
+# WEBHOOK POSTING (optional per guild, pooled keep-alive session)
+# ======================================================
+_webhook_session: Optional[aiohttp.ClientSession] = None
+_webhook_locks: Dict[int, asyncio.Lock] = {}
+
+
+def webhook_session() -> aiohttp.ClientSession:
+    """One shared session, so webhook posts reuse warm keep-alive connections."""
+    global _webhook_session
+    if _webhook_session is None or _webhook_session.closed:
+        _webhook_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=WEBHOOK_POOL_SIZE, keepalive_timeout=WEBHOOK_KEEPALIVE_SECONDS),
+            trace_configs=[http_trace],
+        )
+    return _webhook_session
+
+
+async def resolve_webhook(guild_id: int, channel: discord.TextChannel) -> discord.Webhook:
+    """
+    The bot's webhook in channel: cached token, else reuse an existing one,
+    else create it. Must not be awaited while holding the guild's lock.
+    """
+    cache: Dict[str, List[Any]] = data[str(guild_id)]["webhook"]["cache"]
+    hit = cache.get(str(channel.id))
+    if hit is None:
+        lock = _webhook_locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            hit = cache.get(str(channel.id))
+            if hit is None:
+                me = bot.user.id if bot.user else None
+                hook = next(
+                    (w for w in await channel.webhooks() if w.token and w.user and w.user.id == me),
+                    None
+                )
+                if hook is None:
+                    hook = await channel.create_webhook(name=WEBHOOK_NAME, reason="Webhook posting mode")
+                    WEBHOOK_EVENTS.inc(event="created")
+                else:
+                    WEBHOOK_EVENTS.inc(event="reused")
+                hit = [hook.id, hook.token]
+                # the Discord calls above stay outside the guild lock; the
+                # cache write is a guild data change like any other
+                async with guild_lock(guild_id):
+                    g = data.get(str(guild_id))
+                    if isinstance(g, dict):
+                        g["webhook"]["cache"][str(channel.id)] = hit
+                        save_data(data)
+    return discord.Webhook.partial(hit[0], hit[1], session=webhook_session())
+
+
+class WebhookTarget:
+    """Stands in for a channel in send_chunks, posting through the channel's webhook."""
+
+    def __init__(self, guild_id: int, channel: discord.TextChannel):
+        self.guild_id = guild_id
+        self.channel = channel
+
+    async def send(self, content: str) -> None:
+        settings = data[str(self.guild_id)]["webhook"]
+        kwargs: Dict[str, Any] = {}
+        if settings.get("name"):
+            kwargs["username"] = settings["name"]
+        if settings.get("avatar_url"):
+            kwargs["avatar_url"] = settings["avatar_url"]
+
+        try:
+            hook = await resolve_webhook(self.guild_id, self.channel)
+        except discord.Forbidden:
+            # missing Manage Webhooks: still deliver, as the bot user
+            WEBHOOK_EVENTS.inc(event="fallback")
+            await self.channel.send(content)
+            return
+        try:
+            await hook.send(content, **kwargs)
+        except discord.NotFound:
+            # webhook was deleted in Discord; forget the token and make a new one
+            settings["cache"].pop(str(self.channel.id), None)
+            WEBHOOK_EVENTS.inc(event="recreated")
+            hook = await resolve_webhook(self.guild_id, self.channel)
+            await hook.send(content, **kwargs)
+
+
+def post_target(guild_id: int, channel: discord.TextChannel) -> discord.abc.Messageable:
+    """Where a guild's posts go: the channel itself, or its webhook in webhook mode."""
+    g = data.get(str(guild_id))
+    if isinstance(g, dict) and g.get("webhook", {}).get("enabled"):
+        return WebhookTarget(guild_id, channel)  # type: ignore[return-value]
+    return channel
+
+
+# ======================================================
+# OUTBOX (durable scheduled posts, retried with backoff)
+# ======================================================
+# Every scheduled post is saved to OUTBOX_FILE before it is sent and removed
+# once all of its chunks are delivered. A failed post waits (jittered
+# exponential backoff) and resumes from the first unsent chunk; after
+# OUTBOX_MAX_AGE_MINUTES, or when its channel is gone, it moves to the
+# guild's dead-letter list (/outbox). Progress is saved once a post ends,
+# not per chunk, so delivery is at-least-once: after a crash mid-send the
+# post restarts from the progress last saved, and chunks already delivered
+# since then are sent again.
+class Outbox:
+    """Pending scheduled posts keyed by guild:slot:fire minute, plus dead letters per guild."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.dead: Dict[str, List[Dict[str, Any]]] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+        raw = _read_data_file(self.path)
+        items = raw.get("items")
+        dead = raw.get("dead")
+        self.items = items if isinstance(items, dict) else {}
+        self.dead = dead if isinstance(dead, dict) else {}
+        for item in self.items.values():
+            if item.get("state") == "sending":
+                # the process stopped mid-send: retry right away
+                item["state"] = "pending"
+                item["next_attempt"] = 0.0
+        self.dirty = False
+        self._update_gauges()
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        # a torn write would lose every pending post and dead letter
+        write_file_atomic(self.path, data_codec.dumps({"items": self.items, "dead": self.dead}))
+        self.dirty = False
+
+    def _update_gauges(self) -> None:
+        pending = sum(1 for item in self.items.values() if item.get("state") == "pending")
+        OUTBOX_ITEMS.set(pending, state="pending")
+        OUTBOX_ITEMS.set(len(self.items) - pending, state="sending")
+        OUTBOX_ITEMS.set(sum(len(v) for v in self.dead.values()), state="dead")
+
+    def add(self, guild_id: int, slot_name: str, channel_id: int, fire_minute: int, chunks: List[str]) -> Optional[Dict[str, Any]]:
+        """Record a post about to be sent; None if this slot's fire minute is already queued."""
+        item_id = f"{guild_id}:{slot_name}:{fire_minute}"
+        if item_id in self.items:
+            return None
+        item = {
+            "id": item_id,
+            "guild": guild_id,
+            "slot": slot_name,
+            "channel": channel_id,
+            "fire_minute": fire_minute,
+            "created": time.time(),
+            "chunks": chunks,
+            "sent": 0,
+            "attempts": 0,
+            "state": "sending",
+            "next_attempt": 0.0,
+            "last_error": None,
+        }
+        self.items[item_id] = item
+        self.dirty = True
+        OUTBOX_EVENTS.inc(event="queued")
+        return item
+
+    def due(self, now: float) -> List[Dict[str, Any]]:
+        return [
+            item for item in self.items.values()
+            if item.get("state") == "pending" and item.get("next_attempt", 0.0) <= now
+        ]
+
+    def dispatch(self, item: Dict[str, Any], target: discord.abc.Messageable) -> OutboundJob:
+        """Send the item's remaining chunks through the outbound pipeline."""
+        item["state"] = "sending"
+        self.dirty = True
+        return outbound.submit(target, item["chunks"][item["sent"]:], "autopost")
+
+    def record(self, item: Dict[str, Any], sent: int, error: Optional[BaseException], now: Optional[float] = None) -> None:
+        """Apply one attempt's outcome: delivered, retry later, or dead letter."""
+        now = time.time() if now is None else now
+        item["sent"] += sent
+        self.dirty = True
+        if error is None and item["sent"] >= len(item["chunks"]):
+            del self.items[item["id"]]
+            OUTBOX_EVENTS.inc(event="delivered")
+            self._update_gauges()
+            return
+
+        item["attempts"] += 1
+        item["last_error"] = repr(error)[:300] if error is not None else None
+        if isinstance(error, (discord.NotFound, LookupError)):
+            self._bury(item, "channel not found", now)
+        elif now - item["created"] > OUTBOX_MAX_AGE_MINUTES * 60:
+            self._bury(item, "too old", now)
+        else:
+            delay = min(OUTBOX_RETRY_MAX_SECONDS, OUTBOX_RETRY_BASE_SECONDS * 2 ** (item["attempts"] - 1))
+            # jitter so posts that failed together don't retry together
+            item["next_attempt"] = now + delay * random.uniform(0.5, 1.0)
+            item["state"] = "pending"
+            OUTBOX_EVENTS.inc(event="retry")
+        self._update_gauges()
+
+    def _bury(self, item: Dict[str, Any], reason: str, now: float) -> None:
+        del self.items[item["id"]]
+        letters = self.dead.setdefault(str(item["guild"]), [])
+        letters.append({
+            "id": item["id"],
+            "slot": item["slot"],
+            "channel": item["channel"],
+            "fire_minute": item["fire_minute"],
+            "attempts": item["attempts"],
+            "sent": item["sent"],
+            "chunks": len(item["chunks"]),
+            "preview": item["chunks"][0][:100] if item["chunks"] else "",
+            "reason": reason,
+            "last_error": item["last_error"],
+            "dead_at": now,
+        })
+        del letters[:-OUTBOX_DEAD_LETTERS]
+        OUTBOX_EVENTS.inc(event="dead")
+        print(f"⚠️ Outbox gave up on {item['id']} ({reason}): {item['last_error']}")
+
+    def for_guild(self, guild_id: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(pending items, dead letters) of one guild."""
+        pending = [item for item in self.items.values() if item.get("guild") == guild_id]
+        return pending, list(self.dead.get(str(guild_id), []))
+
+
+outbox = Outbox(OUTBOX_FILE)
+
+
+async def outbox_target(item: Dict[str, Any]) -> discord.abc.Messageable:
+    """Resolve a retried item's channel; raises when it can't be posted to right now."""
+    if item["channel"] in missing_channels:
+        raise LookupError("channel was deleted")
+    guild = bot.get_guild(item["guild"])
+    if guild is None:
+        raise RuntimeError("guild unavailable")
+    channel = guild.get_channel(item["channel"])
+    if channel is None:
+        try:
+            channel = await bot.fetch_channel(item["channel"])
+        except discord.NotFound:
+            missing_channels.add(item["channel"])
+            raise
+    if not isinstance(channel, discord.TextChannel):
+        raise LookupError("channel is not a text channel")
+    return post_target(item["guild"], channel)
+
+
+async def run_outbox_retries(now: Optional[float] = None) -> int:
+    """Resend every outbox item whose backoff has expired; returns how many were sent."""
+    now = time.time() if now is None else now
+    jobs: List[Tuple[Dict[str, Any], OutboundJob]] = []
+    for item in outbox.due(now):
+        try:
+            target = await outbox_target(item)
+        except Exception as e:
+            outbox.record(item, 0, e, now)
+            continue
+        jobs.append((item, outbox.dispatch(item, target)))
+    outbox.save()
+
+    for item, job in jobs:
+        error = await job.done
+        outbox.record(item, job.sent, error)
+    outbox.save()
+    return len(jobs)
+
+
+# ======================================================
+# EXPORT / IMPORT (JSONL records, split into size-capped parts)
+# Every part starts with a header line and holds whole records, so each
+# part can be imported on its own. Cached webhook tokens are never exported.
+# ======================================================
+EXPORT_FORMAT = "weekly-posting-export"
+EXPORT_VERSION = 1
+
+
+def export_records(source: Dict[str, Any], guild_ids: List[str]) -> Iterator[Dict[str, Any]]:
+    """One "guild" record (settings + slots) then one "message" record per saved message."""
+    for gid in guild_ids:
+        g = source.get(gid)
+        if not isinstance(g, dict):
+            continue
+        webhook = g.get("webhook", {})
+        yield {
+            "type": "guild",
+            "guild": gid,
+            "timezone": g.get("timezone", DEFAULT_TIMEZONE),
+            "slots": g.get("slots", {}),
+            "pools": g.get("pools", {}),
+            "webhook": {key: webhook.get(key) for key in ("enabled", "name", "avatar_url")},
+        }
+        for mid, text in g.get("messages", {}).items():
+            yield {"type": "message", "guild": gid, "id": mid, "text": text}
+
+
+def _export_part(lines: List[bytes], name: str, fmt: str) -> Tuple[str, bytes]:
+    body = b"".join(lines)
+    if fmt != "zip":
+        return f"{name}.jsonl", body
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{name}.jsonl", body)
+    return f"{name}.zip", buf.getvalue()
+
+
+def iter_export_parts(
+    records: Iterator[Dict[str, Any]], prefix: str, fmt: str = "jsonl", part_bytes: int = 0
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (filename, payload) parts of at most part_bytes of JSONL each
+    (zip parts are compressed from that, so they only get smaller). Only one
+    part is held in memory at a time.
+    """
+    part_bytes = part_bytes or EXPORT_PART_BYTES
+    header = CODECS["json"].dumps({"type": "header", "format": EXPORT_FORMAT, "version": EXPORT_VERSION}) + b"\n"
+    lines = [header]
+    size = len(header)
+    n = 0
+    for record in records:
+        line = CODECS["json"].dumps(record) + b"\n"
+        if size + len(line) > part_bytes and len(lines) > 1:
+            n += 1
+            yield _export_part(lines, f"{prefix}-{n:03d}", fmt)
+            lines = [header]
+            size = len(header)
+        lines.append(line)
+        size += len(line)
+    if len(lines) > 1 or n == 0:
+        yield _export_part(lines, f"{prefix}-{n + 1:03d}", fmt)
+
+
+def read_export_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from one exported part (.jsonl, or a .zip of .jsonl files)."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for member in zf.namelist():
+                with zf.open(member) as f:
+                    yield from _read_export_lines(f, f"{path}:{member}")
+    else:
+        with open(path, "rb") as f:
+            yield from _read_export_lines(f, path)
+
+
+def _read_export_lines(f, where: str) -> Iterator[Dict[str, Any]]:
+    first = True
+    for raw in f:
+        if not raw.strip():
+            continue
+        record = _fast_json.loads(raw)
+        if first:
+            if record.get("type") != "header" or record.get("format") != EXPORT_FORMAT:
+                raise ValueError(f"{where} is not a {EXPORT_FORMAT} file")
+            if record.get("version", 0) > EXPORT_VERSION:
+                raise ValueError(f"{where} has export version {record['version']}; this bot reads {EXPORT_VERSION}")
+            first = False
+            continue
+        yield record
+
+
+def import_records(records: Iterator[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Rebuild (normalized) guild entries from export records of one or more parts."""
+    guilds: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        gid = str(record.get("guild", ""))
+        if not gid.isdigit():
+            continue
+        g = guilds.setdefault(gid, {"messages": {}})
+        if record.get("type") == "guild":
+            g["timezone"] = record.get("timezone")
+            g["slots"] = record.get("slots")
+            g["pools"] = record.get("pools")
+            g["webhook"] = record.get("webhook")
+        elif record.get("type") == "message":
+            g["messages"][str(record.get("id"))] = record.get("text")
+    for g in guilds.values():
+        g["messages"] = {mid: text for mid, text in g["messages"].items() if isinstance(text, str)}
+        normalize_guild(g)
+    return guilds
+
+
+def run_export(out_dir: str, guild_id: Optional[str], fmt: str, part_bytes: int) -> None:
+    """CLI: write this data file's guilds (or one guild) as parts into out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    guild_ids = [guild_id] if guild_id else sorted(gid for gid in data if gid.isdigit())
+    prefix = f"export-{guild_id or 'all'}"
+    for name, payload in iter_export_parts(export_records(data, guild_ids), prefix, fmt, part_bytes):
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(payload)
+        print(f"📦 {name} ({len(payload)} bytes)")
+
+
+def run_import(paths: List[str]) -> None:
+    """
+    CLI: merge exported parts into the data file (replaces the guilds they
+    contain). Holds the scheduler lease while writing, so a running bot
+    cannot save its in-memory copy over the import afterwards.
+    """
+    if not scheduler_lease.try_acquire():
+        print(f"❌ ERROR: {LEASE_FILE} is held by a running bot; stop it before importing.")
+        raise SystemExit(1)
+    try:
+        # re-read under the lease: the last holder may have saved since startup
+        data.clear()
+        data.update(load_data())
+        records = (record for path in paths for record in read_export_file(path))
+        imported = import_records(records)
+        data.update(imported)
+        save_data(data)
+    finally:
+        scheduler_lease.release()
+    print(f"📥 Imported {len(imported)} guild(s) into {DATA_FILE}.")
+
+
+# ======================================================
+# BOT SETUP
+# ======================================================
+if DISCORD_API_BASE:
+    # Channel sends, interaction callbacks and followups all build on Route.BASE
+    discord.http.Route.BASE = DISCORD_API_BASE.rstrip("/")
+
+if CLIENT_PROFILE == "full":
+    intents = discord.Intents.default()
+    intents.message_content = False  # using slash commands only
+    client_options: Dict[str, Any] = {}
+else:
+    # Lean: slash commands and posting only need guilds and their channels.
+    # No member/presence/message caches and no member chunking at startup
+    # (the bot's own member is always cached, so permission checks work).
+    intents = discord.Intents.none()
+    intents.guilds = True
+    client_options = {
+        "max_messages": None,
+        "chunk_guilds_at_startup": False,
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+    }
+
+
+async def _on_http_response(session, ctx, params: aiohttp.TraceRequestEndParams) -> None:
+    status = params.response.status
+    HTTP_RESPONSES.inc(status=f"{status // 100}xx")
+    if status == 429:
+        HTTP_RATELIMITED.inc()
+
+
+http_trace = aiohttp.TraceConfig()
+http_trace.on_request_end.append(_on_http_response)
+
+if SHARD_COUNT_SETTING:
+    bot: discord.Client = discord.AutoShardedClient(
+        intents=intents,
+        http_trace=http_trace,
+        shard_count=SHARD_COUNT,
+        shard_ids=SHARD_IDS,
+        **client_options,
+    )
+else:
+    bot = discord.Client(intents=intents, http_trace=http_trace, **client_options)
+
+
+# ======================================================
+# COMMAND MIDDLEWARE (timing + auto-defer + guild locks)
+# ======================================================
+_guild_locks: Dict[int, asyncio.Lock] = {}
+
+
+def guild_lock(guild_id: int) -> asyncio.Lock:
+    """One lock per guild, held across read-modify-write of data[gid]."""
+    lock = _guild_locks.get(guild_id)
+    if lock is None:
+        lock = _guild_locks[guild_id] = asyncio.Lock()
+    return lock
+
+
+def guild_locked(func):
+    """
+    Run a command callback while holding its guild's lock, so two commands
+    for one guild never interleave around an await. Aliases call the locked
+    callback, so they must not be decorated themselves (the lock is not
+    re-entrant).
+    """
+    @functools.wraps(func)
+    async def wrapper(interaction: discord.Interaction, *args: Any, **kwargs: Any):
+        if interaction.guild_id is None:
+            return await func(interaction, *args, **kwargs)
+        async with guild_lock(interaction.guild_id):
+            return await func(interaction, *args, **kwargs)
+    return wrapper
+
+
+def _interaction_age(interaction: discord.Interaction) -> float:
+    return (discord.utils.utcnow() - interaction.created_at).total_seconds()
+
+
+def _mark_acked(interaction: discord.Interaction) -> None:
+    interaction.extras.setdefault("acked_age", _interaction_age(interaction))
+
+
+async def reply(interaction: discord.Interaction, content: Optional[str] = None, **kwargs: Any) -> None:
+    """Answer an interaction, falling back to a followup once it was deferred."""
+    await send_budget.acquire("interaction")
+    if not interaction.response.is_done():
+        try:
+            await interaction.response.send_message(content, **kwargs)
+            _mark_acked(interaction)
+            return
+        except discord.InteractionResponded:
+            pass
+        except discord.HTTPException as e:
+            if e.code != 40060:  # "Interaction has already been acknowledged"
+                raise
+    await interaction.followup.send(content, **kwargs)
+
+
+class FollowupTarget:
+    """Stands in for a channel in send_chunks, posting as interaction followups."""
+
+    def __init__(self, interaction: discord.Interaction, **kwargs: Any):
+        self.interaction = interaction
+        self.kwargs = kwargs
+
+    async def send(self, content: str) -> None:
+        await self.interaction.followup.send(content, **self.kwargs)
+
+
+async def reply_chunks(interaction: discord.Interaction, texts: List[str], **kwargs: Any) -> None:
+    """Send long replies through the interaction lane of the outbound pipeline and wait for them."""
+    error = await outbound.submit(FollowupTarget(interaction, **kwargs), texts, "interaction").done
+    if error is not None:
+        raise error
+
+
+async def _auto_defer(interaction: discord.Interaction) -> None:
+    await asyncio.sleep(max(0.0, COMMAND_ACK_BUDGET - _interaction_age(interaction)))
+    if interaction.response.is_done():
+        return
+    command = interaction.command
+    public = bool(command is not None and command.extras.get("public"))
+    await send_budget.acquire("interaction")
+    try:
+        await interaction.response.defer(ephemeral=not public, thinking=True)
+    except (discord.InteractionResponded, discord.HTTPException):
+        return
+    _mark_acked(interaction)
+    interaction.extras["auto_deferred"] = True
+
+
+class TimedCommandTree(app_commands.CommandTree):
+    """Command tree that times every handler and defers the slow ones."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if not scheduler_lease.held:
+            # hot standby: the lease holder answers; not a slow or failed command
+            interaction.extras["standby"] = True
+            command = interaction.command
+            name = command.qualified_name if command is not None else "unknown"
+            COMMAND_ACK_OUTCOMES.inc(command=name, outcome="standby")
+            return False
+        interaction.extras["started"] = time.perf_counter()
+        interaction.extras["defer_task"] = asyncio.create_task(_auto_defer(interaction))
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        if interaction.extras.get("standby") and isinstance(error, app_commands.CheckFailure):
+            return  # counted in interaction_check; no timing, no traceback
+        finish_command(interaction, "error")
+        await super().on_error(interaction, error)
+
+
+tree = TimedCommandTree(bot)
+
+
+def finish_command(interaction: discord.Interaction, outcome: str) -> None:
+    """Stop the defer watchdog and record handler time and ack statistics."""
+    if interaction.extras.get("standby"):
+        return  # a standby rejection is counted once, as "standby"
+    task = interaction.extras.pop("defer_task", None)
+    if task is not None:
+        task.cancel()
+
+    command = interaction.command
+    name = command.qualified_name if command is not None else "unknown"
+    started = interaction.extras.get("started")
+    if started is not None:
+        COMMAND_SECONDS.observe(time.perf_counter() - started, command=name, outcome=outcome)
+
+    acked_age = interaction.extras.get("acked_age")
+    if acked_age is None and interaction.response.is_done():
+        acked_age = _interaction_age(interaction)  # e.g. send_modal; bounded by now
+    if acked_age is None:
+        ack_outcome = "timeout"
+    else:
+        COMMAND_ACK_SECONDS.observe(acked_age, command=name)
+        if acked_age > INTERACTION_ACK_DEADLINE:
+            ack_outcome = "timeout"
+        elif interaction.extras.get("auto_deferred"):
+            ack_outcome = "auto_deferred"
+        elif acked_age >= COMMAND_ACK_BUDGET:
+            ack_outcome = "near_miss"
+        else:
+            ack_outcome = "ok"
+    COMMAND_ACK_OUTCOMES.inc(command=name, outcome=ack_outcome)
+    if ack_outcome == "timeout":
+        print(f"⚠️ /{name} was not acknowledged within {INTERACTION_ACK_DEADLINE:.0f}s.")
+
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command) -> None:
+    finish_command(interaction, "ok")
+
+
+# ======================================================
+# ADD MESSAGE COMMANDS
+# ======================================================
+@tree.command(name="addmessage", description="Save a message to the bot")
+@guild_locked
+async def addmessage(interaction: discord.Interaction, message_id: int, text: str):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    data[str(gid)]["messages"][str(message_id)] = text
+    save_data(data)
+
+    await reply(
+        interaction,
+        f"✔ Message {message_id} saved.",
+        ephemeral=True
+    )
+
+
+# Popup modal for multiline message
+class AddMessageModal(discord.ui.Modal, title="Add Multi-Line Message"):
+    text = discord.ui.TextInput(
+        label="Message",
+        style=discord.TextStyle.paragraph,
+        required=True
+    )
+
+    async def on_submit(self, interaction: discord.Interaction) -> None:
+        gid = safe_guild_id(interaction)
+        async with guild_lock(gid):
+            ensure_guild(gid)
+
+            messages: Dict[str, str] = data[str(gid)]["messages"]
+            new_id = str(max([int(i) for i in messages] + [0]) + 1)
+
+            data[str(gid)]["messages"][new_id] = str(self.text)
+            save_data(data)
+
+            await reply(
+                interaction,
+                f"✔ Saved as message {new_id}.",
+                ephemeral=True
+            )
+
+
+@tree.command(name="addmessagepopup", description="Add a multiline message using a popup")
+async def addmessagepopup(interaction: discord.Interaction):
+    await interaction.response.send_modal(AddMessageModal())
+
+
+# ======================================================
+# EDIT / REMOVE MESSAGE
+# ======================================================
+@tree.command(name="editmessage", description="Edit a saved message")
+@guild_locked
+async def editmessage(
+    interaction: discord.Interaction,
+    message_id: int,
+    new_text: str
+):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    if str(message_id) not in data[str(gid)]["messages"]:
+        return await reply(
+            interaction,
+            "❌ Message not found.",
+            ephemeral=True
+        )
+
+    data[str(gid)]["messages"][str(message_id)] = new_text
+    save_data(data)
+
+    await reply(
+        interaction,
+        f"✏ Updated message {message_id}.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="removemessage", description="Delete a saved message")
+@guild_locked
+async def removemessage(interaction: discord.Interaction, message_id: int):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    if str(message_id) not in data[str(gid)]["messages"]:
+        return await reply(
+            interaction,
+            "❌ Message not found.",
+            ephemeral=True
+        )
+
+    del data[str(gid)]["messages"][str(message_id)]
+    for pool in data[str(gid)]["pools"].values():
+        pool_remove_message(pool, message_id)
+    save_data(data)
+
+    await reply(
+        interaction,
+        f"🗑 Message {message_id} deleted.",
+        ephemeral=True
+    )
+
+
+# ======================================================
+# VIEW MESSAGE COMMANDS
+# ======================================================
+@tree.command(name="viewmessage", description="View a specific message by ID")
+async def viewmessage(interaction: discord.Interaction, message_id: int):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    msg = data[str(gid)]["messages"].get(str(message_id))
+    if not msg:
+        return await reply(
+            interaction,
+            "❌ Message not found.",
+            ephemeral=True
+        )
+
+    parts = split_message(msg)
+
+    await reply(
+        interaction,
+        f"📄 **Message {message_id}:**",
+        ephemeral=True
+    )
+    await reply_chunks(interaction, parts, ephemeral=True)
+
+
+@tree.command(name="viewmessages", description="View all saved messages", extras={"public": True})
+async def viewmessages(interaction: discord.Interaction):
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
 
     msgs = data[str(gid)]["messages"]
     if not msgs:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "No saved messages.",
             ephemeral=True
         )
@@ -388,107 +2779,132 @@ async def viewmessages(interaction: discord.Interaction):
         colour=discord.Colour.blurple()
     )
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    await reply(interaction, embed=embed, ephemeral=False)
 
 
 # ======================================================
 # ADVANCED SCHEDULER (MULTI-MESSAGE PER DAY)
 # ======================================================
+async def slot_not_found(interaction: discord.Interaction, name: str) -> None:
+    await reply(
+        interaction,
+        f"❌ Slot `{name}` not found. Use `/slotlist` to see this server's slots.",
+        ephemeral=True
+    )
+
+
 @tree.command(name="schedule", description="Add a message to a day's schedule (append)")
+@guild_locked
 async def schedule(
     interaction: discord.Interaction,
     day: str,
-    message_id: int
+    message_id: int,
+    slot: str = DEFAULT_SLOT
 ):
     gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
 
     if day not in VALID_DAYS:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Invalid day. Use Monday, Tuesday, etc.",
             ephemeral=True
         )
 
     guild_data = data[str(gid)]
     if str(message_id) not in guild_data["messages"]:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Message ID does not exist.",
             ephemeral=True
         )
 
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
     current = schedule_data.get(day, [])
     current.append(message_id)
     schedule_data[day] = current
     save_data(data)
+    fire_index.update_slot(gid, slot_name)
 
-    await interaction.response.send_message(
-        f"📅 Added message `{message_id}` to **{day}** queue position {len(current)}.",
+    await reply(
+        interaction,
+        f"📅 Added message `{message_id}` to **{day}** (`{slot_name}`) queue position {len(current)}.",
         ephemeral=True
     )
 
 
-@tree.command(name="schedulelist", description="View ordered schedule for a specific day")
-async def schedulelist(interaction: discord.Interaction, day: str):
+@tree.command(name="schedulelist", description="View ordered schedule for a specific day", extras={"public": True})
+async def schedulelist(interaction: discord.Interaction, day: str, slot: str = DEFAULT_SLOT):
     gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
 
     if day not in VALID_DAYS:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Invalid day.",
             ephemeral=True
         )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
     queue = schedule_data.get(day, [])
 
     if not queue:
-        return await interaction.response.send_message(
-            f"📅 No messages scheduled for **{day}**.",
+        return await reply(
+            interaction,
+            f"📅 No messages scheduled for **{day}** (`{slot_name}`).",
             ephemeral=True
         )
 
     lines = []
     for idx, mid in enumerate(queue, start=1):
-        lines.append(f"**{idx}.** Message `{mid}`")
+        lines.append(f"**{idx}.** {describe_entry(mid)}")
 
     embed = discord.Embed(
-        title=f"📅 {day} Schedule",
-        description="\n".join(lines),
+        title=f"📅 {day} Schedule ({slot_name})",
+        description=clip_lines(lines, 4096),
         colour=discord.Colour.blurple()
     )
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    await reply(interaction, embed=embed, ephemeral=False)
 
 
 @tree.command(name="scheduleremove", description="Remove a message by index from a day's schedule")
+@guild_locked
 async def scheduleremove(
     interaction: discord.Interaction,
     day: str,
-    index: int
+    index: int,
+    slot: str = DEFAULT_SLOT
 ):
     gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
 
     if day not in VALID_DAYS:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Invalid day.",
             ephemeral=True
         )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
     queue = schedule_data.get(day, [])
 
     if not queue:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
+        return await reply(
+            interaction,
+            f"❌ No schedule for **{day}** (`{slot_name}`).",
             ephemeral=True
         )
 
     if index < 1 or index > len(queue):
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             f"❌ Index must be between 1 and {len(queue)}.",
             ephemeral=True
         )
@@ -500,42 +2916,50 @@ async def scheduleremove(
         del schedule_data[day]
 
     save_data(data)
+    fire_index.update_slot(gid, slot_name)
 
-    await interaction.response.send_message(
-        f"🗑 Removed message `{removed}` from **{day}** at position {index}.",
+    await reply(
+        interaction,
+        f"🗑 Removed message `{removed}` from **{day}** (`{slot_name}`) at position {index}.",
         ephemeral=True
     )
 
 
 @tree.command(name="schedulemove", description="Reorder items in a day's schedule")
+@guild_locked
 async def schedulemove(
     interaction: discord.Interaction,
     day: str,
     from_index: int,
-    to_index: int
+    to_index: int,
+    slot: str = DEFAULT_SLOT
 ):
     gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
 
     if day not in VALID_DAYS:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Invalid day.",
             ephemeral=True
         )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
     queue = schedule_data.get(day, [])
 
     if not queue:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
+        return await reply(
+            interaction,
+            f"❌ No schedule for **{day}** (`{slot_name}`).",
             ephemeral=True
         )
 
     n = len(queue)
     if from_index < 1 or from_index > n or to_index < 1 or to_index > n:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             f"❌ Indexes must be between 1 and {n}.",
             ephemeral=True
         )
@@ -545,143 +2969,643 @@ async def schedulemove(
     schedule_data[day] = queue
     save_data(data)
 
-    await interaction.response.send_message(
-        f"🔁 Moved message `{item}` from position {from_index} to {to_index} on **{day}**.",
+    await reply(
+        interaction,
+        f"🔁 Moved message `{item}` from position {from_index} to {to_index} on **{day}** (`{slot_name}`).",
         ephemeral=True
     )
 
 
 @tree.command(name="scheduleclear", description="Clear all scheduled messages for a day")
-async def scheduleclear(interaction: discord.Interaction, day: str):
+@guild_locked
+async def scheduleclear(interaction: discord.Interaction, day: str, slot: str = DEFAULT_SLOT):
     gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
 
     if day not in VALID_DAYS:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Invalid day.",
             ephemeral=True
         )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
 
     if day not in schedule_data:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
+        return await reply(
+            interaction,
+            f"❌ No schedule for **{day}** (`{slot_name}`).",
             ephemeral=True
         )
 
     del schedule_data[day]
     save_data(data)
+    fire_index.update_slot(gid, slot_name)
 
-    await interaction.response.send_message(
-        f"🧹 Cleared schedule for **{day}**.",
+    await reply(
+        interaction,
+        f"🧹 Cleared schedule for **{day}** (`{slot_name}`).",
         ephemeral=True
     )
 
 
 @tree.command(name="removeschedule", description="(Alias) Clear all messages for a day")
-async def removeschedule(interaction: discord.Interaction, day: str):
-    await scheduleclear.callback(interaction, day=day)  # type: ignore
+async def removeschedule(interaction: discord.Interaction, day: str, slot: str = DEFAULT_SLOT):
+    await scheduleclear.callback(interaction, day=day, slot=slot)  # type: ignore
 
 
 # ======================================================
-# VIEWSCHEDULE / VIEWSETTINGS
+# POST SLOTS (several channels / times per server)
 # ======================================================
-@tree.command(name="viewschedule", description="View weekly schedule summary")
-async def viewschedule(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+def describe_slot(guild: Optional[discord.Guild], g: Dict[str, Any], name: str, slot: Dict[str, Any]) -> str:
+    channel_id = slot.get("channel")
+    if channel_id is None:
+        channel_text = "no channel"
+    else:
+        ch = guild.get_channel(channel_id) if guild is not None else None
+        channel_text = ch.mention if isinstance(ch, discord.TextChannel) else "invalid / deleted channel"
+    days = sum(1 for d in VALID_DAYS if slot["schedule"].get(d))
+    offset = slot_offset_seconds(guild.id, name, slot) if guild is not None else 0
+    return (
+        f"• `{name}` → {channel_text} at {slot_when(slot, offset)} "
+        f"({slot_timezone(g, slot)}), {days} day(s) scheduled"
+    )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
 
-    lines: List[str] = []
-    for d in VALID_DAYS:
-        queue = schedule_data.get(d, [])
-        if queue:
-            ids = ", ".join(str(mid) for mid in queue)
-            lines.append(f"**{d}** → `{ids}`")
-        else:
-            lines.append(f"**{d}** → *(none)*")
+def clock_text(hour: int, minute: int, second: int = 0) -> str:
+    """HH:MM, or HH:MM:SS when the time has seconds."""
+    return f"{hour:02d}:{minute:02d}:{second:02d}" if second else f"{hour:02d}:{minute:02d}"
 
-    embed = discord.Embed(
-        title="📅 Weekly Schedule",
-        description="\n".join(lines),
-        colour=discord.Colour.blurple()
-    )
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+def slot_when(slot: Dict[str, Any], offset: int = 0) -> str:
+    if slot.get("cron"):
+        return f"cron `{slot['cron']}`"
+    when = clock_text(slot["hour"], slot["minute"], slot.get("second", 0))
+    if offset:
+        return f"{when} (+{offset // 60}m{offset % 60:02d}s, spread)"
+    return when
 
 
-@tree.command(name="viewchannel", description="Show configured auto-post channel")
-async def viewchannel(interaction: discord.Interaction):
+@tree.command(name="slotadd", description="Add a posting slot (its own channel, time and schedule)")
+@guild_locked
+async def slotadd(
+    interaction: discord.Interaction,
+    name: str,
+    channel: discord.abc.GuildChannel,
+    hour: Optional[int] = None,
+    minute: Optional[int] = None,
+    timezone_name: Optional[str] = None
+):
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
-
-    guild = interaction.guild
-    if guild is None:
-        return await interaction.response.send_message(
-            "❌ Cannot be used in DMs.",
+    # leaving both out keeps the default time (which dispersion may spread)
+    time_set = hour is not None or minute is not None
+    hour = DEFAULT_POST_HOUR if hour is None else hour
+    minute = DEFAULT_POST_MINUTE if minute is None else minute
+
+    slot_name = normalize_slot_name(name)
+    if slot_name is None:
+        return await reply(
+            interaction,
+            "❌ Slot names are 1-32 characters of a-z, 0-9, `_` or `-`.",
             ephemeral=True
         )
 
-    guild_data = data[str(gid)]
-    channel_id = guild_data.get("post_channel")
-    if channel_id is None:
-        return await interaction.response.send_message(
-            "❌ No auto-post channel set.",
+    slots = data[str(gid)]["slots"]
+    if slot_name in slots:
+        return await reply(interaction, f"❌ Slot `{slot_name}` already exists.", ephemeral=True)
+    if len(slots) >= MAX_SLOTS_PER_GUILD:
+        return await reply(
+            interaction,
+            f"❌ This server already has the maximum of {MAX_SLOTS_PER_GUILD} slots.",
             ephemeral=True
         )
 
-    channel = guild.get_channel(channel_id)
-    if not isinstance(channel, discord.TextChannel):
-        return await interaction.response.send_message(
-            "⚠️ Channel not found or not a text channel.",
+    try:
+        text_ch = safe_text_channel(channel)
+    except ValueError:
+        return await reply(
+            interaction,
+            "❌ Select a normal text channel.",
             ephemeral=True
         )
 
-    await interaction.response.send_message(
-        f"📌 Auto-posting in: {channel.mention}",
-        ephemeral=False
+    if hour < 0 or hour > 23:
+        return await reply(interaction, "❌ Hour must be 0-23.", ephemeral=True)
+    if minute < 0 or minute > 59:
+        return await reply(interaction, "❌ Minute must be 0-59.", ephemeral=True)
+
+    new = new_slot(text_ch.id, hour, minute)
+    new["time_set"] = time_set
+    if timezone_name is not None:
+        tz_name = timezone_name.strip()
+        if not validate_timezone(tz_name):
+            return await reply(
+                interaction,
+                "❌ Invalid timezone. See `/timezoneexamples`.",
+                ephemeral=True
+            )
+        new["timezone"] = tz_name
+
+    slots[slot_name] = new
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"➕ Slot `{slot_name}` posts in {text_ch.mention} at **{hour:02d}:{minute:02d}** "
+        f"({slot_timezone(data[str(gid)], new)}). Add messages with `/schedule <day> <id> {slot_name}`.",
+        ephemeral=True
     )
 
 
-@tree.command(name="viewsettings", description="Full server bot settings")
+@tree.command(name="slotremove", description="Remove a posting slot and its schedule")
+@guild_locked
+async def slotremove(interaction: discord.Interaction, name: str):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, name)
+    if slot_data is None:
+        return await slot_not_found(interaction, name)
+
+    del data[str(gid)]["slots"][slot_name]
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"🗑 Slot `{slot_name}` removed.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="slotlist", description="List this server's posting slots", extras={"public": True})
+async def slotlist(interaction: discord.Interaction):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    g = data[str(gid)]
+    slots: Dict[str, Dict[str, Any]] = g["slots"]
+    if not slots:
+        return await reply(
+            interaction,
+            "📭 No posting slots. Add one with `/slotadd`.",
+            ephemeral=True
+        )
+
+    lines = [describe_slot(interaction.guild, g, name, slots[name]) for name in sorted(slots)]
+    embed = discord.Embed(
+        title=f"🗂 Posting Slots ({len(slots)})",
+        description=clip_lines(lines, 4096),
+        colour=discord.Colour.blurple()
+    )
+    await reply(interaction, embed=embed, ephemeral=False)
+
+
+@tree.command(name="slotchannel", description="Set the channel a posting slot posts in")
+@guild_locked
+async def slotchannel(
+    interaction: discord.Interaction,
+    name: str,
+    channel: discord.abc.GuildChannel
+):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, name)
+    if slot_data is None:
+        return await slot_not_found(interaction, name)
+
+    try:
+        text_ch = safe_text_channel(channel)
+    except ValueError:
+        return await reply(
+            interaction,
+            "❌ Select a normal text channel.",
+            ephemeral=True
+        )
+
+    slot_data["channel"] = text_ch.id
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"📌 Slot `{slot_name}` now posts in {text_ch.mention}.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="slottime", description="Set a posting slot's daily time")
+@guild_locked
+async def slottime(interaction: discord.Interaction, name: str, hour: int, minute: int, second: int = 0):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, name)
+    if slot_data is None:
+        return await slot_not_found(interaction, name)
+
+    if hour < 0 or hour > 23:
+        return await reply(interaction, "❌ Hour must be 0-23.", ephemeral=True)
+    if minute < 0 or minute > 59:
+        return await reply(interaction, "❌ Minute must be 0-59.", ephemeral=True)
+    if second < 0 or second > 59:
+        return await reply(interaction, "❌ Second must be 0-59.", ephemeral=True)
+
+    slot_data["hour"] = hour
+    slot_data["minute"] = minute
+    slot_data["second"] = second
+    slot_data["time_set"] = True
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"⏰ Slot `{slot_name}` posts at **{clock_text(hour, minute, second)}** "
+        f"({slot_timezone(data[str(gid)], slot_data)}).",
+        ephemeral=True
+    )
+
+
+@tree.command(name="slotcron", description="Post on a cron schedule, e.g. '0 9 * * MON#1' (or 'off')")
+@guild_locked
+async def slotcron(interaction: discord.Interaction, name: str, expression: str):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, name)
+    if slot_data is None:
+        return await slot_not_found(interaction, name)
+
+    if expression.strip().lower() == "off":
+        slot_data["cron"] = None
+    else:
+        try:
+            slot_data["cron"] = compile_cron(expression).expression
+        except ValueError as e:
+            return await reply(
+                interaction,
+                f"❌ {e}.\n"
+                "Format: `minute hour day-of-month month day-of-week`, e.g. `0 */6 * * *`, "
+                "`30 9 * * MON#1` (first Monday), `0 18 * * TUE%2` (every other Tuesday).",
+                ephemeral=True
+            )
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    if slot_data["cron"] is None:
+        text = f"⏰ Slot `{slot_name}` is back to its daily time {slot_when(slot_data)}."
+    else:
+        text = (
+            f"⏰ Slot `{slot_name}` now fires on {slot_when(slot_data)} "
+            f"({slot_timezone(data[str(gid)], slot_data)}) and posts that day's queue."
+        )
+    await reply(interaction, text, ephemeral=True)
+
+
+@tree.command(name="slottimezone", description="Give a posting slot its own timezone (or 'server' to follow the server)")
+@guild_locked
+async def slottimezone(interaction: discord.Interaction, name: str, timezone_name: str):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, name)
+    if slot_data is None:
+        return await slot_not_found(interaction, name)
+
+    tz_name = timezone_name.strip()
+    if tz_name.lower() == "server":
+        slot_data["timezone"] = None
+    elif validate_timezone(tz_name):
+        slot_data["timezone"] = tz_name
+    else:
+        return await reply(
+            interaction,
+            "❌ Invalid timezone. See `/timezoneexamples`, or use `server`.",
+            ephemeral=True
+        )
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"🌍 Slot `{slot_name}` timezone is **{slot_timezone(data[str(gid)], slot_data)}**.",
+        ephemeral=True
+    )
+
+
+# ======================================================
+# ROTATION POOLS (one message per fire from a pool)
+# ======================================================
+def find_pool(guild_id: int, name: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """(normalized name, pool) for a user-typed pool name; pool is None if missing."""
+    ensure_guild(guild_id)
+    pool_name = normalize_slot_name(name)
+    if pool_name is None:
+        return name, None
+    return pool_name, data[str(guild_id)]["pools"].get(pool_name)
+
+
+async def pool_not_found(interaction: discord.Interaction, name: str) -> None:
+    await reply(
+        interaction,
+        f"❌ Pool `{name}` not found. Use `/poolview` to see this server's pools.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="poolcreate", description="Create a rotation pool (each fire posts its next message)")
+@guild_locked
+async def poolcreate(interaction: discord.Interaction, name: str, mode: str = "sequence"):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    pool_name = normalize_slot_name(name)
+    if pool_name is None:
+        return await reply(
+            interaction,
+            "❌ Pool names are 1-32 characters of a-z, 0-9, `_` or `-`.",
+            ephemeral=True
+        )
+    if mode not in POOL_MODES:
+        return await reply(interaction, "❌ Mode must be `sequence` or `random`.", ephemeral=True)
+
+    pools = data[str(gid)]["pools"]
+    if pool_name in pools:
+        return await reply(interaction, f"❌ Pool `{pool_name}` already exists.", ephemeral=True)
+
+    pools[pool_name] = new_pool(mode)
+    save_data(data)
+
+    await reply(
+        interaction,
+        f"🔁 Created {mode} pool `{pool_name}`. Add messages with `/pooladd {pool_name} <id>`, "
+        f"then schedule it with `/schedulepool <day> {pool_name}`.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="pooldelete", description="Delete a rotation pool and remove it from every schedule")
+@guild_locked
+async def pooldelete(interaction: discord.Interaction, name: str):
+    gid = safe_guild_id(interaction)
+    pool_name, pool = find_pool(gid, name)
+    if pool is None:
+        return await pool_not_found(interaction, name)
+
+    guild_data = data[str(gid)]
+    del guild_data["pools"][pool_name]
+    ref = pool_ref(pool_name)
+    for slot_name, slot in guild_data["slots"].items():
+        schedule_data = slot["schedule"]
+        for day in [d for d, q in schedule_data.items() if ref in q]:
+            schedule_data[day] = [entry for entry in schedule_data[day] if entry != ref]
+            if not schedule_data[day]:
+                del schedule_data[day]
+        fire_index.update_slot(gid, slot_name)
+    save_data(data)
+
+    await reply(interaction, f"🗑 Pool `{pool_name}` deleted.", ephemeral=True)
+
+
+@tree.command(name="pooladd", description="Add a message to a rotation pool (or change its weight)")
+@guild_locked
+async def pooladd(interaction: discord.Interaction, name: str, message_id: int, weight: int = 1):
+    gid = safe_guild_id(interaction)
+    pool_name, pool = find_pool(gid, name)
+    if pool is None:
+        return await pool_not_found(interaction, name)
+
+    if str(message_id) not in data[str(gid)]["messages"]:
+        return await reply(
+            interaction,
+            "❌ Message ID does not exist.",
+            ephemeral=True
+        )
+    if weight < 1 or weight > MAX_POOL_WEIGHT:
+        return await reply(interaction, f"❌ Weight must be 1-{MAX_POOL_WEIGHT}.", ephemeral=True)
+
+    pool_set_message(pool, message_id, weight)
+    save_data(data)
+
+    weight_text = f" (weight {weight})" if pool["mode"] == "random" else ""
+    await reply(
+        interaction,
+        f"🔁 Pool `{pool_name}` now rotates {len(pool['messages'])} message(s); added `{message_id}`{weight_text}.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="poolremove", description="Remove a message from a rotation pool")
+@guild_locked
+async def poolremove(interaction: discord.Interaction, name: str, message_id: int):
+    gid = safe_guild_id(interaction)
+    pool_name, pool = find_pool(gid, name)
+    if pool is None:
+        return await pool_not_found(interaction, name)
+
+    if not pool_remove_message(pool, message_id):
+        return await reply(
+            interaction,
+            f"❌ Message `{message_id}` is not in pool `{pool_name}`.",
+            ephemeral=True
+        )
+    save_data(data)
+
+    await reply(
+        interaction,
+        f"🗑 Removed message `{message_id}` from pool `{pool_name}`.",
+        ephemeral=True
+    )
+
+
+@tree.command(name="poolview", description="List rotation pools, or show one pool's upcoming rotation", extras={"public": True})
+async def poolview(interaction: discord.Interaction, name: Optional[str] = None, count: int = 10):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+    pools: Dict[str, Dict[str, Any]] = data[str(gid)]["pools"]
+
+    if name is None:
+        lines = [
+            f"• `{pool_name}` → {pool['mode']}, {len(pool['messages'])} message(s)"
+            for pool_name, pool in sorted(pools.items())
+        ]
+        embed = discord.Embed(
+            title=f"🔁 Rotation Pools ({len(pools)})",
+            description=clip_lines(lines, 4096) if lines else "→ No pools. Create one with `/poolcreate`.",
+            colour=discord.Colour.blurple()
+        )
+        return await reply(interaction, embed=embed, ephemeral=False)
+
+    pool_name, pool = find_pool(gid, name)
+    if pool is None:
+        return await pool_not_found(interaction, name)
+
+    count = max(1, min(50, count))
+    upcoming = pool_upcoming(pool, count)
+    next_lines = [f"**{i}.** Message `{mid}`" for i, mid in enumerate(upcoming, start=1)]
+    if pool["mode"] == "random" and len(upcoming) < count:
+        next_lines.append("… then a new shuffle")
+
+    members = [
+        f"• `{mid}`" + (f" ×{pool['weights'].get(str(mid), 1)}" if pool["mode"] == "random" else "")
+        for mid in pool["messages"]
+    ]
+    used_by = [
+        f"`{slot_name}` {day}"
+        for slot_name, slot in sorted(data[str(gid)]["slots"].items())
+        for day in VALID_DAYS if pool_ref(pool_name) in slot["schedule"].get(day, [])
+    ]
+
+    embed = discord.Embed(
+        title=f"🔁 Pool {pool_name} ({pool['mode']})",
+        colour=discord.Colour.blurple()
+    )
+    embed.add_field(
+        name="Up Next",
+        value=clip_lines(next_lines, 1024) if next_lines else "→ Empty pool.",
+        inline=False
+    )
+    embed.add_field(
+        name=f"Messages ({len(members)})",
+        value=clip_lines(members, 1024) if members else "→ None.",
+        inline=False
+    )
+    embed.add_field(
+        name="Scheduled On",
+        value=clip_lines(used_by, 1024) if used_by else "→ Not scheduled.",
+        inline=False
+    )
+
+    await reply(interaction, embed=embed, ephemeral=False)
+
+
+@tree.command(name="schedulepool", description="Add a rotation pool to a day's schedule (posts its next message)")
+@guild_locked
+async def schedulepool(
+    interaction: discord.Interaction,
+    day: str,
+    pool: str,
+    slot: str = DEFAULT_SLOT
+):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
+
+    if day not in VALID_DAYS:
+        return await reply(
+            interaction,
+            "❌ Invalid day. Use Monday, Tuesday, etc.",
+            ephemeral=True
+        )
+
+    pool_name, pool_data = find_pool(gid, pool)
+    if pool_data is None:
+        return await pool_not_found(interaction, pool)
+
+    schedule_data: Dict[str, List[Any]] = slot_data["schedule"]
+    current = schedule_data.get(day, [])
+    current.append(pool_ref(pool_name))
+    schedule_data[day] = current
+    save_data(data)
+    fire_index.update_slot(gid, slot_name)
+
+    await reply(
+        interaction,
+        f"📅 Added pool `{pool_name}` to **{day}** (`{slot_name}`) queue position {len(current)}.",
+        ephemeral=True
+    )
+
+
+# ======================================================
+# VIEWSCHEDULE / VIEWSETTINGS
+# ======================================================
+@tree.command(name="viewschedule", description="View weekly schedule summary", extras={"public": True})
+async def viewschedule(interaction: discord.Interaction, slot: str = DEFAULT_SLOT):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
+
+    schedule_data: Dict[str, List[int]] = slot_data["schedule"]
+
+    lines: List[str] = []
+    for d in VALID_DAYS:
+        queue = schedule_data.get(d, [])
+        if queue:
+            ids = ", ".join(str(mid) for mid in queue)
+            lines.append(f"**{d}** → `{ids}`")
+        else:
+            lines.append(f"**{d}** → *(none)*")
+
+    embed = discord.Embed(
+        title=f"📅 Weekly Schedule ({slot_name})",
+        description=clip_lines(lines, 4096),
+        colour=discord.Colour.blurple()
+    )
+
+    await reply(interaction, embed=embed, ephemeral=False)
+
+
+@tree.command(name="viewchannel", description="Show configured auto-post channels", extras={"public": True})
+async def viewchannel(interaction: discord.Interaction):
+    gid = safe_guild_id(interaction)
+    ensure_guild(gid)
+
+    guild = interaction.guild
+    if guild is None:
+        return await reply(
+            interaction,
+            "❌ Cannot be used in DMs.",
+            ephemeral=True
+        )
+
+    slots: Dict[str, Dict[str, Any]] = data[str(gid)]["slots"]
+    lines: List[str] = []
+    for name in sorted(slots):
+        channel_id = slots[name].get("channel")
+        if channel_id is None:
+            continue
+        channel = guild.get_channel(channel_id)
+        if isinstance(channel, discord.TextChannel):
+            lines.append(f"• `{name}` → {channel.mention}")
+        else:
+            lines.append(f"• `{name}` → ⚠️ channel not found or not a text channel")
+
+    if not lines:
+        return await reply(
+            interaction,
+            "❌ No auto-post channel set.",
+            ephemeral=True
+        )
+
+    await reply(
+        interaction,
+        "📌 Auto-posting in:\n" + clip_lines(lines, 2000),
+        ephemeral=False
+    )
+
+
+@tree.command(name="viewsettings", description="Full server bot settings", extras={"public": True})
 async def viewsettings(interaction: discord.Interaction):
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
 
     guild = interaction.guild
     if guild is None:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Cannot use in DMs.",
             ephemeral=True
         )
 
     guild_data = data[str(gid)]
-
-    # channel
-    channel_id = guild_data.get("post_channel")
-    if channel_id:
-        ch = guild.get_channel(channel_id)
-        channel_text = ch.mention if isinstance(ch, discord.TextChannel) else "Invalid / deleted"
-    else:
-        channel_text = "Not set"
-
-    # timezone + post time
     tz_name = guild_data.get("timezone", DEFAULT_TIMEZONE)
-    hour = guild_data.get("post_hour", DEFAULT_POST_HOUR)
-    minute = guild_data.get("post_minute", DEFAULT_POST_MINUTE)
+    slots: Dict[str, Dict[str, Any]] = guild_data["slots"]
 
-    # schedule
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+    slot_lines = [describe_slot(guild, guild_data, name, slots[name]) for name in sorted(slots)]
+
+    # schedule of the main slot (other slots: /viewschedule <slot>)
     schedule_lines: List[str] = []
-    if not schedule_data:
-        schedule_lines.append("→ No scheduled posts.")
-    else:
+    main = slots.get(DEFAULT_SLOT)
+    if main is not None:
         for d in VALID_DAYS:
-            queue = schedule_data.get(d, [])
+            queue = main["schedule"].get(d, [])
             if queue:
                 schedule_lines.append(f"• **{d}** → `{', '.join(str(x) for x in queue)}`")
 
@@ -689,69 +3613,110 @@ async def viewsettings(interaction: discord.Interaction):
         title="🔧 Server Bot Settings",
         colour=discord.Colour.blurple()
     )
-    embed.add_field(name="Auto-Post Channel", value=channel_text, inline=False)
     embed.add_field(name="Timezone", value=str(tz_name), inline=False)
-    embed.add_field(name="Post Time", value=f"{int(hour):02d}:{int(minute):02d}", inline=False)
+    webhook = guild_data["webhook"]
+    embed.add_field(
+        name="Posting Mode",
+        value=f"Webhook as {webhook['name'] or WEBHOOK_NAME}" if webhook["enabled"] else "Bot",
+        inline=False
+    )
     embed.add_field(
         name="Saved Messages",
         value=str(len(guild_data["messages"])),
         inline=False
     )
     embed.add_field(
-        name="Weekly Schedule",
-        value="\n".join(schedule_lines) if schedule_lines else "→ No scheduled posts.",
+        name=f"Posting Slots ({len(slots)})",
+        value=clip_lines(slot_lines, 1024) if slot_lines else "→ No slots.",
+        inline=False
+    )
+    embed.add_field(
+        name=f"Weekly Schedule ({DEFAULT_SLOT})",
+        value=clip_lines(schedule_lines, 1024) if schedule_lines else "→ No scheduled posts.",
         inline=False
     )
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    await reply(interaction, embed=embed, ephemeral=False)
 
 
 # ======================================================
 # CHANNEL CONFIGURATION
 # ======================================================
-@tree.command(name="setschedulechannel", description="Set channel for auto-posting")
+@tree.command(name="setschedulechannel", description="(Alias) Set the auto-post channel of a slot")
 async def setschedulechannel(
     interaction: discord.Interaction,
-    channel: discord.abc.GuildChannel
+    channel: discord.abc.GuildChannel,
+    slot: str = DEFAULT_SLOT
 ):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+    await slotchannel.callback(interaction, name=slot, channel=channel)  # type: ignore
 
-    try:
-        text_ch = safe_text_channel(channel)
-    except ValueError:
-        return await interaction.response.send_message(
-            "❌ Select a normal text channel.",
-            ephemeral=True
-        )
 
-    data[str(gid)]["post_channel"] = text_ch.id
+@tree.command(name="deletechannel", description="Remove a slot's auto-post channel (the slot stops posting)")
+@guild_locked
+async def deletechannel(interaction: discord.Interaction, slot: str = DEFAULT_SLOT):
+    gid = safe_guild_id(interaction)
+    slot_name, slot_data = find_slot(gid, slot)
+    if slot_data is None:
+        return await slot_not_found(interaction, slot)
+
+    slot_data["channel"] = None
     save_data(data)
+    fire_index.update_slot(gid, slot_name)
 
-    await interaction.response.send_message(
-        f"📌 Auto-post channel set to {text_ch.mention}.",
+    await reply(
+        interaction,
+        f"🗑 Auto-post channel removed from `{slot_name}`.",
         ephemeral=True
     )
 
 
-@tree.command(name="deletechannel", description="Remove configured auto-post channel")
-async def deletechannel(interaction: discord.Interaction):
+@tree.command(name="webhookmode", description="Post through channel webhooks (custom name/avatar) instead of as the bot")
+@guild_locked
+async def webhookmode(
+    interaction: discord.Interaction,
+    enabled: bool,
+    name: Optional[str] = None,
+    avatar_url: Optional[str] = None
+):
+    member = safe_member(interaction)
+    if not member.guild_permissions.manage_webhooks:
+        return await reply(
+            interaction,
+            "❌ You need the Manage Webhooks permission.",
+            ephemeral=True
+        )
+
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
 
-    data[str(gid)]["post_channel"] = None
+    if name is not None and not 1 <= len(name.strip()) <= 80:
+        return await reply(interaction, "❌ Name must be 1-80 characters.", ephemeral=True)
+    if avatar_url is not None and not avatar_url.startswith(("https://", "http://")):
+        return await reply(interaction, "❌ Avatar must be an http(s) image URL.", ephemeral=True)
+
+    settings = data[str(gid)]["webhook"]
+    settings["enabled"] = enabled
+    if name is not None:
+        settings["name"] = name.strip()
+    if avatar_url is not None:
+        settings["avatar_url"] = avatar_url
     save_data(data)
 
-    await interaction.response.send_message(
-        "🗑 Auto-post channel removed.",
-        ephemeral=True
-    )
+    if not enabled:
+        text = "🤖 Posting as the bot again."
+    else:
+        text = (
+            f"🪝 Posting through channel webhooks as **{settings['name'] or WEBHOOK_NAME}**.\n"
+            "The bot needs **Manage Webhooks** in each post channel; without it posts are sent as the bot."
+        )
+    await reply(interaction, text, ephemeral=True)
 
 
 # ======================================================
 # TIMEZONE / POST TIME COMMANDS
 # ======================================================
 @tree.command(name="settimezone", description="Set this server's timezone (IANA name like America/Vancouver)")
+@guild_locked
 async def settimezone(interaction: discord.Interaction, timezone_name: str):
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
@@ -765,36 +3730,24 @@ async def settimezone(interaction: discord.Interaction, timezone_name: str):
         )
         if not tz_supported():
             msg += "\n⚠️ This host may not support timezone data (zoneinfo missing); using UTC only."
-        return await interaction.response.send_message(msg, ephemeral=True)
+        return await reply(interaction, msg, ephemeral=True)
 
     data[str(gid)]["timezone"] = tz_name
     save_data(data)
+    fire_index.update_guild(gid)
 
-    await interaction.response.send_message(
+    await reply(
+        interaction,
         f"🌍 Timezone set to **{tz_name}**.",
         ephemeral=True
     )
 
 
-@tree.command(name="setposttime", description="Set the daily auto-post time (in this server's timezone)")
-async def setposttime(interaction: discord.Interaction, hour: int, minute: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    if hour < 0 or hour > 23:
-        return await interaction.response.send_message("❌ Hour must be 0-23.", ephemeral=True)
-    if minute < 0 or minute > 59:
-        return await interaction.response.send_message("❌ Minute must be 0-59.", ephemeral=True)
-
-    data[str(gid)]["post_hour"] = hour
-    data[str(gid)]["post_minute"] = minute
-    save_data(data)
-
-    tz_name = get_guild_timezone(gid)
-    await interaction.response.send_message(
-        f"⏰ Auto-post time set to **{hour:02d}:{minute:02d}** ({tz_name}).",
-        ephemeral=True
-    )
+@tree.command(name="setposttime", description="(Alias) Set a slot's daily auto-post time")
+async def setposttime(
+    interaction: discord.Interaction, hour: int, minute: int, slot: str = DEFAULT_SLOT, second: int = 0
+):
+    await slottime.callback(interaction, name=slot, hour=hour, minute=minute, second=second)  # type: ignore
 
 
 # ======================================================
@@ -837,7 +3790,7 @@ async def timezoneexamples(interaction: discord.Interaction):
         ),
         colour=discord.Colour.blurple()
     )
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await reply(interaction, embed=embed, ephemeral=True)
 
 
 # ======================================================
@@ -853,28 +3806,49 @@ async def help_command(interaction: discord.Interaction):
         "• `/removemessage <id>`",
         "• `/viewmessage <id>`",
         "• `/viewmessages`",
+        "Messages may use `{date}` `{weekday}` `{guild}` `{next_post}`.",
         "",
         "**Scheduling**",
-        "• `/schedule <day> <message_id>`",
-        "• `/schedulelist <day>`",
-        "• `/scheduleremove <day> <index>`",
-        "• `/schedulemove <day> <from_index> <to_index>`",
-        "• `/scheduleclear <day>`",
-        "• `/removeschedule <day>`",
-        "• `/viewschedule`",
+        "• `/schedule <day> <message_id> [slot]`",
+        "• `/schedulelist <day> [slot]`",
+        "• `/scheduleremove <day> <index> [slot]`",
+        "• `/schedulemove <day> <from_index> <to_index> [slot]`",
+        "• `/scheduleclear <day> [slot]`",
+        "• `/removeschedule <day> [slot]`",
+        "• `/viewschedule [slot]`",
+        "",
+        "**Rotation Pools**",
+        "• `/poolcreate <name> [sequence|random]`",
+        "• `/pooldelete <name>`",
+        "• `/pooladd <name> <message_id> [weight]`",
+        "• `/poolremove <name> <message_id>`",
+        "• `/poolview [name] [count]`",
+        "• `/schedulepool <day> <pool> [slot]`",
+        "",
+        f"**Posting Slots** (`[slot]` defaults to `main`; up to {MAX_SLOTS_PER_GUILD} per server)",
+        "• `/slotadd <name> <channel> [hour] [minute] [timezone]`",
+        "• `/slotremove <name>`",
+        "• `/slotlist`",
+        "• `/slotchannel <name> <channel>`",
+        "• `/slottime <name> <hour> <minute> [second]`",
+        "• `/slotcron <name> <expression|off>`",
+        "• `/slottimezone <name> <timezone|server>`",
         "",
         "**Posting / Settings**",
-        "• `/setschedulechannel <channel>`",
-        "• `/deletechannel`",
+        "• `/setschedulechannel <channel> [slot]`",
+        "• `/deletechannel [slot]`",
         "• `/settimezone <timezone>`",
         "• `/timezoneexamples`",
-        "• `/setposttime <hour> <minute>`",
+        "• `/setposttime <hour> <minute> [slot] [second]`",
+        "• `/webhookmode <enabled> [name] [avatar_url]`",
         "• `/viewchannel`",
         "• `/viewsettings`",
         "• `/postnow <message_id>`",
         "• `/timecheck`",
         "",
         "**Admin**",
+        "• `/exportdata [zip|jsonl]` (Admin only)",
+        "• `/outbox` (Admin only)",
         "• `/clearall` (Admin only)"
     ]
 
@@ -883,17 +3857,19 @@ async def help_command(interaction: discord.Interaction):
         description="\n".join(commands),
         colour=discord.Colour.blurple()
     )
-    await interaction.response.send_message(embed=embed, ephemeral=True)
+    await reply(interaction, embed=embed, ephemeral=True)
 
 
 # ======================================================
 # CLEARALL (ADMIN ONLY)
 # ======================================================
 @tree.command(name="clearall", description="Delete ALL messages & schedules (Admin only)")
+@guild_locked
 async def clearall(interaction: discord.Interaction):
     member = safe_member(interaction)
     if not member.guild_permissions.administrator:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Admin only.",
             ephemeral=True
         )
@@ -902,49 +3878,142 @@ async def clearall(interaction: discord.Interaction):
     ensure_guild(gid)
 
     data[str(gid)]["messages"] = {}
-    data[str(gid)]["schedule"] = {}
-    data[str(gid)]["post_channel"] = None
     data[str(gid)]["timezone"] = DEFAULT_TIMEZONE
-    data[str(gid)]["post_hour"] = DEFAULT_POST_HOUR
-    data[str(gid)]["post_minute"] = DEFAULT_POST_MINUTE
+    data[str(gid)]["slots"] = {DEFAULT_SLOT: new_slot()}
+    data[str(gid)]["pools"] = {}
     save_data(data)
+    fire_index.update_guild(gid)
 
-    await interaction.response.send_message(
+    await reply(
+        interaction,
         "🧨 All bot data cleared for this server.",
         ephemeral=True
     )
 
 
 # ======================================================
-# POST NOW
+# EXPORT DATA (ADMIN ONLY)
 # ======================================================
-@tree.command(name="postnow", description="Post a message immediately in this channel")
-async def postnow(interaction: discord.Interaction, message_id: int):
+@tree.command(name="exportdata", description="Download this server's messages & schedules (Admin only)")
+async def exportdata(interaction: discord.Interaction, file_format: str = "zip"):
+    member = safe_member(interaction)
+    if not member.guild_permissions.administrator:
+        return await reply(
+            interaction,
+            "❌ Admin only.",
+            ephemeral=True
+        )
+
+    if file_format not in ("zip", "jsonl"):
+        return await reply(interaction, "❌ Format must be `zip` or `jsonl`.", ephemeral=True)
+
+    gid = str(safe_guild_id(interaction))
+    ensure_guild(int(gid))
+    # copy first: the upload awaits, and edits made meanwhile must not tear the export
+    snapshot = {gid: decode_data(CODECS["json"].dumps(data[gid]))}
+
+    await reply(interaction, "📦 Exporting this server's data…", ephemeral=True)
+    parts = 0
+    for name, payload in iter_export_parts(export_records(snapshot, [gid]), f"export-{gid}", file_format):
+        parts += 1
+        await interaction.followup.send(file=discord.File(io.BytesIO(payload), filename=name), ephemeral=True)
+    await interaction.followup.send(
+        f"✔ Export finished in {parts} file(s). Restore with `python bot.py --import-data <files>`.",
+        ephemeral=True
+    )
+
+
+# ======================================================
+# OUTBOX (ADMIN ONLY)
+# ======================================================
+@tree.command(name="outbox", description="Scheduled posts waiting for a retry, and ones that gave up (Admin only)")
+async def outbox_view(interaction: discord.Interaction):
+    member = safe_member(interaction)
+    if not member.guild_permissions.administrator:
+        return await reply(
+            interaction,
+            "❌ Admin only.",
+            ephemeral=True
+        )
+
+    gid = safe_guild_id(interaction)
+    pending, dead = outbox.for_guild(gid)
+
+    pending_lines = [
+        f"• `{item['slot']}` <t:{item['fire_minute'] * 60}:f> → <#{item['channel']}>, "
+        f"{item['sent']}/{len(item['chunks'])} sent, try {item['attempts'] + 1} "
+        + (f"<t:{int(item['next_attempt'])}:R>" if item["state"] == "pending" else "now")
+        for item in sorted(pending, key=lambda i: i["fire_minute"])
+    ]
+    dead_lines = [
+        f"• `{letter['slot']}` <t:{letter['fire_minute'] * 60}:f> → <#{letter['channel']}>: "
+        f"{letter['reason']} after {letter['attempts']} tries ({letter['sent']}/{letter['chunks']} sent)"
+        for letter in reversed(dead)
+    ]
+
+    embed = discord.Embed(
+        title="📮 Outbox",
+        colour=discord.Colour.blurple()
+    )
+    embed.add_field(
+        name=f"Retrying ({len(pending_lines)})",
+        value=clip_lines(pending_lines, 1024) if pending_lines else "→ Nothing waiting.",
+        inline=False
+    )
+    embed.add_field(
+        name=f"Dead Letters ({len(dead_lines)})",
+        value=clip_lines(dead_lines, 1024) if dead_lines else "→ None.",
+        inline=False
+    )
+
+    await reply(interaction, embed=embed, ephemeral=True)
+
+
+# ======================================================
+# POST NOW
+# ======================================================
+@tree.command(name="postnow", description="Post a message immediately in this channel")
+async def postnow(interaction: discord.Interaction, message_id: int):
     gid = safe_guild_id(interaction)
     ensure_guild(gid)
 
     guild_data = data[str(gid)]
     msg = guild_data["messages"].get(str(message_id))
     if not msg:
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Message not found.",
             ephemeral=True
         )
 
     channel = interaction.channel
     if not isinstance(channel, discord.TextChannel):
-        return await interaction.response.send_message(
+        return await reply(
+            interaction,
             "❌ Can't post in this channel type.",
             ephemeral=True
         )
 
-    for part in split_message(msg):
-        await channel.send(part)
+    async def report(error: Optional[BaseException]) -> None:
+        if error is None:
+            text = f"✔ Message {message_id} posted."
+        else:
+            text = f"❌ Posting message {message_id} failed: {error}"
+        await reply(interaction, text, ephemeral=True)
+
+    now_utc = datetime.now(timezone.utc)
+    upcoming = fire_index.next_fire(gid, now_utc)
+    values = template_values(
+        gid, guild_data["timezone"], now_utc, epoch_minute(upcoming[0]) if upcoming else None
+    )
 
-    await interaction.response.send_message(
-        "✔ Message posted.",
+    # Acknowledge first; the pipeline sends the chunks and reports back
+    await reply(
+        interaction,
+        f"📨 Posting message {message_id}…",
         ephemeral=True
     )
+    outbound.submit(post_target(gid, channel), [render_message(msg, values)], "postnow", on_done=report)
 
 
 # ======================================================
@@ -961,879 +4030,1008 @@ async def timecheck(interaction: discord.Interaction):
     tzinfo = get_tzinfo(tz_name)
 
     now_local = now_utc.astimezone(tzinfo)
-    hour, minute = get_guild_post_time(gid)
 
-    nxt = next_run_local(now_local, hour, minute)
+    g = data[str(gid)]
+    slots: Dict[str, Dict[str, Any]] = g["slots"]
+    slot_lines = [
+        f"  ◦ `{name}` {slot_when(slots[name], slot_offset_seconds(gid, name, slots[name]))} "
+        f"({slot_timezone(g, slots[name])})"
+        for name in sorted(slots)
+    ]
 
-    await interaction.response.send_message(
-        "🕒 **Time Check**\n"
-        f"• **UTC:** {now_utc.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"• **Server Local ({tz_name}):** {now_local.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"• **Auto-post at:** {hour:02d}:{minute:02d} ({tz_name})\n"
-        f"• **Next run:** {nxt.strftime('%Y-%m-%d %H:%M:%S')} ({tz_name})",
+    nxt = fire_index.next_fire(gid, now_utc)
+    if nxt is None:
+        next_text = "no posts scheduled (needs a slot with a channel and a scheduled day)"
+    else:
+        at, slot_name = nxt
+        next_text = f"{at.astimezone(tzinfo).strftime('%A %Y-%m-%d %H:%M:%S')} ({tz_name}), slot `{slot_name}`"
+
+    await reply(
+        interaction,
+        clip_lines([
+            "🕒 **Time Check**",
+            f"• **UTC:** {now_utc.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"• **Server Local ({tz_name}):** {now_local.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"• **Next run:** {next_text}",
+            "• **Auto-post at:**",
+        ] + slot_lines, 2000),
         ephemeral=True
     )
 
 
 # ======================================================
-# AUTO POST LOOP (PER-GUILD LOCAL TIME)
+# PRE-FLIGHT (resolve + check each slot ahead of its fire minute)
 # ======================================================
-@tasks.loop(minutes=1)
-async def autopost():
-    now_utc = datetime.now(timezone.utc)
+class PreparedPost:
+    """A slot post resolved and checked before its fire minute; only sending is left."""
 
-    for gid, server in data.items():
-        # Safety/migration
-        try:
-            ensure_guild(int(gid))
-        except Exception:
-            continue
+    def __init__(self, channel: discord.TextChannel, queue: List[Any], sources: List[Optional[str]], chunks: List[str]):
+        self.channel = channel
+        self.queue = queue
+        self.sources = sources    # message text per queue entry when prepared
+        self.chunks = chunks      # ready-to-send, already split
 
-        channel_id = server.get("post_channel")
-        if not isinstance(channel_id, int):
-            continue
+    def still_valid(self, channel_id: int, queue: List[Any], sources: List[Optional[str]]) -> bool:
+        """False if the slot's channel, queue, message texts or pool picks changed since pre-flight."""
+        return self.channel.id == channel_id and self.queue == queue and self.sources == sources
 
-        tz_name = server.get("timezone", DEFAULT_TIMEZONE)
-        if not isinstance(tz_name, str) or not tz_name:
-            tz_name = DEFAULT_TIMEZONE
 
-        tzinfo = get_tzinfo(tz_name)
-        now_local = now_utc.astimezone(tzinfo)
+# (fire minute, slot) -> post ready to send
+prepared_posts: Dict[Tuple[int, SlotKey], PreparedPost] = {}
+# (slot, problem) -> UTC date it was last reported, so each problem is reported once a day
+_preflight_reported: Dict[Tuple[SlotKey, str], date] = {}
 
-        hour = server.get("post_hour", DEFAULT_POST_HOUR)
-        minute = server.get("post_minute", DEFAULT_POST_MINUTE)
-        try:
-            hour = int(hour)
-            minute = int(minute)
-        except Exception:
-            hour, minute = DEFAULT_POST_HOUR, DEFAULT_POST_MINUTE
 
-        if now_local.hour != hour or now_local.minute != minute:
-            continue
+def _can_send(guild: discord.Guild, channel: discord.abc.GuildChannel) -> bool:
+    if not isinstance(channel, discord.TextChannel) or guild.me is None:
+        return False
+    perms = channel.permissions_for(guild.me)
+    return perms.view_channel and perms.send_messages
 
-        today = now_local.strftime("%A")
 
-        schedule_data = server.get("schedule", {})
-        queue = schedule_data.get(today)
-        if not isinstance(queue, list) or not queue:
-            continue
+async def _report_sent(guild_id: int, error: Optional[BaseException]) -> None:
+    if error is not None:
+        print(f"⚠️ Could not report pre-flight problem in guild {guild_id}: {error!r}")
 
-        guild = bot.get_guild(int(gid))
-        if guild is None:
-            continue
 
-        channel = guild.get_channel(channel_id)
-        if not isinstance(channel, discord.TextChannel):
-            continue
+async def report_preflight_problem(guild: discord.Guild, key: SlotKey, problem: str, text: str) -> None:
+    """
+    Tell the guild (system channel, else the first channel the bot can write
+    in). Queued on the scheduled lane behind posts; pre-flight does not wait.
+    """
+    today = datetime.now(timezone.utc).date()
+    if _preflight_reported.get((key, problem)) == today:
+        return
+    _preflight_reported[(key, problem)] = today
+    PREFLIGHT_PROBLEMS.inc(problem=problem)
+
+    target = guild.system_channel
+    if target is None or not _can_send(guild, target):
+        target = next((ch for ch in guild.text_channels if _can_send(guild, ch)), None)
+    if target is None:
+        print(f"⚠️ Pre-flight problem in guild {guild.id} (nowhere to report it): {text}")
+        return
+    outbound.submit(target, [text], "preflight", functools.partial(_report_sent, guild.id))
+
+
+async def preflight_slot(key: SlotKey, fire_second: int) -> Optional[PreparedPost]:
+    guild_id, slot_name = key
+    server = data.get(str(guild_id))
+    if not isinstance(server, dict):
+        return None
+    slot = server.get("slots", {}).get(slot_name)
+    if not isinstance(slot, dict) or not isinstance(slot.get("channel"), int):
+        return None
+
+    day = slot_fire_day(guild_id, slot_name, server, slot, fire_second)
+    queue = slot.get("schedule", {}).get(day)
+    if not isinstance(queue, list) or not queue:
+        return None
+
+    # snapshot before awaiting: commands may edit the slot meanwhile, and
+    # still_valid() catches that at fire time
+    queue = list(queue)
+    sources = queue_sources(server, queue)
+    channel_id = slot["channel"]
+
+    if guild_id in missing_guilds:
+        return None
+    guild = bot.get_guild(guild_id)
+    if guild is None:
+        missing_guilds.add(guild_id)
+        return None
 
-        messages_map = server.get("messages", {})
-        if not isinstance(messages_map, dict):
-            continue
+    channel = guild.get_channel(channel_id)
+    if channel is None and channel_id not in missing_channels:
+        try:
+            channel = await bot.fetch_channel(channel_id)
+        except discord.NotFound:
+            missing_channels.add(channel_id)
+            channel = None
+        except discord.HTTPException as e:
+            # transient; the fire-time path will try the cache again
+            print(f"⚠️ Pre-flight could not fetch channel {channel_id}: {e!r}")
+            return None
 
-        for mid in queue:
-            msg_text = messages_map.get(str(mid))
-            if not isinstance(msg_text, str):
-                continue
-            for part in split_message(msg_text):
-                await channel.send(part)
+    if not isinstance(channel, discord.TextChannel):
+        await report_preflight_problem(
+            guild, key, "channel",
+            f"⚠️ Slot `{slot_name}` can't post: its channel was deleted or isn't a text channel. "
+            f"Set a new one with `/slotchannel {slot_name}`."
+        )
+        return None
+    if not _can_send(guild, channel):
+        await report_preflight_problem(
+            guild, key, "permissions",
+            f"⚠️ Slot `{slot_name}` can't post in {channel.mention}: "
+            "I need **View Channel** and **Send Messages** there."
+        )
+        return None
 
+    missing = [str(mid) for mid, text in zip(queue, sources) if not isinstance(text, str)]
+    if missing:
+        await report_preflight_problem(
+            guild, key, "messages",
+            f"⚠️ Slot `{slot_name}` ({day}) will skip deleted message IDs or empty pools: {', '.join(missing)}."
+        )
+    values = slot_template_values(guild_id, server, slot_name, fire_second // 60)
+    chunks = [
+        part for text in sources if isinstance(text, str)
+        for part in split_message(render_message(text, values))
+    ]
+    if not chunks:
+        return None
+    return PreparedPost(channel, queue, sources, chunks)
 
-@autopost.before_loop
-async def before_autopost():
-    await bot.wait_until_ready()
 
+async def run_preflight(now_utc: datetime) -> None:
+    """Prepare every slot due PREFLIGHT_MINUTES from now."""
+    now_m = epoch_minute(now_utc)
+    for stale in [k for k in prepared_posts if k[0] < now_m]:
+        del prepared_posts[stale]
 
-# ======================================================
-# BOT READY
-# ======================================================
-@bot.event
-async def on_ready():
-    print("✅ Bot is online!")
-    await tree.sync()
-    autopost.start()
+    fire_minute = now_m + PREFLIGHT_MINUTES
+    for fire_second, key in fire_index.peek(fire_minute):
+        try:
+            post = await preflight_slot(key, fire_second)
+        except Exception as e:
+            print(f"⚠️ Pre-flight for guild {key[0]} slot {key[1]} failed: {e!r}")
+            continue
+        if post is not None:
+            prepared_posts[(fire_minute, key)] = post
 
 
 # ======================================================
-# START BOT
-# ======================================================
-if __name__ == "__main__":
-    bot.run(load_token())# CONFIG
+# AUTO POST LOOP (FIRE SLOT INDEX)
 # ======================================================
-POST_HOUR_UTC = 8
-POST_MINUTE_UTC = 25
-DATA_FILE = "serverdata.json"
-VALID_DAYS = [
-    "Monday", "Tuesday", "Wednesday", "Thursday",
-    "Friday", "Saturday", "Sunday"
-]
-
+async def run_autopost_tick(now_utc: datetime) -> None:
+    """Post every slot queue due at or before now_utc and not posted yet (one scheduler tick)."""
+    global last_autopost_tick
+    started = time.perf_counter()
+    due = 0
+    try:
+        due = await _post_due_guilds(now_utc)
+    finally:
+        AUTOPOST_TICK_SECONDS.observe(time.perf_counter() - started)
+        AUTOPOST_GUILDS_DUE.observe(due)
+        last_autopost_tick = time.monotonic()
+
+
+async def _post_due_guilds(now_utc: datetime) -> int:
+    global last_fire_lateness
+    due = 0
+    jobs: List[Tuple[Dict[str, Any], OutboundJob]] = []
+    pools_moved = False
+    last_fire: Optional[int] = None
+    # Everything is read and queued without awaiting, so the whole tick sees
+    # one consistent view of data; commands run again only once sending starts.
+    for fire_second, (guild_id, slot_name) in fire_index.due(now_utc):
+        if fire_second != last_fire:
+            last_fire = fire_second
+            last_fire_lateness = max(0.0, now_utc.timestamp() - fire_second)
+            SCHEDULER_FIRE_LATENESS_SECONDS.observe(last_fire_lateness)
+        fire_m = fire_second // 60
+        # one bad slot must not cost the rest of the tick its posts
+        try:
+            gid = str(guild_id)
+            server = data.get(gid)
+            if not isinstance(server, dict):
+                continue
 
-# ======================================================
-# SAFE HELPERS
-# ======================================================
-def safe_guild_id(interaction: discord.Interaction) -> int:
-    """Ensure command is used inside a guild."""
-    if interaction.guild_id is None:
-        raise ValueError("This command cannot be used in DMs.")
-    return interaction.guild_id
+            slot = server.get("slots", {}).get(slot_name)
+            if not isinstance(slot, dict):
+                continue
 
+            channel_id = slot.get("channel")
+            if not isinstance(channel_id, int):
+                continue
 
-def safe_member(interaction: discord.Interaction) -> discord.Member:
-    """Ensure interaction.user is a Member."""
-    if not isinstance(interaction.user, discord.Member):
-        raise ValueError("This command cannot be used in DMs.")
-    return interaction.user
+            today = slot_fire_day(guild_id, slot_name, server, slot, fire_second)
 
+            queue = slot.get("schedule", {}).get(today)
+            if not isinstance(queue, list) or not queue:
+                continue
+            due += 1
+
+            sources = queue_sources(server, queue)
+
+            # resolved and checked minutes ago: just send
+            post = prepared_posts.pop((fire_m, (guild_id, slot_name)), None)
+            if post is not None and post.still_valid(channel_id, queue, sources):
+                AUTOPOST_PREPARED.inc(result="hit")
+                channel, chunks = post.channel, post.chunks
+            else:
+                AUTOPOST_PREPARED.inc(result="miss" if post is None else "stale")
+
+                guild = bot.get_guild(guild_id)
+                if guild is None:
+                    continue
+
+                channel = guild.get_channel(channel_id)
+                if not isinstance(channel, discord.TextChannel):
+                    continue
+
+                values = slot_template_values(guild_id, server, slot_name, fire_m)
+                chunks = [
+                    part for text in sources if isinstance(text, str)
+                    for part in split_message(render_message(text, values))
+                ]
+            if not chunks:
+                continue
 
-def safe_text_channel(channel: discord.abc.GuildChannel) -> discord.TextChannel:
-    """Ensure channel is a normal text channel."""
-    if not isinstance(channel, discord.TextChannel):
-        raise ValueError("You must choose a standard text channel.")
-    return channel
+            item = outbox.add(guild_id, slot_name, channel.id, fire_m, chunks)
+            if item is not None:
+                jobs.append((item, outbound.submit(post_target(guild_id, channel), chunks, "autopost")))
+                pools_moved = advance_queue_pools(server, queue) or pools_moved
+        except Exception as e:
+            print(f"⚠️ Autopost could not queue guild {guild_id} slot {slot_name}: {e!r}")
+
+    # in the outbox before the first send, so a crash or failure is retried
+    outbox.save()
+    # ...and only then past the lease's checkpoint, so a new holder neither
+    # re-posts these fires nor skips them
+    scheduler_lease.checkpoint(fire_index.last_second)
+    if pools_moved:
+        save_data(data)
+    for item, job in jobs:
+        error = await job.done
+        if error is not None:
+            print(f"⚠️ Autopost to guild {item['guild']} slot {item['slot']} failed: {error!r}")
+        outbox.record(item, job.sent, error)
+    outbox.save()
+    return due
 
 
-# ======================================================
-# AUTO-SPLIT LONG MESSAGES
-# ======================================================
-def split_message(text: str, limit: int = 2000) -> List[str]:
-    chunks: List[str] = []
-    while len(text) > limit:
-        split_point = text.rfind("\n", 0, limit)
-        if split_point == -1:
-            split_point = limit
-        chunks.append(text[:split_point])
-        text = text[split_point:]
-    chunks.append(text)
-    return chunks
+_tick_tasks: Set[asyncio.Task] = set()
 
 
-# ======================================================
-# LOAD / SAVE DATA
-# ======================================================
-def load_data() -> Dict[str, Any]:
-    if not os.path.exists(DATA_FILE):
-        return {}
+async def _guarded_tick(now_utc: datetime) -> None:
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
-        return {}
-
+        await run_autopost_tick(now_utc)
+    except Exception as e:
+        print(f"⚠️ Autopost tick for {now_utc:%H:%M:%S} failed: {e!r}")
 
-def save_data(data: Dict[str, Any]) -> None:
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
 
+async def _guarded_preflight(now_utc: datetime) -> None:
+    try:
+        await run_preflight(now_utc)
+    except Exception as e:
+        print(f"⚠️ Pre-flight for {now_utc:%H:%M} failed: {e!r}")
 
-data: Dict[str, Any] = load_data()
 
+def _spawn_tick(coro: Awaitable[None]) -> None:
+    task = asyncio.ensure_future(coro)
+    _tick_tasks.add(task)
+    task.add_done_callback(_tick_tasks.discard)
 
-# ======================================================
-# GUILD INITIALIZER (migration + safety)
-# schedule[day] is ALWAYS a list[int]
-# ======================================================
-def ensure_guild(guild_id: int) -> None:
-    gid = str(guild_id)
 
-    # Create new guild entry
-    if gid not in data:
-        data[gid] = {
-            "messages": {},
-            "schedule": {},      # day -> list[int]
-            "post_channel": None
-        }
-        save_data(data)
+async def scheduler_clock() -> None:
+    """
+    Wake at absolute deadlines on the loop's monotonic clock: the next
+    second with a fire indexed, or else the next minute boundary. Each
+    tick runs as its own task, so a long send never shifts later wakes,
+    and a tick picks up every fire since the previous one. Pre-flight runs
+    off the same clock, at the first wake of each minute.
+    """
+    await bot.wait_until_ready()
+    loop = asyncio.get_running_loop()
+    target = 0
+    preflight_minute: Optional[int] = None
+    while True:
+        # asyncio.sleep can wake a hair early against the wall clock
+        now = max(time.time(), target)
+        if scheduler_lease.held:
+            now_utc = datetime.fromtimestamp(now, tz=timezone.utc)
+            _spawn_tick(_guarded_tick(now_utc))
+            if PREFLIGHT_MINUTES > 0 and epoch_minute(now_utc) != preflight_minute:
+                preflight_minute = epoch_minute(now_utc)
+                _spawn_tick(_guarded_preflight(now_utc))
+        now_s = int(now)
+        boundary = now_s - now_s % 60 + 60
+        target = fire_index.next_due(now_s, boundary) or boundary
+        deadline = loop.time() + (target - time.time())
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
+        SCHEDULER_WAKE_LATENESS_SECONDS.observe(max(0.0, loop.time() - deadline))
+
+
+@tasks.loop(seconds=OUTBOX_POLL_SECONDS)
+async def outbox_retry():
+    if not scheduler_lease.held:
         return
+    await run_outbox_retries()
 
-    g = data[gid]
 
-    # Messages always dict
-    if "messages" not in g or not isinstance(g["messages"], dict):
-        g["messages"] = {}
+@outbox_retry.before_loop
+async def before_outbox_retry():
+    await bot.wait_until_ready()
 
-    # Schedule always dict[day] -> list[int]
-    sched = g.get("schedule")
-    if not isinstance(sched, dict):
-        sched = {}
-    fixed_sched: Dict[str, List[int]] = {}
-    for day, val in sched.items():
-        if isinstance(val, int):
-            fixed_sched[day] = [val]
-        elif isinstance(val, list):
-            cleaned = [int(x) for x in val if isinstance(x, int)]
-            if cleaned:
-                fixed_sched[day] = cleaned
-    g["schedule"] = fixed_sched
 
-    # post_channel always present
-    if "post_channel" not in g:
-        g["post_channel"] = None
+@tasks.loop(seconds=LEASE_POLL_SECONDS)
+async def lease_watch():
+    """Standby: poll for the lease. Holder: step down if the fencing check fails."""
+    if scheduler_lease.held:
+        if not scheduler_lease.is_current():
+            print("⚠️ Scheduler lease lost (fencing token changed); standing by.")
+            scheduler_lease.release()
+        return
+    take_over_lease()
+
 
-    save_data(data)
+async def monitor_loop_lag() -> None:
+    """Sample event-loop lag: how late a 1 s sleep actually wakes up."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(1)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started - 1))
 
 
 # ======================================================
-# BOT SETUP
+# DEAD GUILDS / CHANNELS (negative cache + compaction)
 # ======================================================
-intents = discord.Intents.default()
-intents.message_content = False  # using slash commands only
+class NegativeCache:
+    """IDs that recently resolved to nothing, so they are not looked up again for ttl seconds."""
+
+    def __init__(self, kind: str, ttl: float):
+        self.kind = kind
+        self.ttl = ttl
+        self._until: Dict[int, float] = {}
+
+    def add(self, key: int) -> None:
+        self._until[key] = time.monotonic() + self.ttl
+
+    def discard(self, key: int) -> None:
+        self._until.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        until = self._until.get(key)  # type: ignore[arg-type]
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._until[key]  # type: ignore[arg-type]
+            return False
+        NEGATIVE_CACHE_HITS.inc(kind=self.kind)
+        return True
 
-bot = discord.Client(intents=intents)
-tree = app_commands.CommandTree(bot)
+    def purge(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, until in self._until.items() if until < now]:
+            del self._until[key]
 
 
-# ======================================================
-# ADD MESSAGE COMMANDS
-# ======================================================
-@tree.command(name="addmessage", description="Save a message to the bot")
-async def addmessage(interaction: discord.Interaction, message_id: int, text: str):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+missing_guilds = NegativeCache("guild", NEGATIVE_CACHE_SECONDS)
+missing_channels = NegativeCache("channel", NEGATIVE_CACHE_SECONDS)
 
-    data[str(gid)]["messages"][str(message_id)] = text
-    save_data(data)
 
-    await interaction.response.send_message(
-        f"✔ Message {message_id} saved.",
-        ephemeral=True
+def is_stale_guild(g: Dict[str, Any], today: date) -> bool:
+    """Left long enough ago, or never set up (no messages, channels or settings)."""
+    left_at = g.get("left_at")
+    if left_at is not None:
+        return (today - date.fromisoformat(left_at)).days >= PRUNE_LEFT_GUILD_DAYS
+    return (
+        not g.get("messages")
+        and g.get("timezone", DEFAULT_TIMEZONE) == DEFAULT_TIMEZONE
+        and not g.get("webhook", {}).get("enabled")
+        and not any(isinstance(slot.get("channel"), int) for slot in g.get("slots", {}).values())
     )
 
 
-@tree.command(name="addmessagefile", description="Upload a .txt file as a message")
-async def addmessagefile(
-    interaction: discord.Interaction,
-    message_id: int,
-    file: discord.Attachment
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+def archive_guilds(snapshot: Dict[str, Any]) -> List[str]:
+    """Write guilds to ARCHIVE_DIR in the export format (restore with --import-data)."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    prefix = f"archive-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+    written: List[str] = []
+    for name, payload in iter_export_parts(export_records(snapshot, sorted(snapshot)), prefix, "jsonl", EXPORT_PART_BYTES):
+        with open(os.path.join(ARCHIVE_DIR, name), "wb") as f:
+            f.write(payload)
+        written.append(name)
+    return written
+
+
+async def compact_data(today: Optional[date] = None) -> int:
+    """Archive and drop stale guild entries; returns how many were removed."""
+    today = today or datetime.now(timezone.utc).date()
+    changed = False
+
+    # the bot was removed while offline: start the clock now
+    if bot.is_ready():
+        for gid, g in data.items():
+            if gid.isdigit() and owns_guild(int(gid)) and "left_at" not in g and bot.get_guild(int(gid)) is None:
+                g["left_at"] = today.isoformat()
+                fire_index.remove_guild(int(gid))
+                changed = True
+
+    candidates = [gid for gid, g in data.items() if gid.isdigit() and is_stale_guild(g, today)]
+    stale: Dict[str, Any] = {}
+    for gid in candidates:
+        # re-check under the lock: a command may have just given it a channel
+        async with guild_lock(int(gid)):
+            g = data.get(gid)
+            if isinstance(g, dict) and is_stale_guild(g, today):
+                stale[gid] = data.pop(gid)
+                fire_index.remove_guild(int(gid))
+
+    if stale:
+        archive_guilds(stale)
+        COMPACTED_GUILDS.inc(len(stale))
+        print(f"🗜️ Archived {len(stale)} stale guild(s) to {ARCHIVE_DIR}.")
+    if stale or changed:
+        save_data(data)
+    missing_guilds.purge()
+    missing_channels.purge()
+    return len(stale)
 
-    if not file.filename.endswith(".txt"):
-        return await interaction.response.send_message(
-            "❌ Only .txt files allowed.",
-            ephemeral=True
-        )
 
-    content_bytes = await file.read()
+@tasks.loop(hours=COMPACT_INTERVAL_HOURS)
+async def compaction():
+    if not scheduler_lease.held:
+        return
     try:
-        content = content_bytes.decode("utf-8")
-    except UnicodeDecodeError:
-        return await interaction.response.send_message(
-            "❌ Could not decode file as UTF-8 text.",
-            ephemeral=True
-        )
+        await compact_data()
+    except Exception as e:
+        print(f"⚠️ Data compaction failed: {e!r}")
 
-    data[str(gid)]["messages"][str(message_id)] = content
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"📁 File saved as message {message_id}.",
-        ephemeral=True
-    )
 
+@compaction.before_loop
+async def before_compaction():
+    await bot.wait_until_ready()
 
-# Popup modal for multiline message
-class AddMessageModal(discord.ui.Modal, title="Add Multi-Line Message"):
-    text = discord.ui.TextInput(
-        label="Message",
-        style=discord.TextStyle.paragraph,
-        required=True
-    )
 
-    async def on_submit(self, interaction: discord.Interaction) -> None:
-        gid = safe_guild_id(interaction)
-        ensure_guild(gid)
+def mark_guild_left(guild_id: int) -> bool:
+    """Stop scheduling a guild the bot left; True if data changed."""
+    fire_index.remove_guild(guild_id)
+    g = data.get(str(guild_id))
+    if isinstance(g, dict) and not g.get("left_at"):
+        g["left_at"] = datetime.now(timezone.utc).date().isoformat()
+        return True
+    return False
 
-        messages: Dict[str, str] = data[str(gid)]["messages"]
-        new_id = str(max([int(i) for i in messages] + [0]) + 1)
 
-        data[str(gid)]["messages"][new_id] = str(self.text)
+def unset_channel(guild_id: int, channel_id: int) -> bool:
+    """Unset a deleted channel on every slot that posted there; True if data changed."""
+    g = data.get(str(guild_id))
+    if not isinstance(g, dict):
+        return False
+    changed = g["webhook"]["cache"].pop(str(channel_id), None) is not None
+    for name, slot in g["slots"].items():
+        if slot.get("channel") == channel_id:
+            slot["channel"] = None
+            fire_index.update_slot(guild_id, name)
+            changed = True
+    return changed
+
+
+def reconcile_guilds() -> None:
+    """
+    Catch up on guild and channel events the lease holder missed. Standbys
+    never write data, so a new holder checks its own view of the gateway:
+    guilds left or rejoined and slot channels that no longer exist.
+    """
+    if not bot.is_ready():
+        return
+    changed = False
+    for gid, g in list(data.items()):
+        if not gid.isdigit() or not isinstance(g, dict) or not owns_guild(int(gid)):
+            continue
+        guild = bot.get_guild(int(gid))
+        if guild is None:
+            changed = mark_guild_left(int(gid)) or changed
+            continue
+        if guild.unavailable:
+            continue   # outage: its channels are not known right now
+        if g.pop("left_at", None) is not None:
+            changed = True
+            fire_index.update_guild(guild.id)
+        channels = {slot.get("channel") for slot in g["slots"].values()}
+        channels.update(int(cid) for cid in g["webhook"]["cache"] if cid.isdigit())
+        for channel_id in channels:
+            if isinstance(channel_id, int) and guild.get_channel(channel_id) is None:
+                changed = unset_channel(guild.id, channel_id) or changed
+    if changed:
         save_data(data)
+        print("🔁 Applied guild/channel changes seen while standing by.")
 
-        await interaction.response.send_message(
-            f"✔ Saved as message {new_id}.",
-            ephemeral=True
-        )
 
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    """Kicked or the guild was deleted: stop scheduling it; compaction archives it later."""
+    missing_guilds.add(guild.id)
+    # a standby must not write the shared file; the holder reconciles on takeover
+    if not scheduler_lease.held:
+        return
+    async with guild_lock(guild.id):
+        if mark_guild_left(guild.id):
+            save_data(data)
 
-@tree.command(name="addmessagepopup", description="Add a multiline message using a popup")
-async def addmessagepopup(interaction: discord.Interaction):
-    await interaction.response.send_modal(AddMessageModal())
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    missing_guilds.discard(guild.id)
+    if not scheduler_lease.held:
+        return
+    async with guild_lock(guild.id):
+        g = data.get(str(guild.id))
+        if isinstance(g, dict) and g.pop("left_at", None) is not None:
+            save_data(data)
+            fire_index.update_guild(guild.id)
+
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    """Unset the channel on every slot that posted there."""
+    missing_channels.add(channel.id)
+    if not scheduler_lease.held:
+        return
+    async with guild_lock(channel.guild.id):
+        if unset_channel(channel.guild.id, channel.id):
+            save_data(data)
 
 
 # ======================================================
-# EDIT / REMOVE MESSAGE
+# METRICS / HEALTH HTTP SERVER
 # ======================================================
-@tree.command(name="editmessage", description="Edit a saved message")
-async def editmessage(
-    interaction: discord.Interaction,
-    message_id: int,
-    new_text: str
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+http_app = Flask(__name__)
 
-    if str(message_id) not in data[str(gid)]["messages"]:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
 
-    data[str(gid)]["messages"][str(message_id)] = new_text
-    save_data(data)
+@http_app.get("/metrics")
+def metrics_endpoint():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
-    await interaction.response.send_message(
-        f"✏ Updated message {message_id}.",
-        ephemeral=True
-    )
 
+@http_app.get("/healthz")
+def healthz_endpoint():
+    now = time.monotonic()
+    if last_autopost_tick is None or last_autopost_tick < lease_since:
+        age = now - max(PROCESS_STARTED, lease_since)
+        status = "starting"
+    else:
+        age = now - last_autopost_tick
+        status = "ok"
+    if age > HEALTH_STALL_SECONDS:
+        status = "stalled"
+    if not scheduler_lease.held:
+        status = "standby"
+    body = {
+        "status": status,
+        "lease_token": scheduler_lease.token,
+        "seconds_since_tick": round(age, 3),
+        "fire_lateness_seconds": round(last_fire_lateness, 3) if last_fire_lateness is not None else None,
+        "ready": bot.is_ready(),
+        "shards": SHARD_IDS if SHARD_IDS is not None else "all",
+        "outbound_queue": {lane: outbound.depth(lane) for lane in LANES},
+    }
+    return jsonify(body), (503 if status == "stalled" else 200)
 
-@tree.command(name="removemessage", description="Delete a saved message")
-async def removemessage(interaction: discord.Interaction, message_id: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
 
-    if str(message_id) not in data[str(gid)]["messages"]:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
+# ======================================================
+# ADMIN API (bulk management over the local HTTP server)
+# Enabled when ADMIN_API_TOKEN is set; send "Authorization: Bearer <token>".
+# Handlers run on HTTP threads and only touch data on the bot's loop.
+# ======================================================
+# (version, compact JSON of every owned guild) served until data changes
+_admin_snapshot: Optional[Tuple[int, bytes]] = None
+_admin_snapshot_lock = threading.Lock()
 
-    del data[str(gid)]["messages"][str(message_id)]
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"🗑 Message {message_id} deleted.",
-        ephemeral=True
-    )
 
+def call_on_loop(fn: Callable[[], Awaitable[Any]], timeout: float = 10.0) -> Any:
+    """Run a coroutine function on the bot's event loop and wait for it (HTTP threads only)."""
+    return asyncio.run_coroutine_threadsafe(fn(), bot.loop).result(timeout)
 
-# ======================================================
-# VIEW MESSAGE COMMANDS
-# ======================================================
-@tree.command(name="viewmessage", description="View a specific message by ID")
-async def viewmessage(interaction: discord.Interaction, message_id: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
 
-    msg = data[str(gid)]["messages"].get(str(message_id))
-    if not msg:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
+def admin_guard() -> Optional[Tuple[Response, int]]:
+    """Error response for unauthenticated requests, or None to proceed."""
+    if not ADMIN_API_TOKEN:
+        return jsonify({"error": "admin API disabled"}), 404
+    sent = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(sent.encode("utf-8"), f"Bearer {ADMIN_API_TOKEN}".encode("utf-8")):
+        return jsonify({"error": "unauthorized"}), 401
+    return None
 
-    parts = split_message(msg)
 
-    await interaction.response.send_message(
-        f"📄 **Message {message_id}:**",
-        ephemeral=True
-    )
-    for p in parts:
-        await interaction.followup.send(p, ephemeral=True)
+def _etag(version: int) -> str:
+    return f'"{version}"'
 
 
-@tree.command(name="viewmessages", description="View all saved messages")
-async def viewmessages(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+def _not_modified() -> bool:
+    return request.headers.get("If-None-Match") == _etag(data_version)
 
-    msgs = data[str(gid)]["messages"]
-    if not msgs:
-        return await interaction.response.send_message(
-            "No saved messages.",
-            ephemeral=True
-        )
 
-    desc_lines = []
-    for mid, txt in msgs.items():
-        desc_lines.append(f"`{mid}` – {len(txt)} chars")
+def admin_view(g: Dict[str, Any]) -> Dict[str, Any]:
+    """A guild as the admin API shows it: cached webhook tokens left out, as in exports."""
+    webhook = g.get("webhook", {})
+    return {**g, "webhook": {key: webhook.get(key) for key in ("enabled", "name", "avatar_url")}}
+
+
+def admin_snapshot() -> Tuple[int, bytes]:
+    """Every owned guild as JSON, serialised on the loop so it is one consistent view."""
+    global _admin_snapshot
+    with _admin_snapshot_lock:
+        if _admin_snapshot is not None and _admin_snapshot[0] == data_version:
+            return _admin_snapshot
+
+        async def capture() -> Tuple[int, bytes]:
+            guilds = {gid: admin_view(g) for gid, g in data.items() if gid.isdigit() and owns_guild(int(gid))}
+            return data_version, CODECS["json"].dumps(guilds)
+
+        _admin_snapshot = call_on_loop(capture)
+        return _admin_snapshot
+
+
+@http_app.get("/admin/guilds")
+def admin_list_guilds():
+    denied = admin_guard()
+    if denied:
+        return denied
+    if _not_modified():
+        return Response(status=304, headers={"ETag": _etag(data_version)})
+    version, body = admin_snapshot()
+    return Response(body, mimetype="application/json", headers={"ETag": _etag(version)})
+
+
+@http_app.get("/admin/guilds/<gid>")
+def admin_get_guild(gid: str):
+    denied = admin_guard()
+    if denied:
+        return denied
+    if _not_modified():
+        return Response(status=304, headers={"ETag": _etag(data_version)})
+
+    async def capture() -> Tuple[int, Optional[bytes]]:
+        guild = data.get(gid) if gid.isdigit() and owns_guild(int(gid)) else None
+        return data_version, None if guild is None else CODECS["json"].dumps(admin_view(guild))
+
+    version, body = call_on_loop(capture)
+    if body is None:
+        return jsonify({"error": "unknown guild"}), 404
+    return Response(body, mimetype="application/json", headers={"ETag": _etag(version)})
+
+
+@http_app.get("/admin/outbox")
+def admin_outbox():
+    denied = admin_guard()
+    if denied:
+        return denied
+
+    async def capture() -> Dict[str, Any]:
+        pending = [
+            {**item, "chunks": len(item["chunks"])}
+            for item in outbox.items.values()
+        ]
+        return {"pending": pending, "dead": outbox.dead}
+
+    return jsonify(call_on_loop(capture))
+
+
+def apply_admin_op(g: Dict[str, Any], op: Dict[str, Any]) -> None:
+    """Apply one batch operation to a (copied) guild; raises ValueError when invalid."""
+    kind = op.get("op")
+
+    if kind == "set_message":
+        text = op.get("text")
+        if not isinstance(text, str) or not text:
+            raise ValueError("text must be a non-empty string")
+        g["messages"][str(int(op["id"]))] = text
+
+    elif kind == "delete_message":
+        if g["messages"].pop(str(int(op["id"])), None) is None:
+            raise ValueError("message not found")
+
+    elif kind in ("set_slot", "delete_slot", "set_schedule"):
+        slot_name = normalize_slot_name(str(op.get("slot", DEFAULT_SLOT)))
+        if slot_name is None:
+            raise ValueError("invalid slot name")
+        slots = g["slots"]
+
+        if kind == "delete_slot":
+            if slots.pop(slot_name, None) is None:
+                raise ValueError("slot not found")
+            return
+
+        if kind == "set_slot":
+            if slot_name not in slots and len(slots) >= MAX_SLOTS_PER_GUILD:
+                raise ValueError(f"at most {MAX_SLOTS_PER_GUILD} slots per guild")
+            raw = dict(slots.get(slot_name, new_slot()))
+            for key in ("channel", "hour", "minute", "second", "timezone", "cron"):
+                if key in op:
+                    raw[key] = op[key]
+            if "hour" in op or "minute" in op or "second" in op:
+                raw["time_set"] = True
+            if isinstance(raw.get("channel"), str):
+                raw["channel"] = int(raw["channel"])   # snowflakes often arrive as strings
+            if raw.get("timezone") is not None and not validate_timezone(str(raw["timezone"])):
+                raise ValueError("invalid timezone")
+            if raw.get("cron"):
+                compile_cron(str(raw["cron"]))
+            if not (0 <= int(raw["hour"]) <= 23 and 0 <= int(raw["minute"]) <= 59
+                    and 0 <= int(raw.get("second", 0)) <= 59):
+                raise ValueError("hour must be 0-23, minute and second 0-59")
+            slots[slot_name] = normalize_slot(raw)
+            return
+
+        slot = slots.get(slot_name)
+        if slot is None:
+            raise ValueError("slot not found")
+        day = op.get("day")
+        if day not in VALID_DAYS:
+            raise ValueError("invalid day")
+        ids = [mid if parse_pool_ref(mid) else int(mid) for mid in op.get("ids", [])]
+        unknown = [
+            mid for mid in ids
+            if (parse_pool_ref(mid) not in g["pools"] if parse_pool_ref(mid) else str(mid) not in g["messages"])
+        ]
+        if unknown:
+            raise ValueError(f"unknown message ids or pools {unknown}")
+        if ids:
+            slot["schedule"][day] = ids
+        else:
+            slot["schedule"].pop(day, None)
+
+    elif kind == "set_timezone":
+        tz_name = str(op.get("timezone", ""))
+        if not validate_timezone(tz_name):
+            raise ValueError("invalid timezone")
+        g["timezone"] = tz_name
 
-    embed = discord.Embed(
-        title="🗂️ Saved Messages",
-        description="\n".join(desc_lines),
-        colour=discord.Colour.blurple()
-    )
+    elif kind == "set_webhook":
+        for key in ("enabled", "name", "avatar_url"):
+            if key in op:
+                g["webhook"][key] = op[key]
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    else:
+        raise ValueError(f"unknown op {kind!r}")
+
+
+async def apply_admin_batch(
+    ops: List[Dict[str, Any]], if_match: Optional[str] = None
+) -> Tuple[int, Dict[str, Any]]:
+    """
+    Validate and apply every op, or none: ops run against copies of the
+    touched guilds, which replace the live ones only if all succeed. One
+    save_data and one re-index per guild for the whole batch. With
+    if_match, the batch only applies if data is still at that ETag.
+    """
+    touched = sorted({str(op.get("guild")) for op in ops})
+    for gid in touched:
+        if not gid.isdigit() or gid not in data or not owns_guild(int(gid)):
+            return 404, {"error": f"unknown guild {gid}"}
+
+    locks = [guild_lock(int(gid)) for gid in touched]   # sorted order: no deadlocks
+    for lock in locks:
+        await lock.acquire()
+    try:
+        # checked again under the locks: a command or compaction may have run meanwhile
+        if if_match is not None and if_match != _etag(data_version):
+            return 412, {"error": "data changed", "version": data_version}
+        gone = [gid for gid in touched if gid not in data]
+        if gone:
+            return 409, {"error": f"guild removed meanwhile {gone[0]}"}
+        copies = {gid: decode_data(CODECS["json"].dumps(data[gid])) for gid in touched}
+        for i, op in enumerate(ops):
+            try:
+                apply_admin_op(copies[str(op.get("guild"))], op)
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {"error": str(e) or type(e).__name__, "op_index": i}
+        for gid, g in copies.items():
+            normalize_guild(g)
+            data[gid] = g
+        save_data(data)
+        for gid in touched:
+            fire_index.update_guild(int(gid))
+        return 200, {"applied": len(ops), "guilds": touched, "version": data_version}
+    finally:
+        for lock in locks:
+            lock.release()
+
+
+@http_app.post("/admin/batch")
+def admin_batch():
+    """Body: {"ops": [{"op": "set_message", "guild": "123", "id": 1, "text": "..."}, ...]}"""
+    denied = admin_guard()
+    if denied:
+        return denied
+    if_match = request.headers.get("If-Match")
+    body = request.get_json(silent=True)
+    ops = body.get("ops") if isinstance(body, dict) else None
+    if not isinstance(ops, list) or not ops or not all(isinstance(op, dict) for op in ops):
+        return jsonify({"error": "body must be {\"ops\": [...]}"}), 400
+
+    status, result = call_on_loop(lambda: apply_admin_batch(ops, if_match))
+    return jsonify(result), status, {"ETag": _etag(data_version)}
+
+
+def start_http_server() -> None:
+    """Serve http_app from a daemon thread so it never blocks the gateway loop."""
+    if not METRICS_PORT:
+        return
+    server = make_server(METRICS_HOST, METRICS_PORT, http_app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
 
 
 # ======================================================
-# ADVANCED SCHEDULER (MULTI-MESSAGE PER DAY)
+# BOT READY
 # ======================================================
-@tree.command(name="schedule", description="Add a message to a day's schedule (append)")
-async def schedule(
-    interaction: discord.Interaction,
-    day: str,
-    message_id: int
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    if day not in VALID_DAYS:
-        return await interaction.response.send_message(
-            "❌ Invalid day. Use Monday, Tuesday, etc.",
-            ephemeral=True
-        )
-
-    guild_data = data[str(gid)]
-    if str(message_id) not in guild_data["messages"]:
-        return await interaction.response.send_message(
-            "❌ Message ID does not exist.",
-            ephemeral=True
-        )
-
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-    current = schedule_data.get(day, [])
-    current.append(message_id)
-    schedule_data[day] = current
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"📅 Added message `{message_id}` to **{day}** queue position {len(current)}.",
-        ephemeral=True
-    )
-
-
-@tree.command(name="schedulelist", description="View ordered schedule for a specific day")
-async def schedulelist(interaction: discord.Interaction, day: str):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    if day not in VALID_DAYS:
-        return await interaction.response.send_message(
-            "❌ Invalid day.",
-            ephemeral=True
-        )
-
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-    queue = schedule_data.get(day, [])
-
-    if not queue:
-        return await interaction.response.send_message(
-            f"📅 No messages scheduled for **{day}**.",
-            ephemeral=True
-        )
-
-    lines = []
-    for idx, mid in enumerate(queue, start=1):
-        lines.append(f"**{idx}.** Message `{mid}`")
-
-    embed = discord.Embed(
-        title=f"📅 {day} Schedule",
-        description="\n".join(lines),
-        colour=discord.Colour.blurple()
-    )
-
-    await interaction.response.send_message(embed=embed, ephemeral=False)
-
-
-@tree.command(name="scheduleremove", description="Remove a message by index from a day's schedule")
-async def scheduleremove(
-    interaction: discord.Interaction,
-    day: str,
-    index: int
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    if day not in VALID_DAYS:
-        return await interaction.response.send_message(
-            "❌ Invalid day.",
-            ephemeral=True
-        )
-
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-    queue = schedule_data.get(day, [])
-
-    if not queue:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
-            ephemeral=True
-        )
-
-    if index < 1 or index > len(queue):
-        return await interaction.response.send_message(
-            f"❌ Index must be between 1 and {len(queue)}.",
-            ephemeral=True
-        )
-
-    removed = queue.pop(index - 1)
-    if queue:
-        schedule_data[day] = queue
-    else:
-        del schedule_data[day]
-
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"🗑 Removed message `{removed}` from **{day}** at position {index}.",
-        ephemeral=True
-    )
-
-
-@tree.command(name="schedulemove", description="Reorder items in a day's schedule")
-async def schedulemove(
-    interaction: discord.Interaction,
-    day: str,
-    from_index: int,
-    to_index: int
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+_background_started = False
 
-    if day not in VALID_DAYS:
-        return await interaction.response.send_message(
-            "❌ Invalid day.",
-            ephemeral=True
-        )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-    queue = schedule_data.get(day, [])
-
-    if not queue:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
-            ephemeral=True
-        )
-
-    n = len(queue)
-    if from_index < 1 or from_index > n or to_index < 1 or to_index > n:
-        return await interaction.response.send_message(
-            f"❌ Indexes must be between 1 and {n}.",
-            ephemeral=True
-        )
-
-    item = queue.pop(from_index - 1)
-    queue.insert(to_index - 1, item)
-    schedule_data[day] = queue
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"🔁 Moved message `{item}` from position {from_index} to {to_index} on **{day}**.",
-        ephemeral=True
-    )
-
-
-@tree.command(name="scheduleclear", description="Clear all scheduled messages for a day")
-async def scheduleclear(interaction: discord.Interaction, day: str):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
+@bot.event
+async def on_ready():
+    global _background_started
+    print("✅ Bot is online!")
+    await tree.sync()
+    if scheduler_lease.held:
+        reconcile_guilds()
+    # on_ready fires again after reconnects; only start background work once
+    if not _background_started:
+        _background_started = True
+        asyncio.create_task(scheduler_clock())
+        outbox_retry.start()
+        compaction.start()
+        lease_watch.start()
+        asyncio.create_task(monitor_loop_lag())
 
-    if day not in VALID_DAYS:
-        return await interaction.response.send_message(
-            "❌ Invalid day.",
-            ephemeral=True
-        )
 
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
+_client_close = bot.close
 
-    if day not in schedule_data:
-        return await interaction.response.send_message(
-            f"❌ No schedule for **{day}**.",
-            ephemeral=True
-        )
 
-    del schedule_data[day]
-    save_data(data)
+async def close_bot() -> None:
+    """Shutdown: drain the outbound pipeline, close the webhook session, then disconnect."""
+    try:
+        await asyncio.wait_for(outbound.join(), OUTBOUND_DRAIN_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"⚠️ Outbound posts still queued after {OUTBOUND_DRAIN_SECONDS:g}s; leaving them to the outbox.")
+    if _webhook_session is not None and not _webhook_session.closed:
+        await _webhook_session.close()
+    await _client_close()
 
-    await interaction.response.send_message(
-        f"🧹 Cleared schedule for **{day}**.",
-        ephemeral=True
-    )
 
-
-@tree.command(name="removeschedule", description="(Alias) Clear all messages for a day")
-async def removeschedule(interaction: discord.Interaction, day: str):
-    await scheduleclear.callback(interaction, day=day)  # type: ignore
+bot.close = close_bot  # type: ignore[method-assign]
 
 
 # ======================================================
-# VIEWSCHEDULE / VIEWSETTINGS
+# MULTI-PROCESS SUPERVISOR
 # ======================================================
-@tree.command(name="viewschedule", description="View weekly schedule summary")
-async def viewschedule(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    guild_data = data[str(gid)]
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-
-    lines: List[str] = []
-    for d in VALID_DAYS:
-        queue = schedule_data.get(d, [])
-        if queue:
-            ids = ", ".join(str(mid) for mid in queue)
-            lines.append(f"**{d}** → `{ids}`")
-        else:
-            lines.append(f"**{d}** → *(none)*")
-
-    embed = discord.Embed(
-        title="📅 Weekly Schedule",
-        description="\n".join(lines),
-        colour=discord.Colour.blurple()
-    )
-
-    await interaction.response.send_message(embed=embed, ephemeral=False)
-
-
-@tree.command(name="viewchannel", description="Show configured auto-post channel")
-async def viewchannel(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    guild = interaction.guild
-    if guild is None:
-        return await interaction.response.send_message(
-            "❌ Cannot be used in DMs.",
-            ephemeral=True
-        )
-
-    guild_data = data[str(gid)]
-    channel_id = guild_data.get("post_channel")
-    if channel_id is None:
-        return await interaction.response.send_message(
-            "❌ No auto-post channel set.",
-            ephemeral=True
-        )
-
-    channel = guild.get_channel(channel_id)
-    if not isinstance(channel, discord.TextChannel):
-        return await interaction.response.send_message(
-            "⚠️ Channel not found or not a text channel.",
-            ephemeral=True
-        )
-
-    await interaction.response.send_message(
-        f"📌 Auto-posting in: {channel.mention}",
-        ephemeral=False
-    )
-
-
-@tree.command(name="viewsettings", description="Full server bot settings")
-async def viewsettings(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    guild = interaction.guild
-    if guild is None:
-        return await interaction.response.send_message(
-            "❌ Cannot use in DMs.",
-            ephemeral=True
-        )
-
-    guild_data = data[str(gid)]
-
-    # channel
-    channel_id = guild_data.get("post_channel")
-    if channel_id:
-        ch = guild.get_channel(channel_id)
-        channel_text = ch.mention if isinstance(ch, discord.TextChannel) else "Invalid / deleted"
-    else:
-        channel_text = "Not set"
-
-    # schedule
-    schedule_data: Dict[str, List[int]] = guild_data["schedule"]
-    schedule_lines: List[str] = []
-    if not schedule_data:
-        schedule_lines.append("→ No scheduled posts.")
-    else:
-        for d in VALID_DAYS:
-            queue = schedule_data.get(d, [])
-            if queue:
-                schedule_lines.append(f"• **{d}** → `{', '.join(str(x) for x in queue)}`")
-
-    embed = discord.Embed(
-        title="🔧 Server Bot Settings",
-        colour=discord.Colour.blurple()
-    )
-    embed.add_field(name="Auto-Post Channel", value=channel_text, inline=False)
-    embed.add_field(
-        name="Saved Messages",
-        value=str(len(guild_data["messages"])),
-        inline=False
-    )
-    embed.add_field(
-        name="Weekly Schedule",
-        value="\n".join(schedule_lines) if schedule_lines else "→ No scheduled posts.",
-        inline=False
-    )
+def split_shards(shard_count: int, workers: int) -> List[List[int]]:
+    """Split shard IDs 0..shard_count-1 into contiguous ranges, one per worker."""
+    base, extra = divmod(shard_count, workers)
+    ranges: List[List[int]] = []
+    start = 0
+    for i in range(workers):
+        size = base + (1 if i < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def run_supervisor(workers: int, shard_count: int) -> None:
+    """Run one bot process per shard range and restart any that exit."""
+    load_token()  # fail fast before spawning anything
+    if shard_count < workers:
+        print("❌ ERROR: --shard-count must be at least --workers.")
+        raise SystemExit
 
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    ranges = split_shards(shard_count, workers)
+    procs: Dict[int, subprocess.Popen] = {}
+    backoff: Dict[int, float] = {i: 1.0 for i in range(workers)}
+    started_at: Dict[int, float] = {}
+    restart_at: Dict[int, float] = {i: 0.0 for i in range(workers)}
+    stopping = False
+
+    def spawn(i: int) -> None:
+        env = dict(os.environ)
+        env["SHARD_COUNT"] = str(shard_count)
+        env["SHARD_IDS"] = f"{ranges[i][0]}-{ranges[i][-1]}"
+        if METRICS_PORT:
+            env["METRICS_PORT"] = str(METRICS_PORT + i)
+        procs[i] = subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env)
+        started_at[i] = time.monotonic()
+        print(f"🚀 Worker {i} (pid {procs[i].pid}) owns shards {env['SHARD_IDS']} of {shard_count}.")
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for i in range(workers):
+        spawn(i)
+
+    while not stopping:
+        time.sleep(1)
+        now = time.monotonic()
+        for i in range(workers):
+            proc = procs.get(i)
+            if proc is not None and proc.poll() is None:
+                # a worker that stayed up for 5 minutes earns a fresh backoff
+                if now - started_at[i] > 300:
+                    backoff[i] = 1.0
+                continue
+            if proc is not None:
+                print(f"⚠️ Worker {i} exited with {proc.returncode}; restarting in {backoff[i]:.0f}s.")
+                procs.pop(i)
+                restart_at[i] = now + backoff[i]
+                backoff[i] = min(backoff[i] * 2, 60.0)
+            if now >= restart_at[i]:
+                spawn(i)
+
+    print("🛑 Stopping workers…")
+    for proc in procs.values():
+        if proc.poll() is None:
+            proc.terminate()
+    for proc in procs.values():
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
 
 
 # ======================================================
-# CHANNEL CONFIGURATION
+# START BOT
 # ======================================================
-@tree.command(name="setschedulechannel", description="Set channel for auto-posting")
-async def setschedulechannel(
-    interaction: discord.Interaction,
-    channel: discord.abc.GuildChannel
-):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    try:
-        text_ch = safe_text_channel(channel)
-    except ValueError:
-        return await interaction.response.send_message(
-            "❌ Select a normal text channel.",
-            ephemeral=True
-        )
-
-    data[str(gid)]["post_channel"] = text_ch.id
-    save_data(data)
-
-    await interaction.response.send_message(
-        f"📌 Auto-post channel set to {text_ch.mention}.",
-        ephemeral=True
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Weekly posting Discord bot")
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="run a supervisor that starts this many shard worker processes"
     )
-
-
-@tree.command(name="deletechannel", description="Remove configured auto-post channel")
-async def deletechannel(interaction: discord.Interaction):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    data[str(gid)]["post_channel"] = None
-    save_data(data)
-
-    await interaction.response.send_message(
-        "🗑 Auto-post channel removed.",
-        ephemeral=True
+    parser.add_argument(
+        "--shard-count", type=int, default=0,
+        help="total shards split across --workers (default: one per worker)"
     )
-
-
-# ======================================================
-# CLEARALL (ADMIN ONLY)
-# ======================================================
-@tree.command(name="clearall", description="Delete ALL messages & schedules (Admin only)")
-async def clearall(interaction: discord.Interaction):
-    member = safe_member(interaction)
-    if not member.guild_permissions.administrator:
-        return await interaction.response.send_message(
-            "❌ Admin only.",
-            ephemeral=True
-        )
-
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    data[str(gid)]["messages"] = {}
-    data[str(gid)]["schedule"] = {}
-    data[str(gid)]["post_channel"] = None
-    save_data(data)
-
-    await interaction.response.send_message(
-        "🧨 All bot data cleared for this server.",
-        ephemeral=True
+    parser.add_argument(
+        "--export-data", metavar="DIR",
+        help="write guild data as importable JSONL/ZIP parts into DIR and exit"
     )
-
-
-# ======================================================
-# POST NOW
-# ======================================================
-@tree.command(name="postnow", description="Post a message immediately in this channel")
-async def postnow(interaction: discord.Interaction, message_id: int):
-    gid = safe_guild_id(interaction)
-    ensure_guild(gid)
-
-    guild_data = data[str(gid)]
-    msg = guild_data["messages"].get(str(message_id))
-    if not msg:
-        return await interaction.response.send_message(
-            "❌ Message not found.",
-            ephemeral=True
-        )
-
-    channel = interaction.channel
-    if not isinstance(channel, discord.TextChannel):
-        return await interaction.response.send_message(
-            "❌ Can't post in this channel type.",
-            ephemeral=True
-        )
-
-    for part in split_message(msg):
-        await channel.send(part)
-
-    await interaction.response.send_message(
-        "✔ Message posted.",
-        ephemeral=True
+    parser.add_argument("--guild", help="with --export-data: only this guild ID")
+    parser.add_argument("--format", choices=["jsonl", "zip"], default="jsonl", help="with --export-data")
+    parser.add_argument(
+        "--part-bytes", type=int, default=EXPORT_PART_BYTES,
+        help="with --export-data: split parts at this size"
     )
-
-
-# ======================================================
-# TIME CHECK
-# ======================================================
-@tree.command(name="timecheck", description="Show UTC time and posting time")
-async def timecheck(interaction: discord.Interaction):
-    now = datetime.now(timezone.utc)
-    await interaction.response.send_message(
-        f"🕒 **UTC Time:** {now.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        f"🕒 **Auto-posts at:** {POST_HOUR_UTC:02d}:{POST_MINUTE_UTC:02d}",
-        ephemeral=True
+    parser.add_argument(
+        "--import-data", nargs="+", metavar="FILE",
+        help="merge exported parts into the data file and exit (refused while a bot holds the lease)"
     )
+    args = parser.parse_args()
 
-
-# ======================================================
-# AUTO POST LOOP (MULTI-MESSAGE PER DAY)
-# ======================================================
-@tasks.loop(minutes=1)
-async def autopost():
-    now = datetime.now(timezone.utc)
-    if now.hour != POST_HOUR_UTC or now.minute != POST_MINUTE_UTC:
+    if args.export_data:
+        run_export(args.export_data, args.guild, args.format, args.part_bytes)
+        return
+    if args.import_data:
+        run_import(args.import_data)
         return
 
-    today = now.strftime("%A")
-
-    for gid, server in data.items():
-        channel_id = server.get("post_channel")
-        if not isinstance(channel_id, int):
-            continue
-
-        schedule_data = server.get("schedule", {})
-        queue = schedule_data.get(today)
-        if not isinstance(queue, list) or not queue:
-            continue
-
-        guild = bot.get_guild(int(gid))
-        if guild is None:
-            continue
-
-        channel = guild.get_channel(channel_id)
-        if not isinstance(channel, discord.TextChannel):
-            continue
-
-        messages_map = server.get("messages", {})
-        for mid in queue:
-            msg_text = messages_map.get(str(mid))
-            if not isinstance(msg_text, str):
-                continue
-            for part in split_message(msg_text):
-                await channel.send(part)
-
-
-@autopost.before_loop
-async def before_autopost():
-    await bot.wait_until_ready()
-
+    if args.workers:
+        run_supervisor(args.workers, args.shard_count or args.workers)
+        return
 
-# ======================================================
-# BOT READY
-# ======================================================
-@bot.event
-async def on_ready():
-    print("✅ Bot is online!")
-    await tree.sync()
-    autopost.start()
+    if not take_over_lease():
+        print(f"🕒 Standby: {LEASE_FILE} is held by another instance; waiting to take over.")
+    start_http_server()
+    bot.run(load_token())
 
 
-# ======================================================
-# START BOT
-# ======================================================
 if __name__ == "__main__":
-    bot.run(load_token())
+    main()
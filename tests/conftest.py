@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# bot.py reads its file locations at import time; keep them out of the checkout
+_TMP = tempfile.mkdtemp(prefix="weekly-posting-tests-")
+os.environ.setdefault("BOT_DATA_FILE", os.path.join(_TMP, "serverdata.json"))
+
+import bot as bot_module  # noqa: E402
+
+
+@pytest.fixture
+def bot():
+    """bot.py with empty data and a fresh fire index; every guild owned."""
+    bot_module.data.clear()
+    bot_module.fire_index.__init__()
+    bot_module._guild_locks.clear()   # asyncio locks are bound to one test's loop
+    saved = bot_module.owns_guild
+    bot_module.owns_guild = lambda guild_id: True
+    yield bot_module
+    bot_module.owns_guild = saved
+    bot_module.data.clear()
+    bot_module.fire_index.__init__()
+
+
+def add_guild(bot, guild_id: int, **slot) -> dict:
+    """A normalized guild with one slot "main" posting message 1 every day."""
+    raw_slot = {"channel": 1000 + guild_id, "schedule": {day: [1] for day in bot.VALID_DAYS}}
+    raw_slot.update(slot)
+    g = {"messages": {"1": "hello"}, "timezone": "UTC", "slots": {"main": raw_slot}}
+    bot.normalize_guild(g)
+    bot.data[str(guild_id)] = g
+    return g
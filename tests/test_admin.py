@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from conftest import add_guild
+
+
+def test_batch_if_match_is_checked_under_the_guild_lock(bot):
+    add_guild(bot, 1)
+    bot.save_data(bot.data)
+    etag = bot._etag(bot.data_version)
+    op = {"op": "set_message", "guild": "1", "id": 2, "text": "new"}
+
+    async def scenario():
+        lock = bot.guild_lock(1)
+        await lock.acquire()
+        batch = asyncio.create_task(bot.apply_admin_batch([op], etag))
+        await asyncio.sleep(0)
+        # another write lands while the batch waits for the lock
+        bot.data["1"]["messages"]["3"] = "edited elsewhere"
+        bot.save_data(bot.data)
+        lock.release()
+        return await batch
+
+    status, result = asyncio.run(scenario())
+    assert status == 412
+    assert "2" not in bot.data["1"]["messages"]
+
+
+def test_batch_on_guild_removed_meanwhile_is_a_conflict(bot):
+    add_guild(bot, 1)
+    op = {"op": "set_timezone", "guild": "1", "timezone": "UTC"}
+
+    async def scenario():
+        lock = bot.guild_lock(1)
+        await lock.acquire()
+        batch = asyncio.create_task(bot.apply_admin_batch([op]))
+        await asyncio.sleep(0)
+        del bot.data["1"]   # compaction
+        lock.release()
+        return await batch
+
+    status, _ = asyncio.run(scenario())
+    assert status == 409
+
+
+def test_admin_view_hides_webhook_tokens(bot):
+    g = add_guild(bot, 1)
+    g["webhook"]["cache"]["1001"] = {"id": 5, "token": "secret"}
+    view = json.loads(bot.CODECS["json"].dumps(bot.admin_view(g)))
+    assert "secret" not in json.dumps(view)
+    assert view["messages"] == g["messages"]
+    assert g["webhook"]["cache"]   # the live guild keeps its cache
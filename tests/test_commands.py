@@ -0,0 +1,27 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class _Response:
+    def is_done(self) -> bool:
+        return False
+
+
+def _interaction(name: str = "post_now"):
+    return SimpleNamespace(extras={}, command=SimpleNamespace(qualified_name=name), response=_Response())
+
+
+def test_standby_rejection_is_its_own_outcome(bot, monkeypatch, capsys):
+    monkeypatch.setattr(type(bot.scheduler_lease), "held", property(lambda self: False))
+    interaction = _interaction("standby_probe")
+
+    async def scenario():
+        allowed = await bot.tree.interaction_check(interaction)
+        await bot.tree.on_error(interaction, bot.app_commands.CheckFailure())
+        return allowed
+
+    assert asyncio.run(scenario()) is False
+    assert bot.COMMAND_ACK_OUTCOMES.value(command="standby_probe", outcome="standby") == 1
+    assert bot.COMMAND_ACK_OUTCOMES.value(command="standby_probe", outcome="timeout") == 0
+    assert "defer_task" not in interaction.extras
+    assert "Traceback" not in capsys.readouterr().err
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from conftest import add_guild
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_compile_rejects_bad_fields(bot):
+    for expression in ("* * * *", "60 * * * *", "* 24 * * *", "* * * * MON#6", "*/0 * * * *"):
+        try:
+            bot.compile_cron(expression)
+        except ValueError:
+            continue
+        raise AssertionError(f"{expression!r} compiled")
+
+
+def test_next_after_steps(bot):
+    cron = bot.compile_cron("*/15 9-10 * * *")
+    assert cron.next_after(datetime(2026, 1, 5, 9, 0)) == datetime(2026, 1, 5, 9, 15)
+    assert cron.next_after(datetime(2026, 1, 5, 10, 45)) == datetime(2026, 1, 6, 9, 0)
+
+
+def test_nth_weekday_and_every_other_week(bot):
+    first_monday = bot.compile_cron("30 9 * * MON#1")
+    assert first_monday.next_after(datetime(2026, 2, 2, 9, 30)) == datetime(2026, 3, 2, 9, 30)
+
+    fortnightly = bot.compile_cron("0 18 * * TUE%2")
+    first = fortnightly.next_after(datetime(2026, 1, 1))
+    assert first.weekday() == 1
+    assert fortnightly.next_after(first) - first == timedelta(weeks=2)
+
+
+def test_leap_day_is_found_years_ahead(bot):
+    assert bot.compile_cron("0 0 29 2 *").next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_cron_slot_edited_mid_minute_still_fires(bot):
+    # regression: re-indexing after second 0 of a matching minute armed the
+    # only pending fire in a second due() had already passed
+    add_guild(bot, 1, cron="*/5 * * * *")
+    index = bot.fire_index
+    index.rebuild(utc(2026, 1, 5, 9, 4, 50))
+    assert index.due(utc(2026, 1, 5, 9, 5, 0)) == [(bot.epoch_second(utc(2026, 1, 5, 9, 5)), (1, "main"))]
+
+    edited = utc(2026, 1, 5, 9, 5, 30)
+    index.update_slot(1, "main", edited)
+    fired = []
+    now = edited
+    while now < edited + timedelta(hours=1):
+        now += timedelta(seconds=20)
+        fired.extend(sec for sec, _ in index.due(now))
+    assert len(fired) == 12
+    assert fired[0] == bot.epoch_second(utc(2026, 1, 5, 9, 10))
+
+
+def test_cron_slot_rearms_after_missed_fires(bot):
+    add_guild(bot, 1, cron="* * * * *")
+    index = bot.fire_index
+    index.rebuild(utc(2026, 1, 5, 9, 0, 0))
+    index.due(utc(2026, 1, 5, 9, 0, 30))
+    # a stall longer than the catch-up window drops the missed fires...
+    late = utc(2026, 1, 5, 9, 0, 30) + timedelta(seconds=bot.SCHEDULER_CATCHUP_SECONDS + 70)
+    caught_up = index.due(late)
+    assert caught_up and all(sec <= bot.epoch_second(late) for sec, _ in caught_up)
+    # ...but the slot keeps firing afterwards
+    assert index.due(late + timedelta(minutes=1))
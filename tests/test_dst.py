@@ -0,0 +1,94 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def berlin(bot):
+    # 2026: clocks go 02:00 -> 03:00 on 29 March and 03:00 -> 02:00 on 25 October
+    return bot.get_tzinfo("Europe/Berlin")
+
+
+def test_gap_shifts_forward_by_the_gap(bot, berlin):
+    at = bot.local_to_utc(datetime(2026, 3, 29, 2, 30), berlin, "shift", "first")
+    assert at == utc(2026, 3, 29, 1, 30)
+    assert at.astimezone(berlin).strftime("%H:%M") == "03:30"
+
+
+def test_gap_can_be_skipped(bot, berlin):
+    assert bot.local_to_utc(datetime(2026, 3, 29, 2, 30), berlin, "skip", "first") is None
+
+
+def test_overlap_picks_the_requested_occurrence(bot, berlin):
+    naive = datetime(2026, 10, 25, 2, 30)
+    assert bot.local_to_utc(naive, berlin, "shift", "first") == utc(2026, 10, 25, 0, 30)
+    assert bot.local_to_utc(naive, berlin, "shift", "second") == utc(2026, 10, 25, 1, 30)
+
+
+def test_ordinary_times_are_unaffected(bot, berlin):
+    assert bot.local_to_utc(datetime(2026, 3, 30, 2, 30), berlin, "skip", "second") == utc(2026, 3, 30, 0, 30)
+
+
+def test_fire_table_row_follows_the_policy(bot, monkeypatch):
+    monkeypatch.setattr(bot, "DST_NONEXISTENT_POLICY", "skip")
+    table = bot.ZoneFireTable("Europe/Berlin", date(2026, 3, 28), 1)
+    row = dict(table.instants(2, 30))
+    assert row[date(2026, 3, 28)] == utc(2026, 3, 28, 1, 30)
+    assert row[date(2026, 3, 29)] is None
+    assert row[date(2026, 3, 30)] == utc(2026, 3, 30, 0, 30)
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("shift", utc(2026, 3, 29, 1, 30)),
+    ("skip", utc(2026, 3, 30, 0, 30)),
+])
+def test_cron_across_the_gap(bot, berlin, monkeypatch, policy, expected):
+    monkeypatch.setattr(bot, "DST_NONEXISTENT_POLICY", policy)
+    cron = bot.compile_cron("30 2 * * *")
+    after = bot.epoch_minute(utc(2026, 3, 28, 12, 0))
+    assert bot.cron_next_minute(cron, berlin, after) == bot.epoch_minute(expected)
+
+
+def test_cron_in_the_overlap_fires_once(bot, berlin, monkeypatch):
+    monkeypatch.setattr(bot, "DST_AMBIGUOUS_POLICY", "first")
+    cron = bot.compile_cron("30 2 * * *")
+    first = bot.cron_next_minute(cron, berlin, bot.epoch_minute(utc(2026, 10, 24, 12, 0)))
+    assert first == bot.epoch_minute(utc(2026, 10, 25, 0, 30))
+    following = bot.cron_next_minute(cron, berlin, first)
+    assert following == bot.epoch_minute(utc(2026, 10, 26, 1, 30))
+
+
+@pytest.mark.parametrize("expression", ["*/5 * * * *", "* * * * *"])
+def test_sub_hour_cron_inside_the_repeated_hour_resumes_after_it(bot, monkeypatch, expression):
+    # regression: each retry mapped back to the first (already past) 01:xx
+    # and the slot was left unarmed
+    monkeypatch.setattr(bot, "DST_AMBIGUOUS_POLICY", "first")
+    new_york = bot.get_tzinfo("America/New_York")
+    after = bot.epoch_minute(utc(2026, 11, 1, 6, 10))   # 01:10 EST, second pass
+    nxt = bot.cron_next_minute(bot.compile_cron(expression), new_york, after)
+    assert nxt == bot.epoch_minute(utc(2026, 11, 1, 7, 0))   # 02:00 EST
+
+
+def test_sub_hour_cron_fires_each_wall_time_once_across_the_overlap(bot, monkeypatch):
+    monkeypatch.setattr(bot, "DST_AMBIGUOUS_POLICY", "first")
+    new_york = bot.get_tzinfo("America/New_York")
+    cron = bot.compile_cron("*/5 * * * *")
+    fires = []
+    minute = bot.epoch_minute(utc(2026, 11, 1, 4, 55))   # 00:55 EDT
+    while minute < bot.epoch_minute(utc(2026, 11, 1, 7, 0)):
+        minute = bot.cron_next_minute(cron, new_york, minute)
+        fires.append(minute)
+    walls = [datetime.fromtimestamp(m * 60, tz=timezone.utc).astimezone(new_york).strftime("%H:%M") for m in fires]
+    assert walls == [f"01:{m:02d}" for m in range(0, 60, 5)] + ["02:00"]
+
+
+def test_sub_hour_cron_skips_the_whole_gap(bot, monkeypatch):
+    monkeypatch.setattr(bot, "DST_NONEXISTENT_POLICY", "skip")
+    new_york = bot.get_tzinfo("America/New_York")
+    after = bot.epoch_minute(utc(2026, 3, 8, 6, 55))     # 01:55 EST
+    nxt = bot.cron_next_minute(bot.compile_cron("*/5 * * * *"), new_york, after)
+    assert nxt == bot.epoch_minute(utc(2026, 3, 8, 7, 0))    # 03:00 EDT
@@ -0,0 +1,57 @@
+import pytest
+
+from conftest import add_guild
+
+
+def sample_guilds(bot) -> None:
+    for guild_id in (1, 2, 3):
+        g = add_guild(bot, guild_id, cron="*/15 9-17 * * MON-FRI")
+        g["messages"].update({str(n): f"guild {guild_id} message {n} " + "x" * 200 for n in range(2, 12)})
+        g["pools"] = {"p": bot.normalize_pool({"mode": "sequence", "messages": [2, 3, 4], "cursor": 1})}
+        g["webhook"] = {"enabled": True, "name": "poster", "avatar_url": None, "cache": {"secret": "token"}}
+        bot.normalize_guild(g)
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "zip"])
+def test_split_export_imports_back_to_the_same_guilds(bot, tmp_path, fmt):
+    sample_guilds(bot)
+    guild_ids = sorted(bot.data)
+    paths = []
+    for name, payload in bot.iter_export_parts(bot.export_records(bot.data, guild_ids), "export-all", fmt, 1024):
+        path = tmp_path / name
+        path.write_bytes(payload)
+        paths.append(str(path))
+    assert len(paths) > 3   # the split limit was in effect
+
+    imported = bot.import_records(record for path in paths for record in bot.read_export_file(path))
+    assert sorted(imported) == guild_ids
+    for gid in guild_ids:
+        expected = dict(bot.data[gid])
+        expected["webhook"] = {key: value for key, value in expected["webhook"].items() if key != "cache"}
+        got = dict(imported[gid])
+        got["webhook"] = {key: value for key, value in got["webhook"].items() if key != "cache"}
+        assert got == expected
+        assert "secret" not in str(imported[gid])
+
+
+def test_import_is_refused_while_a_bot_holds_the_lease(bot, tmp_path, monkeypatch):
+    lease_file = str(tmp_path / "lease")
+    running = bot.SchedulerLease(lease_file, True)
+    assert running.try_acquire()
+    monkeypatch.setattr(bot, "scheduler_lease", bot.SchedulerLease(lease_file, True))
+    add_guild(bot, 1)
+    bot.save_data(bot.data)
+    with open(bot.DATA_FILE, "rb") as f:
+        before = f.read()
+    part = tmp_path / "part.jsonl"
+    for _, payload in bot.iter_export_parts(bot.export_records({"2": bot.data["1"]}, ["2"]), "x"):
+        part.write_bytes(payload)
+
+    with pytest.raises(SystemExit):
+        bot.run_import([str(part)])
+    with open(bot.DATA_FILE, "rb") as f:
+        assert f.read() == before
+
+    running.release()
+    bot.run_import([str(part)])
+    assert sorted(bot.load_data()) == ["1", "2"]
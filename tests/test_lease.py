@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+from conftest import add_guild
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_checkpoint_is_handed_to_the_next_holder(bot, tmp_path):
+    path = str(tmp_path / "lease")
+    first = bot.SchedulerLease(path, True)
+    assert first.try_acquire() and first.resume_second is None
+    first.checkpoint(1234)
+    first.release()
+
+    second = bot.SchedulerLease(path, True)
+    assert second.try_acquire()
+    assert second.token == first.token + 1
+    assert second.resume_second == 1234
+    assert second.is_current()
+    second.release()
+
+
+def test_takeover_mid_minute_does_not_refire_delivered_seconds(bot):
+    # two slots in one minute: the old holder delivered :00 and stopped at :20
+    add_guild(bot, 1, cron="0 9 * * *")
+    add_guild(bot, 2, hour=9, minute=0, second=40, time_set=True)
+    delivered = bot.epoch_second(utc(2026, 1, 5, 9, 0, 20))
+
+    index = bot.fire_index
+    index.rebuild(utc(2026, 1, 5, 9, 0, 30), resume_second=delivered)
+    fired = index.due(utc(2026, 1, 5, 9, 0, 45))
+    assert fired == [(bot.epoch_second(utc(2026, 1, 5, 9, 0, 40)), (2, "main"))]
+    # the cron slot was re-armed for the next day, not stranded
+    assert index.slot_fires[(1, "main")] == [bot.epoch_second(utc(2026, 1, 6, 9, 0))]
+
+
+def test_restart_without_checkpoint_takes_the_current_minute(bot):
+    add_guild(bot, 1, cron="0 9 * * *")
+    index = bot.fire_index
+    index.rebuild(utc(2026, 1, 5, 9, 0, 30))
+    assert index.due(utc(2026, 1, 5, 9, 0, 31)) == [(bot.epoch_second(utc(2026, 1, 5, 9, 0)), (1, "main"))]
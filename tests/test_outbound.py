@@ -0,0 +1,96 @@
+import asyncio
+
+
+class Channel:
+    """Records sends into a shared log; optionally blocks until released."""
+
+    def __init__(self, name: str, log: list, gate: asyncio.Event = None):
+        self.name = name
+        self.log = log
+        self.gate = gate
+
+    async def send(self, content: str) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        self.log.append(self.name)
+
+
+def test_interactive_lanes_go_before_queued_scheduled_posts(bot, monkeypatch):
+    monkeypatch.setattr(bot, "send_budget", bot.SendBudget(0, 0))   # no rate limit
+    pipeline = bot.OutboundPipeline(1)
+    log: list = []
+
+    async def scenario():
+        gate = asyncio.Event()
+        pipeline.submit(Channel("busy", log, gate), ["x"], "autopost")
+        await asyncio.sleep(0)   # the only sender is now stuck on "busy"
+        for n in range(3):
+            pipeline.submit(Channel(f"scheduled{n}", log), ["x"], "autopost")
+        pipeline.submit(Channel("postnow", log), ["x"], "postnow")
+        pipeline.submit(Channel("interaction", log), ["x"], "interaction")
+        gate.set()
+        await pipeline.join()
+
+    asyncio.run(scenario())
+    assert log == ["busy", "interaction", "postnow", "scheduled0", "scheduled1", "scheduled2"]
+
+
+def test_reserved_sender_answers_while_scheduled_posts_block(bot, monkeypatch):
+    monkeypatch.setattr(bot, "send_budget", bot.SendBudget(0, 0))
+    pipeline = bot.OutboundPipeline(1, reserved=1)
+    log: list = []
+
+    async def scenario():
+        gate = asyncio.Event()
+        pipeline.submit(Channel("scheduled", log, gate), ["x"], "autopost")
+        pipeline.submit(Channel("blocked", log, gate), ["x"], "autopost")
+        reply = pipeline.submit(Channel("interaction", log), ["x"], "interaction")
+        error = await asyncio.wait_for(reply.done, 1.0)
+        gate.set()
+        await pipeline.join()
+        return error
+
+    assert asyncio.run(scenario()) is None
+    assert log[0] == "interaction"
+
+
+def test_budget_keeps_the_reserve_for_interactive_lanes_and_refills(bot):
+    budget = bot.SendBudget(rate=10, reserve=2)
+
+    async def immediate(lane: str) -> bool:
+        task = asyncio.ensure_future(budget.acquire(lane))
+        await asyncio.sleep(0)
+        if task.done():
+            return True
+        task.cancel()
+        return False
+
+    async def scenario():
+        scheduled = 0
+        while await immediate("scheduled"):
+            scheduled += 1
+        interactive = 0
+        while await immediate("interaction"):
+            interactive += 1
+        # half a second at 10/s puts five sends back
+        budget.updated -= 0.5
+        refilled = 0
+        while await immediate("postnow"):
+            refilled += 1
+        return scheduled, interactive, refilled
+
+    assert asyncio.run(scenario()) == (8, 2, 5)
+
+
+def test_scheduled_send_waits_for_the_refill(bot):
+    budget = bot.SendBudget(rate=20, reserve=0)
+    budget.tokens = 0.0
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await budget.acquire("scheduled")
+        return loop.time() - started
+
+    waited = asyncio.run(scenario())
+    assert 0.04 <= waited < 0.5   # one token at 20/s is 50 ms away
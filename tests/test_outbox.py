@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+
+def test_outbox_survives_a_failed_save(bot, tmp_path, monkeypatch):
+    box = bot.Outbox(str(tmp_path / "outbox"))
+    box.add(1, "main", 10, 100, ["a", "b"])
+    box.save()
+
+    box.add(1, "main", 10, 101, ["c"])
+
+    def torn(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "fsync", torn)
+    with pytest.raises(OSError):
+        box.save()
+    monkeypatch.undo()
+
+    reloaded = bot.Outbox(str(tmp_path / "outbox"))
+    assert list(reloaded.items) == ["1:main:100"]
+    assert reloaded.items["1:main:100"]["state"] == "pending"   # was mid-send
@@ -0,0 +1,90 @@
+import json
+import random
+
+from conftest import add_guild
+
+
+def pool_with(bot, mode: str, weights) -> dict:
+    pool = bot.new_pool(mode)
+    for mid, weight in weights.items():
+        bot.pool_set_message(pool, mid, weight)
+    return pool
+
+
+def test_sequence_pool_cycles_in_order(bot):
+    pool = pool_with(bot, "sequence", {1: 1, 2: 1, 3: 1})
+    picks = []
+    for _ in range(7):
+        picks.append(bot.pool_peek(pool))
+        bot.pool_advance(pool)
+    assert picks == [1, 2, 3, 1, 2, 3, 1]
+
+
+def test_random_bags_honour_weights_without_repeats(bot):
+    random.seed(7)
+    pool = pool_with(bot, "random", {1: 2, 2: 1, 3: 1})
+    pool["order"], pool["cursor"] = bot.deal_pool(pool), 0
+    picks = []
+    for _ in range(4 * 20):
+        picks.append(bot.pool_peek(pool))
+        bot.pool_advance(pool)
+    for bag in range(20):
+        dealt = picks[bag * 4:bag * 4 + 4]
+        assert sorted(dealt) == [1, 1, 2, 3]
+    # not even across a bag boundary
+    assert all(a != b for a, b in zip(picks, picks[1:]))
+
+
+def test_cursor_survives_a_save_and_reload(bot):
+    pool = pool_with(bot, "random", {1: 2, 2: 1, 3: 1})
+    bot.pool_advance(pool)
+    bot.pool_advance(pool)
+    upcoming = bot.pool_upcoming(pool, 10)
+
+    reloaded = bot.normalize_pool(json.loads(json.dumps(pool)))
+    assert reloaded["cursor"] == pool["cursor"] == 2
+    assert bot.pool_upcoming(reloaded, 10) == upcoming
+
+
+def test_removing_a_posted_message_keeps_the_next_pick(bot):
+    pool = pool_with(bot, "sequence", {1: 1, 2: 1, 3: 1, 4: 1})
+    bot.pool_advance(pool)
+    bot.pool_advance(pool)          # 1 and 2 posted, 3 is next
+    bot.pool_remove_message(pool, 1)
+    assert bot.pool_peek(pool) == 3
+
+
+def test_a_pool_listed_twice_posts_two_picks_and_advances_twice(bot):
+    g = add_guild(bot, 1)
+    g["messages"].update({"10": "ten", "11": "eleven", "12": "twelve"})
+    g["pools"] = {"p": pool_with(bot, "sequence", {10: 1, 11: 1, 12: 1})}
+    queue = [bot.pool_ref("p"), bot.pool_ref("p")]
+
+    assert bot.queue_sources(g, queue) == ["ten", "eleven"]
+    assert bot.advance_queue_pools(g, queue)
+    assert bot.queue_sources(g, queue) == ["twelve", "ten"]
+
+
+def test_a_random_pool_listed_twice_reads_on_into_the_next_bag(bot):
+    # regression: the second entry peeked past the bag (None) but the cursor
+    # still moved twice, consuming the new bag's first pick unposted
+    random.seed(3)
+    g = add_guild(bot, 1)
+    g["messages"].update({"10": "ten", "11": "eleven", "12": "twelve"})
+    pool = pool_with(bot, "random", {10: 1, 11: 1, 12: 1})
+    pool["order"], pool["cursor"] = [11, 12, 10], 2
+    g["pools"] = {"p": pool}
+    queue = [bot.pool_ref("p"), bot.pool_ref("p")]
+    names = {"ten": 10, "eleven": 11, "twelve": 12}
+
+    posted = []
+    for _ in range(5):
+        sources = bot.queue_sources(g, queue)
+        assert None not in sources
+        assert bot.queue_sources(g, queue) == sources   # peeking twice picks the same
+        posted.extend(names[text] for text in sources)
+        bot.advance_queue_pools(g, queue)
+
+    assert posted[0] == 10
+    for bag in range(3):
+        assert sorted(posted[1 + bag * 3:4 + bag * 3]) == [10, 11, 12]
@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content: str) -> None:
+        self.sent.append(content)
+
+
+def test_problem_report_goes_through_the_scheduled_lane(bot, monkeypatch):
+    pipeline = bot.OutboundPipeline(1)
+    monkeypatch.setattr(bot, "outbound", pipeline)
+    monkeypatch.setattr(bot, "_can_send", lambda guild, channel: True)
+    bot._preflight_reported.clear()
+    channel = FakeChannel()
+    guild = SimpleNamespace(id=1, system_channel=channel, text_channels=[])
+
+    async def scenario():
+        await bot.report_preflight_problem(guild, (1, "main"), "channel", "problem")
+        queued = pipeline.depth("scheduled")
+        await bot.report_preflight_problem(guild, (1, "main"), "channel", "problem")
+        await pipeline.join()
+        return queued
+
+    before = bot.SENDS_ATTEMPTED.value(path="preflight")
+    assert asyncio.run(scenario()) == 1
+    assert channel.sent == ["problem"]   # once a day per problem
+    assert bot.SENDS_ATTEMPTED.value(path="preflight") == before + 1
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from conftest import add_guild
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+FIRE = utc(2026, 1, 5, 9, 0, 10)
+
+
+def fixed_slot_index(bot):
+    add_guild(bot, 1, hour=9, minute=0, second=10, time_set=True)
+    index = bot.fire_index
+    index.rebuild(utc(2026, 1, 5, 8, 59, 0))
+    assert index.due(utc(2026, 1, 5, 8, 59, 30)) == []
+    return index
+
+
+def test_fire_inside_the_catchup_window_is_delivered_once(bot):
+    index = fixed_slot_index(bot)
+    missed = bot.SCHEDULER_MISSED_FIRES.value()
+    # the loop stalls past the fire, but not past the window
+    late = FIRE + timedelta(seconds=bot.SCHEDULER_CATCHUP_SECONDS - 5)
+    assert index.due(late) == [(bot.epoch_second(FIRE), (1, "main"))]
+    assert index.due(late + timedelta(seconds=1)) == []
+    assert index.due(late + timedelta(minutes=5)) == []
+    assert bot.SCHEDULER_MISSED_FIRES.value() == missed
+
+
+def test_fire_outside_the_catchup_window_is_dropped_and_counted(bot):
+    index = fixed_slot_index(bot)
+    missed = bot.SCHEDULER_MISSED_FIRES.value()
+    late = FIRE + timedelta(seconds=bot.SCHEDULER_CATCHUP_SECONDS + 5)
+    assert index.due(late) == []
+    assert bot.SCHEDULER_MISSED_FIRES.value() == missed + 1
+    # the next day's fire is still indexed and fires on time
+    tomorrow = FIRE + timedelta(days=1)
+    index.due(tomorrow - timedelta(seconds=1))
+    assert index.due(tomorrow) == [(bot.epoch_second(tomorrow), (1, "main"))]
@@ -0,0 +1,47 @@
+import os
+
+
+def write(bot, path, guilds, mtime):
+    with open(path, "wb") as f:
+        f.write(bot.CODECS["json"].dumps(guilds))
+    os.utime(path, (mtime, mtime))
+
+
+def test_switching_back_to_a_layout_keeps_later_edits(bot, tmp_path, monkeypatch):
+    base = str(tmp_path / "serverdata.json")
+    two = str(tmp_path / "serverdata.s2-0-0.json")      # SHARD_COUNT=2, shard 0
+    ten = str(tmp_path / "serverdata.s10-0-4.json")     # later SHARD_COUNT=10, shards 0-4
+    write(bot, base, {"1": {"v": "base"}, "2": {"v": "base"}}, 1000)
+    write(bot, two, {"1": {"v": "old layout"}}, 2000)
+    write(bot, ten, {"1": {"v": "edited under 10 shards"}}, 3000)
+
+    monkeypatch.setattr(bot, "BASE_DATA_FILE", base)
+    monkeypatch.setattr(bot, "DATA_FILE", two)
+    monkeypatch.setattr(bot, "owns_guild", lambda gid: gid == 1)
+    assert bot.load_data() == {"1": {"v": "edited under 10 shards"}}
+
+    # once this partition is saved again it is the newest copy
+    write(bot, two, {"1": {"v": "edited under 2 shards"}}, 4000)
+    assert bot.load_data() == {"1": {"v": "edited under 2 shards"}}
+
+
+def test_first_start_of_a_partition_seeds_from_the_shared_file(bot, tmp_path, monkeypatch):
+    base = str(tmp_path / "serverdata.json")
+    write(bot, base, {"1": {"v": "a"}, "2": {"v": "b"}}, 1000)
+    monkeypatch.setattr(bot, "BASE_DATA_FILE", base)
+    monkeypatch.setattr(bot, "DATA_FILE", str(tmp_path / "serverdata.s2-1-1.json"))
+    monkeypatch.setattr(bot, "owns_guild", lambda gid: gid == 2)
+    assert bot.load_data() == {"2": {"v": "b"}}
+
+
+def test_sibling_partitions_are_not_merged(bot, tmp_path, monkeypatch):
+    base = str(tmp_path / "serverdata.json")
+    own = str(tmp_path / "serverdata.s2-0-0.json")
+    sibling = str(tmp_path / "serverdata.s2-1-1.json")
+    write(bot, base, {}, 1000)
+    write(bot, own, {"1": {"v": "mine"}}, 2000)
+    write(bot, sibling, {"1": {"v": "stale copy"}}, 3000)
+    monkeypatch.setattr(bot, "BASE_DATA_FILE", base)
+    monkeypatch.setattr(bot, "DATA_FILE", own)
+    monkeypatch.setattr(bot, "owns_guild", lambda gid: True)
+    assert bot.load_data() == {"1": {"v": "mine"}}
@@ -0,0 +1,20 @@
+import asyncio
+
+
+def test_close_drains_and_closes_the_webhook_session(bot, monkeypatch):
+    closed = []
+
+    async def client_close():
+        closed.append(True)
+
+    monkeypatch.setattr(bot, "_client_close", client_close)
+    monkeypatch.setattr(bot, "outbound", bot.OutboundPipeline(1))
+
+    async def scenario():
+        session = bot.webhook_session()
+        await bot.close_bot()
+        return session
+
+    session = asyncio.run(scenario())
+    assert session.closed
+    assert closed == [True]
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+from conftest import add_guild
+
+VALUES = ("2026-01-05", "Monday", "Peaches", "Tue 09:00")
+
+
+def test_variables_are_filled_and_other_braces_kept(bot):
+    text = "{weekday} in {guild}: see {this} and {date}, next {next_post} {weekday}"
+    assert bot.render_message(text, VALUES) == (
+        "Monday in Peaches: see {this} and 2026-01-05, next Tue 09:00 Monday"
+    )
+
+
+def test_plain_text_is_returned_as_is(bot):
+    text = "no variables here"
+    assert bot.render_message(text, VALUES) is text
+
+
+def test_next_post_of_a_cron_slot_is_its_following_fire(bot):
+    add_guild(bot, 1, cron="0 9 * * MON,THU")
+    monday = bot.epoch_minute(datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc))
+    bot.fire_index.rebuild(datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc))
+    thursday = bot.epoch_minute(datetime(2026, 1, 8, 9, 0, tzinfo=timezone.utc))
+    assert bot.fire_index.next_slot_fire((1, "main"), monday) == thursday
@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+
+from conftest import add_guild
+
+
+class FakeChannel:
+    id = 1001
+
+    async def webhooks(self):
+        return []
+
+    async def create_webhook(self, name, reason=None):
+        return SimpleNamespace(id=77, token="secret")
+
+
+def test_webhook_cache_write_waits_for_the_guild_lock(bot):
+    add_guild(bot, 1)["webhook"]["enabled"] = True
+    cache = bot.data["1"]["webhook"]["cache"]
+
+    async def scenario():
+        lock = bot.guild_lock(1)
+        await lock.acquire()
+        resolving = asyncio.create_task(bot.resolve_webhook(1, FakeChannel()))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        held_back = dict(cache)
+        lock.release()
+        hook = await resolving
+        await bot.webhook_session().close()
+        return held_back, hook
+
+    held_back, hook = asyncio.run(scenario())
+    assert held_back == {}
+    assert cache == {"1001": [77, "secret"]}
+    assert hook.id == 77
@@ -0,0 +1,106 @@
+# ======================================================
+# DATA CODEC BENCHMARK
+# ======================================================
+"""
+Time save_data / load_data for every on-disk codec.
+
+Builds a synthetic data file shaped like serverdata.json (guilds with
+saved messages and a weekly schedule), then for each codec writes and
+reads it through a real file, as save_data and load_data do.
+
+    python tools/codecbench.py --guilds 5000 --messages 5 --chars 1500
+    python tools/codecbench.py --from serverdata.json
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORDS = "lorem ipsum dolor sit amet 👑 ✨ café naïve welcome darlings".split()
+
+
+def synthetic_data(guilds: int, messages: int, chars: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    out: Dict[str, Any] = {}
+    for n in range(guilds):
+        texts: Dict[str, str] = {}
+        for mid in range(1, messages + 1):
+            words: List[str] = []
+            size = 0
+            while size < chars:
+                w = rng.choice(WORDS)
+                words.append(w)
+                size += len(w) + 1
+            texts[str(mid)] = " ".join(words)
+        out[str(10**17 + n)] = {
+            "messages": texts,
+            "timezone": "America/Vancouver",
+            "slots": {"main": {
+                "channel": 10**18 + n, "hour": 8, "minute": 25, "timezone": None, "cron": None,
+                "schedule": {"Monday": list(range(1, messages + 1)), "Friday": [1]},
+            }},
+            "webhook": {"enabled": False, "name": None, "avatar_url": None, "cache": {}},
+        }
+    return out
+
+
+def timed(fn, repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the data file codecs.")
+    parser.add_argument("--guilds", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--chars", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--from", dest="source", default=None, help="benchmark an existing data file instead")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["BOT_DATA_FILE"] = os.path.join(tmp, "serverdata.json")
+        import bot
+
+        if args.source:
+            with open(args.source, "rb") as f:
+                sample = bot.decode_data(f.read())
+        else:
+            sample = synthetic_data(args.guilds, args.messages, args.chars, args.seed)
+        print(f"📦 {len(sample)} guilds, orjson {'available' if bot.orjson is not None else 'not installed'}\n")
+        print(f"{'codec':<12} {'size':>10} {'save':>10} {'load':>10}")
+
+        path = os.path.join(tmp, "bench.data")
+        for name, codec in bot.CODECS.items():
+            if name == "auto" or (name == "orjson" and bot.orjson is None):
+                continue
+
+            def save() -> None:
+                with open(path, "wb") as f:
+                    f.write(codec.dumps(sample))
+
+            def load() -> None:
+                with open(path, "rb") as f:
+                    bot.decode_data(f.read())
+
+            save_s = timed(save, args.repeat)
+            load_s = timed(load, args.repeat)
+            assert bot.decode_data(open(path, "rb").read()) == sample, f"{name} did not round-trip"
+            size = os.path.getsize(path)
+            print(f"{name:<12} {size / 1024 / 1024:>8.2f}MB {save_s * 1000:>8.1f}ms {load_s * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
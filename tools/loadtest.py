@@ -0,0 +1,612 @@
+# ======================================================
+# LOCAL LOAD TEST (FAKE DISCORD TRANSPORT)
+# ======================================================
+"""
+Measure posting throughput without touching Discord.
+
+Starts a local stand-in for the slice of the REST API bot.py uses
+(channel message create, channel webhooks, interaction callbacks and
+followups), points
+the bot at it through DISCORD_API_BASE and drives the autopost and
+postnow paths against a synthetic fleet of guilds.
+
+    python tools/loadtest.py --guilds 200 --messages 3 --chars 5000
+    python tools/loadtest.py --path postnow --rate-429 0.05 --rate-5xx 0.02
+    python tools/loadtest.py --path contended --guilds 500 --interactive 20
+
+The fake server can also run on its own (``--serve-only``) so a real
+``python bot.py`` can be pointed at it with DISCORD_API_BASE.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DISCORD_EPOCH_MS = 1420070400000
+APP_ID = 900000000000000001
+BOT_USER = {
+    "id": str(APP_ID),
+    "username": "weekly-posting",
+    "discriminator": "0000",
+    "global_name": None,
+    "avatar": None,
+    "bot": True,
+    "flags": 0,
+}
+OWNER_USER = {
+    "id": "900000000000000002",
+    "username": "owner",
+    "discriminator": "0000",
+    "global_name": None,
+    "avatar": None,
+    "flags": 0,
+}
+FAKE_TIMESTAMP = "2024-01-01T00:00:00.000000+00:00"
+
+
+def snowflake(seq: int) -> int:
+    """Build a plausible snowflake so shard math on guild IDs still works."""
+    ms = int(time.time() * 1000) - DISCORD_EPOCH_MS
+    return (ms << 22) | (seq & 0x3FFFFF)
+
+
+def json_response(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    """Like web.json_response, but without the charset suffix discord.py does not expect."""
+    return web.Response(
+        body=json.dumps(payload).encode("utf-8"),
+        status=status,
+        headers={"Content-Type": "application/json", **(headers or {})},
+    )
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+# ======================================================
+# FAKE DISCORD REST SERVER
+# ======================================================
+class FakeDiscord:
+    """aiohttp app that answers like Discord, with injected latency and faults."""
+
+    def __init__(
+        self,
+        latency_ms: float = 80.0,
+        jitter_ms: float = 40.0,
+        rate_429: float = 0.0,
+        retry_after: float = 0.25,
+        rate_5xx: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rate_5xx = rate_5xx
+        self.rng = random.Random(seed)
+        self._seq = 0
+
+        # (channel_id, content, perf_counter at delivery)
+        self.deliveries: List[Tuple[int, str, float]] = []
+        # interaction_id -> perf_counter of the first callback
+        self.acks: Dict[int, float] = {}
+        # interaction token -> perf_counter of the first followup
+        self.followups: Dict[str, float] = {}
+        self.injected: Counter = Counter()
+        # webhook_id -> (channel_id, token)
+        self.webhooks: Dict[int, Tuple[int, str]] = {}
+
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get("/api/v10/users/@me", self.get_me),
+            web.get("/api/v10/oauth2/applications/@me", self.get_application),
+            web.post("/api/v10/channels/{channel_id}/messages", self.create_message),
+            web.get("/api/v10/channels/{channel_id}/webhooks", self.list_webhooks),
+            web.post("/api/v10/channels/{channel_id}/webhooks", self.create_webhook),
+            web.post("/api/v10/interactions/{interaction_id}/{token}/callback", self.interaction_callback),
+            web.post("/api/v10/webhooks/{webhook_id}/{token}", self.webhook_execute),
+            web.patch("/api/v10/webhooks/{webhook_id}/{token}/messages/{message_id}", self.webhook_edit),
+        ])
+
+    def reset(self) -> None:
+        self.deliveries.clear()
+        self.acks.clear()
+        self.followups.clear()
+        self.injected.clear()
+
+    def _next_id(self) -> int:
+        self._seq += 1
+        return snowflake(self._seq)
+
+    def _message(self, channel_id: int, content: str, webhook_id: Optional[int] = None) -> Dict[str, Any]:
+        payload = {
+            "id": str(self._next_id()),
+            "channel_id": str(channel_id),
+            "type": 0,
+            "content": content,
+            "author": BOT_USER,
+            "attachments": [],
+            "embeds": [],
+            "mentions": [],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "pinned": False,
+            "tts": False,
+            "timestamp": FAKE_TIMESTAMP,
+            "edited_timestamp": None,
+            "flags": 0,
+            "components": [],
+        }
+        if webhook_id is not None:
+            payload["webhook_id"] = str(webhook_id)
+        return payload
+
+    async def _inject(self) -> Optional[web.Response]:
+        """Sleep for a realistic round trip, then maybe answer with a fault."""
+        delay = max(0.0, self.rng.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        roll = self.rng.random()
+        if roll < self.rate_429:
+            self.injected["429"] += 1
+            return json_response(
+                {"message": "You are being rate limited.", "retry_after": self.retry_after, "global": False},
+                status=429,
+                headers={
+                    "Retry-After": str(self.retry_after),
+                    "X-RateLimit-Scope": "user",
+                    # discord.py treats a 429 without Via as a Cloudflare ban
+                    "Via": "1.1 google",
+                },
+            )
+        if roll < self.rate_429 + self.rate_5xx:
+            status = self.rng.choice([500, 502, 503])
+            self.injected[str(status)] += 1
+            return json_response({"message": f"{status}: Server Error", "code": 0}, status=status)
+        return None
+
+    async def _json(self, request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        # multipart (files) - the JSON lives in the payload_json field
+        if request.content_type.startswith("multipart/"):
+            form = await request.post()
+            raw = form.get("payload_json")
+            if isinstance(raw, str):
+                return json.loads(raw)
+        return {}
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return json_response(BOT_USER)
+
+    async def get_application(self, request: web.Request) -> web.Response:
+        return json_response({
+            "id": str(APP_ID),
+            "name": "weekly-posting",
+            "description": "",
+            "icon": None,
+            "bot_public": False,
+            "bot_require_code_grant": False,
+            "owner": OWNER_USER,
+            "verify_key": "0" * 64,
+            "flags": 0,
+        })
+
+    async def create_message(self, request: web.Request) -> web.Response:
+        fault = await self._inject()
+        if fault is not None:
+            return fault
+        channel_id = int(request.match_info["channel_id"])
+        body = await self._json(request)
+        content = body.get("content") or ""
+        self.deliveries.append((channel_id, content, time.perf_counter()))
+        return json_response(self._message(channel_id, content))
+
+    def _webhook(self, webhook_id: int) -> Dict[str, Any]:
+        channel_id, token = self.webhooks[webhook_id]
+        return {
+            "id": str(webhook_id),
+            "type": 1,
+            "channel_id": str(channel_id),
+            "name": "Weekly Posting",
+            "avatar": None,
+            "token": token,
+            "application_id": str(APP_ID),
+            "user": BOT_USER,
+        }
+
+    async def list_webhooks(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        return json_response([self._webhook(wid) for wid, (cid, _) in self.webhooks.items() if cid == channel_id])
+
+    async def create_webhook(self, request: web.Request) -> web.Response:
+        webhook_id = self._next_id()
+        self.webhooks[webhook_id] = (int(request.match_info["channel_id"]), f"token-{webhook_id}")
+        return json_response(self._webhook(webhook_id))
+
+    async def interaction_callback(self, request: web.Request) -> web.Response:
+        fault = await self._inject()
+        if fault is not None:
+            return fault
+        self.acks.setdefault(int(request.match_info["interaction_id"]), time.perf_counter())
+        return web.Response(status=204)
+
+    async def webhook_execute(self, request: web.Request) -> web.Response:
+        fault = await self._inject()
+        if fault is not None:
+            return fault
+        body = await self._json(request)
+        webhook_id = int(request.match_info["webhook_id"])
+        content = body.get("content") or ""
+        if webhook_id in self.webhooks:
+            # channel webhook (webhook mode); interaction followups also land here
+            channel_id = self.webhooks[webhook_id][0]
+            self.deliveries.append((channel_id, content, time.perf_counter()))
+            if request.query.get("wait") != "true":
+                return web.Response(status=204)
+        else:
+            self.followups.setdefault(request.match_info["token"], time.perf_counter())
+        return json_response(self._message(0, content, webhook_id))
+
+    async def webhook_edit(self, request: web.Request) -> web.Response:
+        body = await self._json(request)
+        return json_response(self._message(0, body.get("content") or "", int(request.match_info["webhook_id"])))
+
+
+# ======================================================
+# SYNTHETIC FLEET
+# ======================================================
+def build_text(gid: int, mid: int, chars: int) -> str:
+    line = f"[{gid}:{mid}] " + "lorem ipsum dolor sit amet " * 3
+    lines: List[str] = []
+    size = 0
+    while size < chars:
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)[:max(chars, 1)]
+
+
+def guild_payload(gid: int, channel_id: int) -> Dict[str, Any]:
+    return {
+        "id": str(gid),
+        "name": f"loadtest-{gid}",
+        "owner_id": OWNER_USER["id"],
+        "features": [],
+        "emojis": [],
+        "stickers": [],
+        "roles": [{
+            "id": str(gid),
+            "name": "@everyone",
+            "permissions": "3072",  # view channel + send messages
+            "position": 0,
+            "color": 0,
+            "hoist": False,
+            "managed": False,
+            "mentionable": False,
+            "flags": 0,
+        }],
+        "channels": [{
+            "id": str(channel_id),
+            "type": 0,
+            "guild_id": str(gid),
+            "name": "posts",
+            "position": 0,
+            "permission_overwrites": [],
+            "nsfw": False,
+            "parent_id": None,
+            "rate_limit_per_user": 0,
+        }],
+        "members": [{
+            "user": BOT_USER,
+            "roles": [],
+            "joined_at": FAKE_TIMESTAMP,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+        }],
+        "member_count": 2,
+        "premium_tier": 0,
+        "large": False,
+    }
+
+
+def interaction_payload(iid: int, gid: int, channel_id: int, message_id: int) -> Dict[str, Any]:
+    return {
+        "id": str(iid),
+        "application_id": str(APP_ID),
+        "type": 2,
+        "token": f"loadtest-{iid}",
+        "version": 1,
+        "guild_id": str(gid),
+        "channel_id": str(channel_id),
+        "channel": {"id": str(channel_id), "type": 0, "guild_id": str(gid)},
+        "member": {
+            "user": OWNER_USER,
+            "roles": [],
+            "joined_at": FAKE_TIMESTAMP,
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+            "permissions": "8",
+        },
+        "app_permissions": "3072",
+        "locale": "en-US",
+        "data": {
+            "id": "1",
+            "name": "postnow",
+            "type": 1,
+            "options": [{"name": "message_id", "type": 4, "value": message_id}],
+        },
+    }
+
+
+class Fleet:
+    """Synthetic guilds written into bot.data plus what each should receive."""
+
+    def __init__(
+        self, bot_module, guilds: int, messages: int, chars: int, fire_utc: datetime, webhooks: bool = False
+    ):
+        self.bot_module = bot_module
+        self.channels: Dict[int, int] = {}          # guild_id -> channel_id
+        self.expected: Dict[int, List[str]] = {}    # channel_id -> chunks (autopost)
+        self.first_message: Dict[int, str] = {}     # guild_id -> text of message 1
+        day = fire_utc.strftime("%A")
+
+        for n in range(guilds):
+            gid = snowflake(10_000 + n)
+            cid = snowflake(20_000 + n)
+            texts = {str(mid): build_text(gid, mid, chars) for mid in range(1, messages + 1)}
+            bot_module.data[str(gid)] = {
+                "messages": texts,
+                "timezone": "UTC",
+                "slots": {
+                    bot_module.DEFAULT_SLOT: {
+                        "channel": cid,
+                        "hour": fire_utc.hour,
+                        "minute": fire_utc.minute,
+                        "timezone": None,
+                        "schedule": {day: list(range(1, messages + 1))},
+                    },
+                },
+                "webhook": {"enabled": webhooks, "name": None, "avatar_url": None, "cache": {}},
+            }
+            self.channels[gid] = cid
+            self.first_message[gid] = texts["1"]
+            chunks: List[str] = []
+            for mid in range(1, messages + 1):
+                chunks.extend(bot_module.split_message(texts[str(mid)]))
+            self.expected[cid] = chunks
+        bot_module.fire_index.rebuild()
+
+    def attach(self, client) -> None:
+        """Put every synthetic guild into the client's cache as if READY had arrived."""
+        import discord
+        state = client._connection
+        for gid, cid in self.channels.items():
+            state._add_guild(discord.Guild(data=guild_payload(gid, cid), state=state))
+
+
+# ======================================================
+# DRIVERS
+# ======================================================
+def report(
+    name: str,
+    server: FakeDiscord,
+    expected: Dict[int, List[str]],
+    fired_at: Dict[int, float],
+    started: float,
+    errors: int,
+) -> None:
+    delivered: Dict[int, Counter] = defaultdict(Counter)
+    latencies: List[float] = []
+    last = started
+    for cid, content, at in server.deliveries:
+        delivered[cid][content] += 1
+        latencies.append(at - fired_at.get(cid, started))
+        last = max(last, at)
+
+    total = sum(len(v) for v in expected.values())
+    lost = 0
+    for cid, chunks in expected.items():
+        want = Counter(chunks)
+        lost += sum((want - delivered[cid]).values())
+    elapsed = max(last - started, 1e-9)
+
+    print(f"\n== {name} ==")
+    print(f"  chunks expected : {total}")
+    print(f"  delivered       : {len(server.deliveries)}")
+    print(f"  lost posts      : {lost}")
+    print(f"  handler errors  : {errors}")
+    print(f"  sends/sec       : {len(server.deliveries) / elapsed:.1f}")
+    print(f"  fire->delivery  : p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms")
+    if server.acks:
+        ack_lat = [server.acks[iid] - fired_at.get(-iid, started) for iid in server.acks]
+        print(f"  ack latency     : p50 {percentile(ack_lat, 50) * 1000:.0f} ms, "
+              f"p99 {percentile(ack_lat, 99) * 1000:.0f} ms")
+    injected = ", ".join(f"{k} x{v}" for k, v in sorted(server.injected.items())) or "none"
+    print(f"  injected faults : {injected}")
+
+
+async def drive_autopost(bot_module, server: FakeDiscord, fleet: Fleet, fire_utc: datetime) -> None:
+    if bot_module.PREFLIGHT_MINUTES > 0:
+        # resolve channels and build payloads ahead of the slot, as the bot would
+        await bot_module.run_preflight(fire_utc - timedelta(minutes=bot_module.PREFLIGHT_MINUTES))
+        print(f"\n  pre-flight      : {len(bot_module.prepared_posts)} posts prepared")
+    server.reset()
+    errors = 0
+    started = time.perf_counter()
+    try:
+        await bot_module.run_autopost_tick(fire_utc)
+    except Exception as e:
+        errors += 1
+        print(f"  ! autopost tick raised {type(e).__name__}: {e}")
+    # failed posts wait in the outbox; replay them without waiting out the backoff
+    rounds = 0
+    while bot_module.outbox.items and rounds < 10:
+        rounds += 1
+        for item in bot_module.outbox.items.values():
+            item["next_attempt"] = 0.0
+        await bot_module.run_outbox_retries()
+    if rounds:
+        dead = sum(len(v) for v in bot_module.outbox.dead.values())
+        print(f"\n  outbox          : {rounds} retry round(s), {len(bot_module.outbox.items)} pending, {dead} dead")
+    # every guild fires in the same tick, so the fire instant is shared
+    fired_at = {cid: started for cid in fleet.expected}
+    report("autopost", server, fleet.expected, fired_at, started, errors)
+
+
+async def fire_postnow(bot_module, seq: int, gid: int, cid: int, fired_at: Dict[int, float]) -> bool:
+    """Run /postnow message_id:1 in one guild; fired_at gets the channel and -interaction_id."""
+    import discord
+    iid = snowflake(30_000 + seq)
+    interaction = discord.Interaction(data=interaction_payload(iid, gid, cid, 1), state=bot_module.bot._connection)
+    fired_at[cid] = time.perf_counter()
+    fired_at[-iid] = fired_at[cid]
+    try:
+        await bot_module.postnow.callback(interaction, message_id=1)
+        return True
+    except Exception as e:
+        print(f"  ! postnow in {gid} raised {type(e).__name__}: {e}")
+        return False
+
+
+async def drive_postnow(bot_module, server: FakeDiscord, fleet: Fleet) -> None:
+    server.reset()
+    fired_at: Dict[int, float] = {}
+    expected: Dict[int, List[str]] = {}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        fire_postnow(bot_module, seq, gid, cid, fired_at) for seq, (gid, cid) in enumerate(fleet.channels.items())
+    ))
+    for gid, cid in fleet.channels.items():
+        expected[cid] = bot_module.split_message(fleet.first_message[gid])
+    # postnow acknowledges first and posts from the outbound pipeline
+    await bot_module.outbound.join()
+    report("postnow", server, expected, fired_at, started, results.count(False))
+
+
+async def drive_contended(
+    bot_module, server: FakeDiscord, fleet: Fleet, fire_utc: datetime, interactive: int
+) -> None:
+    """Fire /postnow in a few guilds while the autopost burst is still draining."""
+    if bot_module.PREFLIGHT_MINUTES > 0:
+        await bot_module.run_preflight(fire_utc - timedelta(minutes=bot_module.PREFLIGHT_MINUTES))
+    server.reset()
+    started = time.perf_counter()
+    tick = asyncio.create_task(bot_module.run_autopost_tick(fire_utc))
+    await asyncio.sleep(0.5)
+
+    fired_at: Dict[int, float] = {}
+    picked = list(fleet.channels.items())[:interactive]
+    results = await asyncio.gather(*(
+        fire_postnow(bot_module, seq, gid, cid, fired_at) for seq, (gid, cid) in enumerate(picked)
+    ))
+    errors = results.count(False)
+    try:
+        await tick
+    except Exception as e:
+        errors += 1
+        print(f"  ! autopost tick raised {type(e).__name__}: {e}")
+    await bot_module.outbound.join()
+
+    expected = {cid: list(chunks) for cid, chunks in fleet.expected.items()}
+    for gid, cid in picked:
+        expected[cid].extend(bot_module.split_message(fleet.first_message[gid]))
+    # autopost chunks count from the fire; interaction acks from their own start
+    acks_from = {key: at for key, at in fired_at.items() if key < 0}
+    report("autopost + postnow", server, expected, acks_from, started, errors)
+
+    acks = [server.acks[-key] - at for key, at in fired_at.items() if key < 0 and -key in server.acks]
+    done = [
+        server.followups[f"loadtest-{-key}"] - at
+        for key, at in fired_at.items() if key < 0 and f"loadtest-{-key}" in server.followups
+    ]
+    print(f"  /postnow during the burst ({len(picked)}):")
+    print(f"    acknowledged  : p50 {percentile(acks, 50) * 1000:.0f} ms, p99 {percentile(acks, 99) * 1000:.0f} ms")
+    print(f"    posted        : p50 {percentile(done, 50) * 1000:.0f} ms, p99 {percentile(done, 99) * 1000:.0f} ms")
+    print(f"    autopost done : {(time.perf_counter() - started) * 1000:.0f} ms after the fire")
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    server = FakeDiscord(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        rate_5xx=args.rate_5xx,
+        seed=args.seed,
+    )
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    base = f"http://127.0.0.1:{port}/api/v10"
+    print(f"🧪 Fake Discord listening on {base}")
+
+    if args.serve_only:
+        await asyncio.Event().wait()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DISCORD_API_BASE"] = base
+        os.environ["BOT_DATA_FILE"] = os.path.join(tmp, "serverdata.json")
+        import bot as bot_module
+
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        fire_utc = now + timedelta(minutes=1)
+        fleet = Fleet(bot_module, args.guilds, args.messages, args.chars, fire_utc, webhooks=args.webhooks)
+
+        await bot_module.bot.login("loadtest-token")
+        fleet.attach(bot_module.bot)
+        try:
+            if args.path in ("autopost", "both"):
+                await drive_autopost(bot_module, server, fleet, fire_utc)
+            if args.path in ("postnow", "both"):
+                await drive_postnow(bot_module, server, fleet)
+            if args.path == "contended":
+                await drive_contended(bot_module, server, fleet, fire_utc, args.interactive)
+        finally:
+            await bot_module.bot.close()
+            await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the posting paths against a fake Discord.")
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=2, help="scheduled messages per guild")
+    parser.add_argument("--chars", type=int, default=3000, help="characters per message")
+    parser.add_argument("--path", choices=["autopost", "postnow", "both", "contended"], default="both")
+    parser.add_argument("--interactive", type=int, default=20, help="contended: /postnow runs during the burst")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of writes answered 429")
+    parser.add_argument("--retry-after", type=float, default=0.25, help="retry_after sent with 429s")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="fraction of writes answered 5xx")
+    parser.add_argument("--webhooks", action="store_true", help="post in webhook mode")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve-only", action="store_true", help="only run the fake server")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# ======================================================
+# GATEWAY CACHE MEMORY BENCHMARK
+# ======================================================
+"""
+Compare resident memory of the lean and full client profiles.
+
+Each profile runs in a fresh interpreter: bot.py is imported with
+CLIENT_PROFILE set, then synthetic GUILD_CREATE payloads (and the
+message / voice events those intents would deliver) are fed straight
+into the client's connection state, as the gateway would after READY.
+Payloads only carry what Discord sends for the profile's intents.
+
+    python tools/membench.py --guilds 10000
+    python tools/membench.py --guilds 20000 --messages 10 --voice 5
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DISCORD_EPOCH_MS = 1420070400000
+BOT_ID = 900000000000000001
+FAKE_TIMESTAMP = "2024-01-01T00:00:00.000000+00:00"
+
+
+def snowflake(seq: int) -> int:
+    ms = int(time.time() * 1000) - DISCORD_EPOCH_MS
+    return (ms << 22) | (seq & 0x3FFFFF)
+
+
+def rss_kib() -> int:
+    with open("/proc/self/status", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def user(uid: int, bot: bool = False) -> Dict[str, Any]:
+    return {"id": str(uid), "username": f"user{uid % 100000}", "discriminator": "0000",
+            "global_name": None, "avatar": None, "bot": bot, "flags": 0}
+
+
+def member(uid: int, bot: bool = False) -> Dict[str, Any]:
+    return {"user": user(uid, bot), "roles": [], "joined_at": FAKE_TIMESTAMP,
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def guild_create(n: int, args: argparse.Namespace, intents) -> Dict[str, Any]:
+    gid = snowflake(n * 1000)
+    channels = [{
+        "id": str(gid + 1 + c), "type": 0, "guild_id": str(gid), "name": f"channel-{c}",
+        "position": c, "permission_overwrites": [], "nsfw": False, "parent_id": None,
+        "rate_limit_per_user": 0, "topic": "a channel topic of ordinary length",
+    } for c in range(args.channels)]
+    roles = [{
+        "id": str(gid if r == 0 else gid + 500 + r), "name": "@everyone" if r == 0 else f"role-{r}",
+        "permissions": "3072", "position": r, "color": 0, "hoist": False, "managed": False,
+        "mentionable": False, "flags": 0,
+    } for r in range(args.roles)]
+    emojis = [{"id": str(gid + 700 + e), "name": f"emoji{e}", "roles": [], "require_colons": True,
+               "managed": False, "animated": False, "available": True} for e in range(args.emojis)]
+
+    members = [member(BOT_ID, bot=True)]
+    voice_states: List[Dict[str, Any]] = []
+    if intents.voice_states:
+        # Discord includes members that sit in voice, plus their voice states
+        voice_channel = {"id": str(gid + 900), "type": 2, "guild_id": str(gid), "name": "voice",
+                         "position": 0, "permission_overwrites": [], "nsfw": False, "parent_id": None,
+                         "bitrate": 64000, "user_limit": 0, "rtc_region": None}
+        channels.append(voice_channel)
+        for v in range(args.voice):
+            uid = gid + 800 + v
+            members.append(member(uid))
+            voice_states.append({"user_id": str(uid), "channel_id": voice_channel["id"], "session_id": "x",
+                                 "deaf": False, "mute": False, "self_deaf": False, "self_mute": False,
+                                 "self_video": False, "suppress": False, "request_to_speak_timestamp": None})
+
+    return {
+        "id": str(gid), "name": f"guild-{n}", "owner_id": str(gid + 800), "features": [],
+        "emojis": emojis, "stickers": [], "roles": roles, "channels": channels, "members": members,
+        "voice_states": voice_states, "threads": [], "member_count": 50, "premium_tier": 0,
+        "large": False, "unavailable": False,
+    }
+
+
+def message_create(guild: Dict[str, Any], seq: int) -> Dict[str, Any]:
+    gid = int(guild["id"])
+    author = gid + 800 + (seq % 7)
+    return {
+        "id": str(snowflake(seq)), "channel_id": guild["channels"][seq % len(guild["channels"])]["id"],
+        "guild_id": str(gid), "type": 0, "content": "", "author": user(author),
+        "member": {k: v for k, v in member(author).items() if k != "user"},
+        "attachments": [], "embeds": [], "mentions": [], "mention_roles": [], "mention_everyone": False,
+        "pinned": False, "tts": False, "timestamp": FAKE_TIMESTAMP, "edited_timestamp": None,
+        "flags": 0, "components": [],
+    }
+
+
+# ======================================================
+# CHILD: ONE PROFILE
+# ======================================================
+def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    import discord
+    import bot as bot_module
+
+    state = bot_module.bot._connection
+    intents = bot_module.bot.intents
+    # as after READY, so the bot's own member is recognised and kept
+    state.user = discord.ClientUser(state=state, data=user(BOT_ID, bot=True))
+    gc.collect()
+    before = rss_kib()
+
+    seq = 0
+    for n in range(args.guilds):
+        payload = guild_create(n, args, intents)
+        guild = discord.Guild(data=payload, state=state)
+        state._add_guild(guild)
+        if intents.guild_messages:
+            for _ in range(args.messages):
+                seq += 1
+                state.parse_message_create(message_create(payload, seq))
+
+    gc.collect()
+    after = rss_kib()
+    return {
+        "profile": bot_module.CLIENT_PROFILE,
+        "guilds": args.guilds,
+        "rss_before_kib": before,
+        "rss_after_kib": after,
+        "cached_members": sum(len(g._members) for g in state._guilds.values()),
+        "cached_messages": len(state._messages or ()),
+    }
+
+
+# ======================================================
+# PARENT: RUN BOTH PROFILES, REPORT
+# ======================================================
+def run_profile(profile: str, argv: List[str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, CLIENT_PROFILE=profile, BOT_DATA_FILE=os.path.join(tmp, "serverdata.json"))
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", *argv],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-guild RSS of the lean vs full client profile.")
+    parser.add_argument("--guilds", type=int, default=10000)
+    parser.add_argument("--channels", type=int, default=15, help="text channels per guild")
+    parser.add_argument("--roles", type=int, default=10)
+    parser.add_argument("--emojis", type=int, default=10)
+    parser.add_argument("--voice", type=int, default=3, help="members in voice per guild (voice intent)")
+    parser.add_argument("--messages", type=int, default=5, help="messages per guild (guild_messages intent)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args)))
+        return
+
+    argv = [a for a in sys.argv[1:] if a != "--child"]
+    results = {p: run_profile(p, argv) for p in ("full", "lean")}
+    for p, r in results.items():
+        used = r["rss_after_kib"] - r["rss_before_kib"]
+        r["per_guild"] = used / max(1, r["guilds"])
+        print(f"== {p} ==")
+        print(f"  guild caches    : {used / 1024:.1f} MiB for {r['guilds']} guilds")
+        print(f"  per guild       : {r['per_guild']:.2f} KiB")
+        print(f"  cached members  : {r['cached_members']}")
+        print(f"  cached messages : {r['cached_messages']}")
+    full, lean = results["full"]["per_guild"], results["lean"]["per_guild"]
+    saving = (1 - lean / full) * 100 if full else 0.0
+    print(f"\nlean saves {full - lean:.2f} KiB per guild ({saving:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# ======================================================
+# OFFLINE SCHEDULE SIMULATOR (fleet-wide posting load)
+# ======================================================
+"""
+Predict the posting load of a whole fleet before changing post times.
+
+Loads a data file (any codec), computes every fire instant of every slot
+for the next N weeks with the bot's own DST rules, and reports the
+per-minute send histogram, the peak burst and how far behind the global
+rate limit would fall.
+
+Fixed-time slots are reduced with NumPy to sends per (zone, post time,
+weekday). The fire instants are then one shared fire-table row per zone
+and post time, so the per-day work no longer depends on the guild count.
+Cron slots are walked one by one. Without NumPy the same numbers come from
+a slower pure-Python reduction.
+
+--disperse N compares the load with default-time slots spread over N
+minutes (DISPERSE_WINDOW_MINUTES) against everyone firing at once.
+
+    python tools/simulate.py --data serverdata.json --weeks 2
+    python tools/simulate.py --synthetic 1000000 --csv load.csv
+    python tools/simulate.py --synthetic 100000 --disperse 30
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SYNTHETIC_ZONES = [
+    "UTC", "America/Vancouver", "America/New_York", "America/Sao_Paulo", "Europe/London",
+    "Europe/Berlin", "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney",
+]
+
+
+class FleetColumns:
+    """Fixed-time slots as columns (combo index + sends per weekday); cron slots as a list."""
+
+    def __init__(self):
+        self.combos: List[Tuple[str, int, int, int]] = []   # (timezone, hour, minute, dispersion minutes)
+        self._combo_ids: Dict[Tuple[str, int, int, int], int] = {}
+        self.combo: Any = []                              # combo index per slot
+        self.sends: Any = []                              # per slot: 7 ints, Monday first (0 = no post)
+        self.cron: List[Tuple[str, str, List[int]]] = []  # (expression, timezone, sends per weekday)
+        self.guilds = 0
+
+    def combo_id(self, tz_name: str, hour: int, minute: int, offset: int = 0) -> int:
+        key = (tz_name, hour, minute, offset)
+        cid = self._combo_ids.get(key)
+        if cid is None:
+            cid = self._combo_ids[key] = len(self.combos)
+            self.combos.append(key)
+        return cid
+
+    @property
+    def slots(self) -> int:
+        return len(self.combo) + len(self.cron)
+
+
+# ======================================================
+# LOADING
+# ======================================================
+def load_fleet(bot, source: Dict[str, Any], window: int = 0) -> FleetColumns:
+    fleet = FleetColumns()
+    combo: List[int] = []
+    sends: List[List[int]] = []
+    for gid, g in source.items():
+        if not gid.isdigit() or not isinstance(g, dict):
+            continue
+        bot.normalize_guild(g)
+        if g.get("left_at"):
+            continue
+        fleet.guilds += 1
+        chunk_counts: Dict[str, int] = {}
+
+        def chunks(text: str) -> int:
+            n = chunk_counts.get(text)
+            if n is None:
+                n = chunk_counts[text] = len(bot.split_message(text))
+            return n
+
+        for name, slot in g["slots"].items():
+            if not isinstance(slot.get("channel"), int):
+                continue
+            per_day = [0] * 7
+            for day, queue in slot["schedule"].items():
+                if day in bot.VALID_DAYS:
+                    per_day[bot.VALID_DAYS.index(day)] = sum(
+                        chunks(text) for text in bot.queue_sources(g, queue) if isinstance(text, str)
+                    )
+            if not any(per_day):
+                continue
+            tz_name = bot.slot_timezone(g, slot)
+            if slot.get("cron"):
+                fleet.cron.append((slot["cron"], tz_name, per_day))
+            else:
+                offset = 0 if slot["time_set"] else bot.dispersion_offset(int(gid), name, window) // 60
+                combo.append(fleet.combo_id(tz_name, slot["hour"], slot["minute"], offset))
+                sends.append(per_day)
+    fleet.combo = combo
+    fleet.sends = sends
+    return fleet
+
+
+def synthetic_fleet(bot, guilds: int, default_share: float, seed: int, window: int = 0) -> FleetColumns:
+    """One slot per guild: default_share left on the default time (UTC), the rest at random zones and times."""
+    fleet = FleetColumns()
+    fleet.guilds = guilds
+    hour0, minute0 = bot.DEFAULT_POST_HOUR, bot.DEFAULT_POST_MINUTE
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        default = rng.random(guilds) < default_share
+        zone = np.where(default, 0, rng.integers(0, len(SYNTHETIC_ZONES), guilds))
+        hour = np.where(default, hour0, rng.integers(0, 24, guilds))
+        minute = np.where(default, minute0, rng.integers(0, 60, guilds))
+        offset = np.zeros(guilds, dtype=np.int64)
+        if window > 0:
+            ids = np.nonzero(default)[0]
+            offset[ids] = [bot.dispersion_offset(10**17 + i, bot.DEFAULT_SLOT, window) // 60 for i in ids.tolist()]
+        keys, fleet.combo = np.unique(((zone * 24 + hour) * 60 + minute) * 181 + offset, return_inverse=True)
+        for key in keys.tolist():
+            time_key, off = divmod(key, 181)
+            fleet.combo_id(SYNTHETIC_ZONES[time_key // 1440], time_key // 60 % 24, time_key % 60, off)
+        fleet.sends = rng.integers(1, 4, (guilds, 7)) * (rng.random((guilds, 7)) < 0.5)
+        return fleet
+
+    rng_py = random.Random(seed)
+    combo: List[int] = []
+    sends: List[List[int]] = []
+    for i in range(guilds):
+        if rng_py.random() < default_share:
+            offset = bot.dispersion_offset(10**17 + i, bot.DEFAULT_SLOT, window) // 60
+            combo.append(fleet.combo_id("UTC", hour0, minute0, offset))
+        else:
+            combo.append(fleet.combo_id(
+                rng_py.choice(SYNTHETIC_ZONES), rng_py.randrange(24), rng_py.randrange(60)
+            ))
+        sends.append([rng_py.randint(1, 3) if rng_py.random() < 0.5 else 0 for _ in range(7)])
+    fleet.combo = combo
+    fleet.sends = sends
+    return fleet
+
+
+# ======================================================
+# SIMULATION
+# ======================================================
+def sends_per_combo(fleet: FleetColumns) -> List[List[float]]:
+    """[weekday][combo] -> total sends of every fixed-time slot with that zone and post time."""
+    n_combos = len(fleet.combos)
+    if np is not None:
+        combo = np.asarray(fleet.combo, dtype=np.int64)
+        sends = np.asarray(fleet.sends, dtype=np.int64).reshape(-1, 7)
+        return [np.bincount(combo, weights=sends[:, wd], minlength=n_combos).tolist() for wd in range(7)]
+
+    totals = [[0.0] * n_combos for _ in range(7)]
+    for cid, per_day in zip(fleet.combo, fleet.sends):
+        for wd in range(7):
+            if per_day[wd]:
+                totals[wd][cid] += per_day[wd]
+    return totals
+
+
+def simulate(bot, fleet: FleetColumns, start: date, weeks: int) -> Tuple[int, List[float]]:
+    """(first UTC epoch minute, sends per UTC minute) for local dates start .. start + weeks."""
+    days = weeks * 7
+    # local dates in zones from UTC-12 to UTC+14 span a day either side in UTC
+    base = bot.epoch_minute(datetime(start.year, start.month, start.day, tzinfo=timezone.utc)) - 1440
+    hist = [0.0] * ((days + 2) * 1440)
+
+    totals = sends_per_combo(fleet)
+    tables: Dict[str, Any] = {}
+    for cid, (tz_name, hour, minute, offset) in enumerate(fleet.combos):
+        if not any(totals[wd][cid] for wd in range(7)):
+            continue
+        table = tables.get(tz_name)
+        if table is None:
+            table = tables[tz_name] = bot.ZoneFireTable(tz_name, start, weeks)
+        for day, at in table.instants(hour, minute):
+            if at is not None:
+                hist[bot.epoch_minute(at) + offset - base] += totals[day.weekday()][cid]
+
+    first, last = base + 1440, base + (days + 1) * 1440
+    for expression, tz_name, per_day in fleet.cron:
+        cron = bot.compile_cron(expression)
+        tzinfo = bot.get_tzinfo(tz_name)
+        m = bot.cron_next_minute(cron, tzinfo, first - 1)
+        while m is not None and m < last:
+            local = datetime.fromtimestamp(m * 60, tz=timezone.utc).astimezone(tzinfo)
+            hist[m - base] += per_day[local.weekday()]
+            m = bot.cron_next_minute(cron, tzinfo, m)
+    return base, hist
+
+
+def rate_pressure(hist: List[float], rate: float) -> Tuple[int, float, int]:
+    """(minutes over capacity, worst backlog in sends, minute index of it) at rate sends/sec."""
+    capacity = rate * 60
+    backlog = worst = 0.0
+    worst_at = over = 0
+    for i, n in enumerate(hist):
+        if n > capacity:
+            over += 1
+        backlog = max(0.0, backlog + n - capacity)
+        if backlog > worst:
+            worst, worst_at = backlog, i
+    return over, worst, worst_at
+
+
+def minute_label(m: int) -> str:
+    return datetime.fromtimestamp(m * 60, tz=timezone.utc).strftime("%a %Y-%m-%d %H:%M UTC")
+
+
+def summarize(base: int, hist: List[float], rate: float) -> Dict[str, str]:
+    over, worst, worst_at = rate_pressure(hist, rate)
+    peak = max(range(len(hist)), key=hist.__getitem__)
+    return {
+        "total sends": f"{sum(hist):.0f}",
+        "busy minutes": str(sum(1 for n in hist if n)),
+        "peak burst": f"{hist[peak]:.0f} sends, {minute_label(base + peak)}",
+        "peak drain time": f"{hist[peak] / rate:.1f} s at {rate:g} sends/s",
+        "minutes over rate": f"{over} (capacity {rate * 60:.0f} sends/min)",
+        "worst backlog": f"{worst:.0f} sends ({worst / rate:.0f} s late)" + (
+            f" after {minute_label(base + worst_at)}" if worst else ""
+        ),
+    }
+
+
+# ======================================================
+# CLI
+# ======================================================
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate fleet-wide posting load for the next N weeks.")
+    parser.add_argument("--data", default="serverdata.json", help="data file to load (any codec)")
+    parser.add_argument("--synthetic", type=int, default=0, help="simulate N synthetic guilds instead")
+    parser.add_argument("--default-share", type=float, default=0.6, help="synthetic: share left on the default time")
+    parser.add_argument("--weeks", type=int, default=2)
+    parser.add_argument("--start", default=None, help="first local date (YYYY-MM-DD, default today)")
+    parser.add_argument("--rate", type=float, default=50.0, help="global sends/sec Discord allows")
+    parser.add_argument("--disperse", type=int, default=0, help="also simulate default-time slots spread over N minutes")
+    parser.add_argument("--top", type=int, default=10, help="busiest minutes to list")
+    parser.add_argument("--csv", default=None, help="write utc_minute,sends for every busy minute")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    windows = [0, args.disperse] if args.disperse > 0 else [0]
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["BOT_DATA_FILE"] = os.path.join(tmp, "serverdata.json")
+        import bot
+
+        start = date.fromisoformat(args.start) if args.start else datetime.now(timezone.utc).date()
+        source: Optional[Dict[str, Any]] = None
+        if not args.synthetic:
+            with open(args.data, "rb") as f:
+                source = bot.decode_data(f.read())
+
+        runs: List[Tuple[FleetColumns, int, List[float], float, float]] = []
+        for window in windows:
+            started = time.perf_counter()
+            if source is None:
+                fleet = synthetic_fleet(bot, args.synthetic, args.default_share, args.seed, window)
+            else:
+                fleet = load_fleet(bot, source, window)
+            loaded = time.perf_counter()
+            base, hist = simulate(bot, fleet, start, args.weeks)
+            runs.append((fleet, base, hist, loaded - started, time.perf_counter() - loaded))
+
+    fleet = runs[0][0]
+    print(f"📦 {fleet.guilds} guilds, {fleet.slots} posting slots ({len(fleet.cron)} cron), "
+          f"NumPy {'on' if np is not None else 'off'}")
+    for (run_fleet, _, _, load_s, sim_s), window in zip(runs, windows):
+        label = f"spread over {window} min" if window else "as scheduled"
+        print(f"   {label}: {len(run_fleet.combos)} distinct zone/time pairs, loaded in {load_s * 1000:.0f} ms, "
+              f"simulated {args.weeks} week(s) in {sim_s * 1000:.0f} ms")
+
+    summaries = [summarize(base, hist, args.rate) for _, base, hist, _, _ in runs]
+    print()
+    if len(summaries) == 1:
+        for key, value in summaries[0].items():
+            print(f"  {key:<18}: {value}")
+    else:
+        print(f"  {'':<18}  {'as scheduled':<44}  spread over {args.disperse} min")
+        for key in summaries[0]:
+            print(f"  {key:<18}: {summaries[0][key]:<44}  {summaries[1][key]}")
+
+    _, base, hist, _, _ = runs[-1]
+    busiest = sorted((i for i, n in enumerate(hist) if n), key=lambda i: -hist[i])
+    if busiest and args.top:
+        print(f"\n  busiest minutes{' (spread)' if len(runs) > 1 else ''}:")
+        for i in busiest[:args.top]:
+            print(f"    {minute_label(base + i)}  {hist[i]:>10.0f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["utc_minute", "sends"])
+            for i, n in enumerate(hist):
+                if n:
+                    writer.writerow([datetime.fromtimestamp((base + i) * 60, tz=timezone.utc).isoformat(), int(n)])
+        print(f"\n  histogram written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()